@@ -0,0 +1,75 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2024 Scipp contributors (https://github.com/scipp)
+# ruff: noqa: T201
+"""Compare the reader backends of :func:`chexus.read_hdf5`.
+
+Usage::
+
+    python benchmarks/read_hdf5_benchmark.py [--groups N] [--repeat N]
+
+The benchmark writes a temporary file with many small groups, similar to the
+log and transformation groups of a large instrument, and reports the best time
+of reading the full tree with each backend.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import h5py
+import numpy as np
+
+import chexus
+
+
+def make_file(path: str, n_groups: int) -> None:
+    with h5py.File(path, 'w') as f:
+        entry = f.create_group('entry')
+        entry.attrs['NX_class'] = 'NXentry'
+        for i in range(n_groups):
+            log = entry.create_group(f'log_{i}')
+            if i % 2:
+                log.attrs['NX_class'] = 'NXlog'
+            log.create_dataset('time', data=np.arange(3.0))
+            value = log.create_dataset('value', data=np.arange(3.0))
+            if i % 3:
+                value.attrs['units'] = 'K'
+
+
+def best_of(func, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--groups', type=int, default=20_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'benchmark.nxs')
+        make_file(path, args.groups)
+        n_nodes = 3 * args.groups + 1
+        print(f'{n_nodes} groups and datasets')
+        times = {}
+        for backend in ('highlevel', 'lowlevel'):
+
+            def read(backend=backend):
+                reader = chexus.read_hdf5(path, backend=backend)
+                chexus.unroll_tree(next(reader))
+
+            times[backend] = best_of(read, args.repeat)
+            print(
+                f'{backend:>10}: {times[backend]:.3f} s '
+                f'({1e6 * times[backend] / n_nodes:.1f} us/node)'
+            )
+        print(f'Speedup: {times["highlevel"] / times["lowlevel"]:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
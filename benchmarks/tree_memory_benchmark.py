@@ -0,0 +1,180 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2024 Scipp contributors (https://github.com/scipp)
+# ruff: noqa: T201
+"""Measure the memory used by trees of :class:`chexus.Group` and :class:`chexus.Dataset`
+
+Usage::
+
+    python benchmarks/tree_memory_benchmark.py [--groups N]
+
+The benchmark writes a temporary file with many small groups, similar to the
+log and transformation groups of a large instrument. It first reports the memory
+allocated by Python per node for the nodes alone, with the dict-based dataclass
+nodes that chexus used before the nodes were slotted as the baseline, and with
+the current nodes. Then it reports the memory per node while reading the tree
+with each backend, and while restoring it from a metadata snapshot. This
+includes the h5py objects that the tree holds on to.
+"""
+
+from __future__ import annotations
+
+import argparse
+import functools
+import os
+import tempfile
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+import h5py
+import numpy as np
+
+import chexus
+from chexus.tree import EMPTY
+
+
+@dataclass
+class DictDataset:
+    """Layout of :class:`chexus.Dataset` before nodes were slotted"""
+
+    name: str
+    shape: tuple[int, ...]
+    dtype: Any
+    parent: DictGroup
+    attrs: dict[str, Any] = field(default_factory=dict)
+    value: Any | None = None
+    dataset: Any | None = None
+
+
+@dataclass
+class DictGroup:
+    """Layout of :class:`chexus.Group` before nodes were slotted"""
+
+    name: str
+    parent: DictGroup | None = None
+    attrs: dict[str, Any] = field(default_factory=dict)
+    children: dict[str, DictDataset | DictGroup] = field(default_factory=dict)
+
+
+def make_file(path: str, n_groups: int) -> None:
+    with h5py.File(path, 'w') as f:
+        instrument = f.create_group('entry').create_group('instrument')
+        for i in range(n_groups):
+            log = instrument.create_group(f'motor_{i}')
+            log.attrs['NX_class'] = 'NXlog'
+            log.create_dataset('time', data=np.arange(3.0))
+            value = log.create_dataset('value', data=np.arange(3.0))
+            value.attrs['units'] = 'mm'
+
+
+def measure(read: Callable[[], Any], n_nodes: int) -> float:
+    tracemalloc.start()
+    tree = read()  # noqa: F841
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current / n_nodes
+
+
+def build_dict_nodes(records: list[tuple[Any, ...]]) -> DictGroup:
+    """Build the tree like the readers did with the dict-based nodes.
+
+    Every node has its own dicts for attributes and children, its full name, and
+    its own dtype object, as made by h5py.
+    """
+    root = DictGroup(name='/')
+    groups = {'/': root}
+    for is_group, name, attrs, shape, dtype in records:
+        parent_name, _, basename = name.rpartition('/')
+        parent = groups[parent_name or '/']
+        # A new string, like the names that h5py returned
+        name = f"{'' if parent.name == '/' else parent.name}/{basename}"
+        if is_group:
+            node = groups[name] = DictGroup(name=name, parent=parent, attrs=dict(attrs))
+        else:
+            node = DictDataset(
+                name=name,
+                shape=shape,
+                dtype=np.dtype(dtype.str),
+                parent=parent,
+                attrs=dict(attrs),
+            )
+        parent.children[basename] = node
+    return root
+
+
+def build_nodes(records: list[tuple[Any, ...]]) -> chexus.Group:
+    """Build the tree like the readers do with the current nodes"""
+    root = chexus.Group(name='/', attrs=EMPTY, children=EMPTY)
+    groups = {'/': root}
+    for is_group, name, attrs, shape, dtype in records:
+        parent_name, _, basename = name.rpartition('/')
+        parent = groups[parent_name or '/']
+        if is_group:
+            node = groups[name] = chexus.Group(
+                name=name, parent=parent, attrs=dict(attrs) or EMPTY, children=EMPTY
+            )
+        else:
+            node = chexus.Dataset(
+                name=name,
+                shape=shape,
+                dtype=dtype,
+                parent=parent,
+                attrs=dict(attrs) or EMPTY,
+            )
+        parent.children[basename] = node
+    return root
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--groups', type=int, default=20_000)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'benchmark.nxs')
+        make_file(path, args.groups)
+        n_nodes = 3 * args.groups + 2
+        print(f'{n_nodes} groups and datasets')
+
+        reader = chexus.read_hdf5(path)
+        records = [
+            (
+                isinstance(node, chexus.Group),
+                node.name,
+                dict(node.attrs),
+                getattr(node, 'shape', None),
+                getattr(node, 'dtype', None),
+            )
+            for node in chexus.iter_tree(next(reader))
+        ]
+        reader.close()
+        print('Nodes only')
+        for name, build in (('dict-based', build_dict_nodes), ('slotted', build_nodes)):
+            per_node = measure(functools.partial(build, records), n_nodes)
+            print(f'{name:>10}: {per_node:.0f} bytes/node')
+
+        readers = {}
+        for backend in ('highlevel', 'lowlevel'):
+
+            def read(backend=backend):
+                reader = chexus.read_hdf5(path, backend=backend)
+                group = next(reader)
+                chexus.unroll_tree(group)
+                return reader, group
+
+            readers[backend] = read
+        cache = chexus.SnapshotCache(os.path.join(tmp, 'cache'))
+        next(chexus.read_hdf5(path, cache=cache))
+
+        def read_snapshot():
+            reader = chexus.read_hdf5(path, cache=cache)
+            return reader, next(reader)
+
+        readers['snapshot'] = read_snapshot
+        print('Reading the file')
+        for name, read in readers.items():
+            print(f'{name:>10}: {measure(read, n_nodes):.0f} bytes/node')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,35 +1,130 @@
 # SPDX-License-Identifier: BSD-3-Clause
 # Copyright (c) 2024 Scipp contributors (https://github.com/scipp)
-# ruff: noqa: E402, F401
 
-import importlib.metadata
+# Submodules and their dependencies, such as h5py and numpy, are imported on first
+# use, so that, e.g., 'chexus --help' and validating JSON files start fast.
 
-try:
-    __version__ = importlib.metadata.version(__package__ or __name__)
-except importlib.metadata.PackageNotFoundError:
-    __version__ = "0.0.0"
+import sys as _sys
+import types as _types
+from importlib import import_module as _import_module
+from typing import TYPE_CHECKING
 
-del importlib
+if TYPE_CHECKING:
+    from . import validators
+    from .batch import validate_many
+    from .hdf5 import read_hdf5
+    from .index import TreeIndex
+    from .io import compute_checksum, make_fileinfo
+    from .json import read_json
+    from .snapshot import SnapshotCache
+    from .stream import validate_stream
+    from .transformations import TransformationGraph
+    from .tree import Dataset, Group, iter_tree, unroll_tree
+    from .validate import (
+        Validator,
+        Violation,
+        has_violations,
+        report,
+        revalidate,
+        validate,
+    )
+
+_attributes = {
+    "Dataset": "tree",
+    "Group": "tree",
+    "SnapshotCache": "snapshot",
+    "TransformationGraph": "transformations",
+    "TreeIndex": "index",
+    "Validator": "validate",
+    "Violation": "validate",
+    "compute_checksum": "io",
+    "has_violations": "validate",
+    "iter_tree": "tree",
+    "make_fileinfo": "io",
+    "read_hdf5": "hdf5",
+    "read_json": "json",
+    "report": "validate",
+    "revalidate": "validate",
+    "unroll_tree": "tree",
+    "validate": "validate",
+    "validate_many": "batch",
+    "validate_stream": "stream",
+}
+
+_submodules = (
+    "batch",
+    "formatting",
+    "hdf5",
+    "index",
+    "io",
+    "json",
+    "parallel",
+    "server",
+    "snapshot",
+    "stream",
+    "table",
+    "transformations",
+    "tree",
+    "units",
+    "validate",
+    "validators",
+    "watch",
+)
+
+
+def __getattr__(name: str):
+    if name in _attributes:
+        value = getattr(_import_module(f".{_attributes[name]}", __name__), name)
+    elif name in _submodules:
+        value = _import_module(f".{name}", __name__)
+    elif name == "__version__":
+        import importlib.metadata
+
+        try:
+            value = importlib.metadata.version(__package__ or __name__)
+        except importlib.metadata.PackageNotFoundError:
+            value = "0.0.0"
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *_attributes, *_submodules, "__version__"})
+
+
+class _Package(_types.ModuleType):
+    def __setattr__(self, name: str, value) -> None:
+        # Importing the submodule 'chexus.validate' sets it as attribute of the
+        # package, which must not shadow the function 'validate'.
+        if name in _attributes and isinstance(value, _types.ModuleType):
+            return
+        super().__setattr__(name, value)
+
+
+_sys.modules[__name__].__class__ = _Package
 
-from . import validators
-from .hdf5 import read_hdf5
-from .io import compute_checksum, make_fileinfo
-from .json import read_json
-from .tree import Dataset, Group, unroll_tree
-from .validate import Validator, Violation, has_violations, report, validate
 
 __all__ = [
     "Dataset",
     "Group",
+    "SnapshotCache",
+    "TransformationGraph",
+    "TreeIndex",
     "Validator",
     "Violation",
     "compute_checksum",
     "has_violations",
+    "iter_tree",
     "make_fileinfo",
     "read_hdf5",
     "read_json",
     "report",
+    "revalidate",
     "unroll_tree",
     "validate",
+    "validate_many",
+    "validate_stream",
     "validators",
 ]
@@ -2,7 +2,12 @@
 # Copyright (c) 2023 Scipp contributors (https://github.com/scipp)
 # ruff: noqa: T201
 import argparse
+import glob
+import importlib.util
+import json
+import os
 import sys
+import time
 
 import chexus
 
@@ -17,15 +22,216 @@ def _is_text_file(path: str) -> bool:
         return False
 
 
+def _file_access_options(args: argparse.Namespace) -> dict:
+    """Options for h5py.File that were set on the command line"""
+    options = {
+        name: getattr(args, name)
+        for name in ("driver", "rdcc_nbytes", "rdcc_nslots", "rdcc_w0", "page_buf_size")
+        if getattr(args, name) is not None
+    }
+    if args.no_locking:
+        options["locking"] = False
+    return options
+
+
+def _read_root(read, *args, **kwargs):
+    """Call a reader, exit with an error if the root path is missing or no group"""
+    try:
+        return read(*args, **kwargs)
+    except (KeyError, ValueError) as error:
+        sys.exit(f"Error: {error.args[0]}")
+
+
+def _follow(group, results, interval: float) -> None:
+    """Validate nodes that changed every ``interval`` seconds until interrupted"""
+    try:
+        while True:
+            time.sleep(interval)
+            if changed := chexus.hdf5.refresh(group):
+                chexus.revalidate(results, changed)
+                print(chexus.report(results=results))
+    except KeyboardInterrupt:
+        pass
+
+
+def _finish(args: argparse.Namespace, path: str, results) -> None:
+    """Print file info and exit with a non-zero code if requested and failed"""
+    print(chexus.make_fileinfo(path))
+    if args.checksums:
+        print(chexus.compute_checksum(path))
+    if args.exit_on_fail and chexus.has_violations(results):
+        print("Validation has failed")
+        sys.exit(1)
+
+
+def _has_scipp(ignore_missing: bool) -> bool:
+    """Check if scipp is installed, exit with an error if required"""
+    # Only look for scipp, it is imported by the validators that need it.
+    if importlib.util.find_spec("scipp") is None:
+        if not ignore_missing:
+            print(
+                "Error: Scipp was not found. The Nexus file validation was not run.\n"
+                "To run the full test suite you need to install scipp"
+                " using `pip install scipp` or `conda install -c scipp scipp`."
+                " This is recommended.\n"
+                "To check units only with the built-in parser and ignore this"
+                " error add the flag `--ignore-missing`."
+            )
+            sys.exit(1)
+        return False
+    return True
+
+
+def _worker_options(args: argparse.Namespace, has_scipp: bool) -> dict:
+    """Options for validating files in worker processes"""
+    options = {
+        "preload": ("scipp",) if has_scipp else (),
+        "root_path": args.root_path or None,
+        "columnar": args.columnar,
+        "stream": args.stream,
+        "swmr": args.swmr,
+        "profile": args.access_profile,
+        **_file_access_options(args),
+    }
+    if args.cache_dir is not None:
+        options["cache"] = chexus.SnapshotCache(
+            args.cache_dir, max_bytes=args.cache_size
+        )
+    return options
+
+
+def _print_result(result) -> None:
+    """Print status and violations of a file validated in a worker process"""
+    print(chexus.batch.format_result(result.to_dict()), flush=True)
+
+
+def _validate_batch(args: argparse.Namespace, validators, has_scipp: bool) -> None:
+    """Validate several files in worker processes and print a summary"""
+    batch = chexus.validate_many(
+        args.path,
+        validators,
+        jobs=args.jobs,
+        timeout=args.timeout,
+        memory_limit=args.memory_limit,
+        callback=_print_result,
+        **_worker_options(args, has_scipp),
+    )
+    print()
+    print(batch.format_summary())
+    if args.exit_on_fail and not batch.ok:
+        print("Validation has failed")
+        sys.exit(1)
+
+
+def _watch(args: argparse.Namespace, validators, has_scipp: bool) -> None:
+    """Validate files written to a directory until interrupted"""
+    from chexus.watch import open_sink, watch
+
+    callback = _print_result
+    if args.output is not None:
+        sink = open_sink(args.output)
+
+        def callback(result) -> None:
+            sink.write(json.dumps(result.to_dict()) + "\n")
+            sink.flush()
+
+    try:
+        watch(
+            args.watch,
+            validators,
+            callback,
+            jobs=args.jobs,
+            timeout=args.timeout,
+            memory_limit=args.memory_limit,
+            use_inotify=not args.poll,
+            **_worker_options(args, has_scipp),
+        )
+    except KeyboardInterrupt:
+        pass
+
+
+def _submit(args: argparse.Namespace) -> None:
+    """Validate files with a daemon started with 'chexus serve'"""
+    from chexus.batch import find_files, format_result, format_summary
+    from chexus.server import submit
+
+    results = submit(
+        args.server,
+        find_files(args.path),
+        callback=lambda result: print(format_result(result), flush=True),
+    )
+    print()
+    print(format_summary(results))
+    if args.exit_on_fail and any(r["status"] != "passed" for r in results):
+        print("Validation has failed")
+        sys.exit(1)
+
+
+def _serve(argv: list[str]) -> None:
+    """Run the validation daemon until interrupted"""
+    parser = argparse.ArgumentParser(
+        prog="chexus serve",
+        description="Validate NeXus files submitted with 'chexus --server SOCKET' "
+        "in a pool of worker processes that keep the validators loaded.",
+    )
+    parser.add_argument("socket", help="Path of the Unix domain socket to listen on")
+    parser.add_argument(
+        "--ignore-missing",
+        action="store_true",
+        help="Run without scipp. Units that the built-in parser does not "
+        "support are reported as invalid",
+    )
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=1, help="Number of worker processes"
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        metavar="SECONDS",
+        help="Maximum time for validating each file",
+    )
+    parser.add_argument(
+        "--memory-limit",
+        type=int,
+        metavar="BYTES",
+        help="Maximum address space of each worker process",
+    )
+    args = parser.parse_args(argv)
+    has_scipp = _has_scipp(args.ignore_missing)
+    from chexus.server import serve
+
+    try:
+        serve(
+            args.socket,
+            chexus.validators.base_validators(has_scipp=has_scipp),
+            jobs=args.jobs,
+            timeout=args.timeout,
+            memory_limit=args.memory_limit,
+            preload=("scipp",) if has_scipp else (),
+        )
+    except KeyboardInterrupt:
+        pass
+
+
 def main():
-    parser = argparse.ArgumentParser(description="Validate NeXus files.")
+    # A file named 'serve' in the working directory is validated instead.
+    if sys.argv[1:2] == ["serve"] and not os.path.exists("serve"):
+        _serve(sys.argv[2:])
+        return
+    parser = argparse.ArgumentParser(
+        description="Validate NeXus files.",
+        epilog="commands:\n"
+        "  serve SOCKET  Run the validation daemon, see 'chexus serve --help'",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
     parser.add_argument(
         "--checksums", action="store_true", help="Compute and print checksums"
     )
     parser.add_argument(
         "--ignore-missing",
         action="store_true",
-        help="Skip the validators that have missing dependencies",
+        help="Run without scipp. Units that the built-in parser does not "
+        "support are reported as invalid",
     )
     # Add argument to return bad exit code if validation fails
     parser.add_argument(
@@ -40,51 +246,235 @@ def main():
         help="Path to the top-level group to validate",
         default="",
     )
-    parser.add_argument("path", help="Input file")
+    parser.add_argument(
+        "--swmr",
+        action="store_true",
+        help="Open the HDF5 file in SWMR mode, for files that are still being written",
+    )
+    parser.add_argument(
+        "--follow",
+        type=float,
+        metavar="SECONDS",
+        help="Keep validating a file that is being written in SWMR mode every "
+        "SECONDS, until interrupted. Only datasets that grew are validated again. "
+        "Implies --swmr",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help="Directory for caching metadata snapshots of HDF5 files. Files that "
+        "have been validated before are not crawled again unless they changed",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=1024**3,
+        help="Maximum total size of the metadata snapshots in bytes. The least "
+        "recently used snapshots are removed first (default: 1 GiB)",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of processes. Subtrees such as NXentry and NXdetector groups "
+        "are validated in parallel, each process reading its part of the file. "
+        "The output is the same as for a single process. With several files, "
+        "the number of files that are validated in parallel (default: 1)",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        metavar="SECONDS",
+        help="With several files, the maximum time for validating each file. "
+        "Files that take longer are reported as 'timeout'",
+    )
+    parser.add_argument(
+        "--memory-limit",
+        type=int,
+        metavar="BYTES",
+        help="With several files, the maximum address space of each worker "
+        "process. Files that exceed it are reported as 'error'",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Validate nodes while reading the file instead of reading the whole "
+        "tree first. Memory is bounded by the depth and width of the tree instead "
+        "of the number of objects. Not compatible with --follow, --cache-dir, "
+        "--columnar, and --jobs",
+    )
+    parser.add_argument(
+        "--columnar",
+        action="store_true",
+        help="Evaluate simple validators on a columnar table of the tree instead of "
+        "one node at a time. Faster for files with many nodes",
+    )
+    access = parser.add_argument_group(
+        "HDF5 file access", "Tuning options forwarded to h5py.File"
+    )
+    access.add_argument(
+        "--access-profile",
+        choices=list(chexus.io.FILE_ACCESS_PROFILES),
+        help="Set of file-access options for the access pattern. 'metadata-crawl' "
+        "is best for validating structure, 'bulk-data' for validators that read "
+        "large datasets. Other options in this group take precedence",
+    )
+    access.add_argument("--driver", help="HDF5 file driver, e.g., 'sec2' or 'stdio'")
+    access.add_argument(
+        "--rdcc-nbytes", type=int, help="Chunk cache size per dataset in bytes"
+    )
+    access.add_argument(
+        "--rdcc-nslots", type=int, help="Number of chunk slots in the chunk cache"
+    )
+    access.add_argument(
+        "--rdcc-w0", type=float, help="Chunk cache preemption policy (0 to 1)"
+    )
+    access.add_argument(
+        "--page-buf-size",
+        type=int,
+        help="Page buffer size in bytes, for files written with paged file-space "
+        "strategy",
+    )
+    access.add_argument(
+        "--no-locking", action="store_true", help="Disable HDF5 file locking"
+    )
+    watching = parser.add_argument_group(
+        "Watch mode", "Validate files as soon as they have been written"
+    )
+    watching.add_argument(
+        "--watch",
+        metavar="DIR",
+        help="Validate HDF5 and JSON files that are written to DIR or its "
+        "subdirectories once the writer closed them, until interrupted. Uses "
+        "--jobs worker processes, --timeout, and --memory-limit like for "
+        "several files",
+    )
+    watching.add_argument(
+        "--poll",
+        action="store_true",
+        help="Scan the directory every second instead of using inotify, e.g., "
+        "for network filesystems",
+    )
+    watching.add_argument(
+        "--output",
+        metavar="PATH",
+        help="Append results as JSON lines to the file PATH, or send them to "
+        "the Unix domain socket PATH, instead of printing them",
+    )
+    parser.add_argument(
+        "--server",
+        metavar="SOCKET",
+        help="Send the files to the validation daemon started with "
+        "'chexus serve SOCKET' instead of validating them in this process. "
+        "Validation options are those of the daemon",
+    )
+    parser.add_argument(
+        "path",
+        nargs="*",
+        help="Input file. Several files, directories, and glob patterns are "
+        "validated in a pool of --jobs worker processes, followed by a summary",
+    )
     args = parser.parse_args()
-    path = args.path
+    if (args.watch is None) == (not args.path):
+        parser.error("Either a path or --watch is required")
+    if args.watch is None and (args.poll or args.output is not None):
+        parser.error("--poll and --output require --watch")
+    if args.server is not None:
+        if args.watch is not None:
+            parser.error("--server is not compatible with --watch")
+        _submit(args)
+        return
+    batch = args.watch is not None or (
+        len(args.path) > 1
+        or any(os.path.isdir(path) or glob.has_magic(path) for path in args.path)
+    )
+    if batch and (args.follow is not None or args.checksums):
+        parser.error("--follow and --checksums require a single file")
+    if not batch and (args.timeout is not None or args.memory_limit is not None):
+        parser.error("--timeout and --memory-limit require several files")
+    path = None if batch else args.path[0]
     ignore_missing = args.ignore_missing
+    if args.follow is not None and _is_text_file(path):
+        parser.error("--follow is only supported for HDF5 files")
+    if args.stream and (
+        args.follow is not None
+        or args.cache_dir is not None
+        or args.columnar
+        or (args.jobs > 1 and not batch)
+    ):
+        parser.error(
+            "--stream is not compatible with --follow, --cache-dir, --columnar, "
+            "and --jobs"
+        )
 
-    has_scipp = False
-    try:
-        import scipp  # noqa: F401
-    except ModuleNotFoundError:
-        if not ignore_missing:
-            print(
-                "Error: Scipp was not found. The Nexus file validation was not run.\n"
-                "To run the full test suite you need to install scipp"
-                " using `pip install scipp` or `conda install -c scipp scipp`."
-                " This is recommended.\n"
-                "To run only the tests that don't require scipp and ignore this"
-                " error add the flag `--ignore-missing`."
-            )
-            sys.exit(1)
-    else:
-        has_scipp = True
+    has_scipp = _has_scipp(ignore_missing)
+    validators = chexus.validators.base_validators(has_scipp=has_scipp)
 
+    if args.watch is not None:
+        _watch(args, validators, has_scipp)
+        return
+    if batch:
+        _validate_batch(args, validators, has_scipp)
+        return
+
+    if args.stream:
+        options = (
+            {}
+            if _is_text_file(path)
+            else {
+                "swmr": args.swmr,
+                "profile": args.access_profile,
+                **_file_access_options(args),
+            }
+        )
+        if args.root_path:
+            # Check the root path first, errors while validating are not caught.
+            if _is_text_file(path):
+                _read_root(chexus.read_json, path, root_path=args.root_path, lazy=True)
+            else:
+                reader = chexus.read_hdf5(
+                    path, root_path=args.root_path, lazy=True, **options
+                )
+                _read_root(next, reader)
+                reader.close()
+        results = chexus.validate_stream(
+            path, validators, root_path=args.root_path, **options
+        )
+        print(chexus.report(results=results))
+        _finish(args, path, results)
+        return
+
+    # Only the subtree at the root path is read (with its ancestors for resolving
+    # absolute paths), so validating a single group of a large file is cheap.
     if _is_text_file(path):
-        group = chexus.read_json(path)
+        group = _read_root(chexus.read_json, path, root_path=args.root_path)
     else:
         # File is closed when 'reader' goes out of scope.
         # We need to keep it open for lazily loading values.
-        reader = chexus.read_hdf5(path)
-        group = next(reader)
-
-    validators = chexus.validators.base_validators(has_scipp=has_scipp)
-
-    def skip_condition(node):
-        return not node.name.startswith(args.root_path)
+        swmr = args.swmr or args.follow is not None
+        reader = chexus.read_hdf5(
+            path,
+            root_path=args.root_path,
+            swmr=swmr,
+            profile=args.access_profile,
+            cache=None
+            if args.cache_dir is None
+            else chexus.SnapshotCache(args.cache_dir, max_bytes=args.cache_size),
+            **_file_access_options(args),
+        )
+        group = _read_root(next, reader)
 
     results = chexus.validate(
-        group, validators=validators, skip_condition=skip_condition
+        group,
+        validators=validators,
+        include_root=group.parent is not None,
+        columnar=args.columnar,
+        jobs=args.jobs,
     )
     print(chexus.report(results=results))
-    print(chexus.make_fileinfo(path))
-    if args.checksums:
-        print(chexus.compute_checksum(path))
-    if args.exit_on_fail and chexus.has_violations(results):
-        print("Validation has failed")
-        sys.exit(1)
+    if args.follow is not None:
+        _follow(group, results, interval=args.follow)
+    _finish(args, path, results)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,472 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2024 Scipp contributors (https://github.com/scipp)
+from __future__ import annotations
+
+import glob
+import importlib
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from multiprocessing.connection import Connection, wait
+from typing import TYPE_CHECKING, Any, Literal
+
+from .formatting import format_counts, format_violation
+from .io import is_hdf5
+
+if TYPE_CHECKING:
+    from .validate import ValidationResult, Validator
+
+FILE_SUFFIXES = ('.nxs', '.nx5', '.h5', '.hdf5', '.hdf', '.json')
+"""Files with these suffixes are validated when a directory is given"""
+
+
+@dataclass
+class FileResult:
+    """Outcome of validating one file with :func:`validate_many`"""
+
+    path: str
+    status: Literal['passed', 'failed', 'error', 'timeout']
+    """'error' if reading or validating the file raised, or the worker died"""
+    results: dict[type, ValidationResult] = field(default_factory=dict)
+    """Results as returned by :func:`chexus.validate`, empty unless validated"""
+    error: str | None = None
+    seconds: float = 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to a dict that can be serialized as JSON"""
+        return {
+            'path': self.path,
+            'status': self.status,
+            'error': self.error,
+            'seconds': self.seconds,
+            'validators': {
+                result.validator.name: {
+                    'checks': result.checks,
+                    'violations': [
+                        {'name': v.name, 'description': v.description}
+                        for v in result.violations
+                    ],
+                }
+                for result in self.results.values()
+            },
+        }
+
+
+@dataclass
+class BatchResult:
+    """Results of :func:`validate_many`, in the order of the files"""
+
+    files: list[FileResult]
+
+    def counts(self) -> dict[str, tuple[int, int]]:
+        """Number of violations and checks per validator, summed over all files"""
+        counts: dict[str, tuple[int, int]] = {}
+        for file in self.files:
+            for result in file.results.values():
+                fails, checks = counts.get(result.validator.name, (0, 0))
+                counts[result.validator.name] = (
+                    fails + result.fails,
+                    checks + result.checks,
+                )
+        return counts
+
+    def statuses(self) -> dict[str, int]:
+        """Number of files per status"""
+        statuses = dict.fromkeys(('passed', 'failed', 'error', 'timeout'), 0)
+        for file in self.files:
+            statuses[file.status] += 1
+        return statuses
+
+    @property
+    def ok(self) -> bool:
+        """True if all files have been validated without violations"""
+        return all(file.status == 'passed' for file in self.files)
+
+    def format_summary(self) -> str:
+        return format_summary([file.to_dict() for file in self.files])
+
+
+def format_result(result: dict[str, Any]) -> str:
+    """Format status and violations of a file, from :meth:`FileResult.to_dict`"""
+    lines = [f"{result['path']}: {result['status']} ({result['seconds']:.2f} s)"]
+    if result['error'] is not None:
+        lines.append(f"  {result['error']}")
+    for name, validation in result['validators'].items():
+        for violation in validation['violations']:
+            described = format_violation(violation['name'], violation['description'])
+            lines.append(f"  {name} @ {described}")
+    return '\n'.join(lines)
+
+
+def format_summary(results: list[dict[str, Any]]) -> str:
+    """Format violations per validator and files per status across files.
+
+    ``results`` are given as returned by :meth:`FileResult.to_dict`.
+    """
+    counts: dict[str, list[int]] = {}
+    statuses = dict.fromkeys(('passed', 'failed', 'error', 'timeout'), 0)
+    for result in results:
+        statuses[result['status']] += 1
+        for name, validation in result['validators'].items():
+            count = counts.setdefault(name, [0, 0])
+            count[0] += len(validation['violations'])
+            count[1] += validation['checks']
+    summary = format_counts(
+        (name, fails, checks) for name, (fails, checks) in counts.items()
+    )
+    summary += '\n'
+    summary += ', '.join(f"{count} {status}" for status, count in statuses.items())
+    return f"{summary} ({len(results)} files)"
+
+
+def find_files(patterns: Iterable[str]) -> list[str]:
+    """Expand files, directories, and glob patterns into a list of files.
+
+    Directories are searched recursively for files with one of the
+    :data:`FILE_SUFFIXES`. Glob patterns support ``**``. Files are listed once,
+    in the order in which they are first found. Paths that do not exist are kept,
+    so they are reported as errors.
+    """
+    files: dict[str, None] = {}
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = [pattern]
+        elif glob.has_magic(pattern):
+            matches = sorted(glob.glob(pattern, recursive=True))
+        else:
+            files[pattern] = None
+            continue
+        for match in matches:
+            if not os.path.isdir(match):
+                files[match] = None
+                continue
+            for root, dirs, names in os.walk(match):
+                dirs.sort()
+                for name in sorted(names):
+                    if name.endswith(FILE_SUFFIXES):
+                        files[os.path.join(root, name)] = None
+    return list(files)
+
+
+def validate_file(
+    path: str,
+    validators: list[Validator],
+    *,
+    root_path: str | None = None,
+    columnar: bool = False,
+    stream: bool = False,
+    **kwargs,
+) -> dict[type, ValidationResult]:
+    """Read and validate a HDF5 or JSON file, like the ``chexus`` command.
+
+    If ``root_path`` is given, the group at this path is validated including the
+    group itself. If ``stream`` is True, the file is validated with
+    :func:`chexus.validate_stream`. Other keyword arguments are forwarded to
+    :func:`chexus.read_hdf5` for HDF5 files.
+    """
+    # Only import what is needed, e.g., not h5py for JSON files.
+    from .json import read_json
+    from .stream import validate_stream
+    from .validate import validate
+
+    if not os.path.exists(path):
+        raise FileNotFoundError(path)
+    hdf5 = is_hdf5(path)
+    if stream:
+        return validate_stream(
+            path, validators, root_path=root_path, **(kwargs if hdf5 else {})
+        )
+    reader = None
+    try:
+        if hdf5:
+            from .hdf5 import read_hdf5
+
+            reader = read_hdf5(path, root_path=root_path, **kwargs)
+            group = next(reader)
+        else:
+            group = read_json(path, root_path=root_path)
+        return validate(
+            group,
+            validators,
+            include_root=group.parent is not None,
+            columnar=columnar,
+        )
+    finally:
+        if reader is not None:
+            reader.close()
+            from .hdf5 import close_files
+
+            close_files()
+
+
+def _worker(
+    conn: Connection,
+    validators: list[Validator],
+    memory_limit: int | None,
+    preload: tuple[str, ...],
+    options: dict[str, Any],
+) -> None:
+    """Validate the files received on ``conn`` until it is closed"""
+    for name in preload:
+        importlib.import_module(name)
+    if memory_limit is not None:
+        import resource
+
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+    conn.send(None)
+    while True:
+        try:
+            path = conn.recv()
+        except EOFError:
+            return
+        if path is None:
+            return
+        try:
+            results = validate_file(path, validators, **options)
+        except MemoryError:
+            # The state of the process is unknown, the pool starts a new one.
+            conn.send(('fatal', 'Memory limit exceeded'))
+            return
+        except Exception as error:
+            conn.send(('error', f"{type(error).__name__}: {error}"))
+        else:
+            conn.send(('ok', results))
+
+
+class _Worker:
+    """Worker process of a :class:`WorkerPool` and the file it is validating"""
+
+    def __init__(self, context: Any, args: tuple[Any, ...]) -> None:
+        self.conn, child = context.Pipe()
+        self.process = context.Process(target=_worker, args=(child, *args), daemon=True)
+        self.process.start()
+        child.close()
+        self.ready = False
+        self.path: str | None = None
+        self.started = 0.0
+
+    def submit(self, path: str) -> None:
+        self.conn.send(path)
+        self.path = path
+        self.started = time.monotonic()
+
+    def kill(self) -> None:
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+    def close(self) -> None:
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join(timeout=1)
+        if self.process.is_alive():
+            self.kill()
+        else:
+            self.conn.close()
+
+
+class WorkerPool:
+    """Pool of worker processes that validate files, see :func:`validate_many`.
+
+    Workers are started once and validate many files, so the cost of starting
+    Python and importing chexus and its dependencies is only paid once per
+    worker. Each worker validates one file at a time. A worker that exceeds the
+    ``timeout`` for a file is killed, and a worker that dies, e.g., after
+    exceeding ``memory_limit``, is replaced. The file is then reported as
+    'timeout' or 'error' and the remaining files are not affected.
+
+    ``memory_limit`` is the maximum size of the address space of a worker in
+    bytes. It is not supported on Windows. The modules named in ``preload``,
+    e.g., ``'scipp'`` for the unit validators, are imported when a worker
+    starts instead of when the first file needs them. Other keyword arguments
+    are forwarded to :func:`validate_file`.
+    """
+
+    def __init__(
+        self,
+        validators: list[Validator],
+        *,
+        jobs: int = 1,
+        timeout: float | None = None,
+        memory_limit: int | None = None,
+        preload: Iterable[str] = (),
+        **options,
+    ) -> None:
+        if jobs < 1:
+            raise ValueError("jobs must be at least 1")
+        if memory_limit is not None and sys.platform == 'win32':
+            raise ValueError("memory_limit is not supported on Windows")
+        self.jobs = jobs
+        self.timeout = timeout
+        self._args = (validators, memory_limit, tuple(preload), options)
+        self._context = multiprocessing.get_context('spawn')
+        self._workers: list[_Worker] = []
+        self._queue: deque[str] = deque()
+
+    @property
+    def pending(self) -> int:
+        """Number of files that have been submitted but have no result yet"""
+        return len(self._queue) + sum(w.path is not None for w in self._workers)
+
+    @property
+    def connections(self) -> list[Connection]:
+        """Connections to the workers, for waiting until :meth:`poll` has results"""
+        return [worker.conn for worker in self._workers]
+
+    def start(self) -> None:
+        """Start all workers now instead of when files are submitted"""
+        while len(self._workers) < self.jobs:
+            self._workers.append(_Worker(self._context, self._args))
+
+    def submit(self, path: str) -> None:
+        """Queue a file for validation, results are returned by :meth:`poll`"""
+        self._queue.append(path)
+        self._dispatch()
+
+    def poll(self, timeout: float | None = None) -> list[FileResult]:
+        """Wait for results for at most ``timeout`` seconds and return them.
+
+        Returns as soon as there are any results, or immediately if no files
+        are pending.
+        """
+        end = None if timeout is None else time.monotonic() + timeout
+        while True:
+            done = self._collect(end if self.pending else time.monotonic())
+            if done or not self.pending:
+                return done
+            if end is not None and time.monotonic() >= end:
+                return done
+
+    def close(self) -> None:
+        """Stop the workers, results of pending files are lost"""
+        self._queue.clear()
+        for worker in self._workers:
+            if worker.path is not None:
+                worker.kill()
+            else:
+                worker.close()
+        self._workers = []
+
+    def _dispatch(self) -> None:
+        while self._queue and len(self._workers) < self.jobs:
+            self._workers.append(_Worker(self._context, self._args))
+        for worker in self._workers:
+            if not self._queue:
+                return
+            if worker.ready and worker.path is None:
+                worker.submit(self._queue.popleft())
+
+    def _collect(self, end: float | None) -> list[FileResult]:
+        # Wait until a worker sends a message or the earliest deadline.
+        deadlines = [] if end is None else [end]
+        if self.timeout is not None:
+            deadlines += [
+                w.started + self.timeout for w in self._workers if w.path is not None
+            ]
+        wait_for = None if not deadlines else max(0, min(deadlines) - time.monotonic())
+        ready = wait([w.conn for w in self._workers], timeout=wait_for)
+        done = []
+        now = time.monotonic()
+        for i, worker in enumerate(self._workers):
+            if worker.conn in ready:
+                try:
+                    message = worker.conn.recv()
+                except (EOFError, OSError):
+                    worker.process.join()
+                    worker.conn.close()
+                    code = worker.process.exitcode
+                    message = ('error', f"Worker process died (exit code {code})")
+                    self._workers[i] = _Worker(self._context, self._args)
+                    if not worker.ready:
+                        raise RuntimeError("Worker process failed to start") from None
+                if not worker.ready:
+                    worker.ready = True
+                elif worker.path is not None:
+                    done.append(self._result(worker, *message, now))
+                    worker.path = None
+                    if message[0] == 'fatal':
+                        worker.close()
+                        self._workers[i] = _Worker(self._context, self._args)
+            elif (
+                self.timeout is not None
+                and worker.path is not None
+                and now >= worker.started + self.timeout
+            ):
+                worker.kill()
+                done.append(
+                    FileResult(
+                        worker.path,
+                        'timeout',
+                        error=f"Timed out after {self.timeout} s",
+                        seconds=now - worker.started,
+                    )
+                )
+                self._workers[i] = _Worker(self._context, self._args)
+        self._dispatch()
+        return done
+
+    def _result(
+        self, worker: _Worker, status: str, payload: Any, now: float
+    ) -> FileResult:
+        seconds = now - worker.started
+        if status in ('error', 'fatal'):
+            return FileResult(worker.path, 'error', error=payload, seconds=seconds)
+        failed = any(result.fails for result in payload.values())
+        return FileResult(
+            worker.path,
+            'failed' if failed else 'passed',
+            results=payload,
+            seconds=seconds,
+        )
+
+
+def validate_many(
+    paths: Iterable[str],
+    validators: list[Validator],
+    *,
+    jobs: int = 1,
+    timeout: float | None = None,
+    memory_limit: int | None = None,
+    callback: Callable[[FileResult], None] | None = None,
+    **kwargs,
+) -> BatchResult:
+    """Validate many files in a pool of ``jobs`` worker processes.
+
+    ``paths`` may contain files, directories, and glob patterns, see
+    :func:`find_files`. Files are validated like with the ``chexus`` command,
+    keyword arguments such as ``root_path``, ``columnar``, ``stream`` and options
+    of :func:`chexus.read_hdf5` are forwarded to :func:`validate_file`.
+
+    Each file must be validated within ``timeout`` seconds and a worker may use
+    at most ``memory_limit`` bytes of address space, see :class:`WorkerPool`.
+    Files that fail to validate, time out, or crash their worker are reported
+    with status 'error' or 'timeout', the other files are not affected.
+
+    ``callback`` is called with the result of each file as soon as it is
+    available, results may arrive in any order. The returned results are in
+    the order of the files.
+
+    Validators must be picklable.
+    """
+    files = find_files(paths)
+    results: dict[str, FileResult] = {}
+    pool = WorkerPool(
+        validators, jobs=jobs, timeout=timeout, memory_limit=memory_limit, **kwargs
+    )
+    try:
+        for path in files:
+            pool.submit(path)
+        while pool.pending:
+            for result in pool.poll():
+                results[result.path] = result
+                if callback is not None:
+                    callback(result)
+    finally:
+        pool.close()
+    return BatchResult([results[path] for path in files])
@@ -0,0 +1,31 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2024 Scipp contributors (https://github.com/scipp)
+"""Text output of validation results.
+
+Shared by :func:`chexus.report` and the results of :mod:`chexus.batch`, which are
+formatted from dicts that were sent by worker processes. This does not import
+NumPy or h5py, so the CLI can print results without loading them.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+
+
+def format_violation(name: str, description: str | None) -> str:
+    """Format a violation by the node ``name``, see :meth:`chexus.Violation.format`"""
+    return f"{name} ({description})" if description is not None else name
+
+
+def format_counts(counts: Iterable[tuple[str, int, int]]) -> str:
+    """Format a summary of ``(validator, fails, checks)`` with the totals"""
+    summary = 'Summary\n-------\n'
+    total_checks = 0
+    total_violations = 0
+    for validator, fails, checks in counts:
+        total_checks += checks
+        total_violations += fails
+        summary += f"{validator}: {fails}/{checks}\n"
+    summary += '\n'
+    summary += f"Total: {total_violations}/{total_checks}"
+    return summary
@@ -1,50 +1,794 @@
 # SPDX-License-Identifier: BSD-3-Clause
 # Copyright (c) 2023 Scipp contributors (https://github.com/scipp)
-from collections.abc import Iterator
-from typing import Any
+from __future__ import annotations
+
+import os
+import weakref
+from collections.abc import Iterator, MutableMapping
+from dataclasses import dataclass
+from typing import Any, Literal
 
 import h5py
+import numpy as np
+from h5py import h5a, h5d, h5l, h5o
+
+from .io import FILE_ACCESS_PROFILES
+from .snapshot import SnapshotCache
+from .tree import (
+    EMPTY,
+    Dataset,
+    Group,
+    LazyDict,
+    TreeSource,
+    iter_tree,
+    register_source,
+)
+
+
+def read_hdf5(
+    path: str,
+    *,
+    root_path: str | None = None,
+    lazy: bool = False,
+    backend: Literal['highlevel', 'lowlevel'] = 'highlevel',
+    profile: str | None = None,
+    cache: SnapshotCache | None = None,
+    **kwargs,
+) -> Iterator[Group]:
+    """Read HDF5 file and return tree of datasets and groups
+
+    If ``root_path`` is given, only the group at this path and its subtree are
+    read, and that group is returned. Its ancestors are available through the
+    ``parent`` links, but they are read lazily, so only the parts of the file that
+    are actually accessed, e.g., when resolving absolute ``depends_on`` targets,
+    are read.
+
+    If ``lazy`` is True, the children of a group are only read from the file when
+    first accessed. Subtrees that are never accessed are never read.
+
+    Attributes are always loaded lazily: listing their names is cheap, but values
+    are only read from the file (and decoded) when accessed.
+
+    ``backend`` selects how the tree is read. ``'highlevel'`` walks the file with
+    h5py's high-level API. ``'lowlevel'`` collects object and link info in a single
+    traversal using h5py's low-level API, which is considerably faster for files
+    with many small groups. The resulting tree is the same. The low-level backend
+    always reads eagerly and does not support ``lazy``.
 
-from .tree import Dataset, Group
+    ``profile`` selects a set of file-access options from
+    :data:`FILE_ACCESS_PROFILES`. Other keyword arguments are forwarded to
+    ``h5py.File`` and take precedence over the profile. Useful options are the
+    chunk cache (``rdcc_nbytes``, ``rdcc_nslots``, ``rdcc_w0``), ``page_buf_size``
+    for files written with paged file-space strategy, ``driver``, and ``locking``.
 
+    If a :class:`chexus.SnapshotCache` is given as ``cache``, the tree is restored
+    from a snapshot of the file's metadata if there is one, without reading the
+    metadata from the file. Datasets are only opened when their values are read.
+    Otherwise, the tree is read eagerly and a snapshot is stored. Snapshots are
+    made for each ``root_path`` and only cover its subtree. This does not support
+    ``lazy``.
 
-def read_hdf5(path: str, **kwargs) -> Iterator[Group]:
-    """Read HDF5 file and return tree of datasets and groups"""
+    Datasets, attributes, and lazily read children only refer to the file by
+    path, so the tree can be pickled without reading from the file and sent to
+    other processes. Values of datasets and attributes, and children that have
+    not been loaded, can still be read after the reader is closed or in another
+    process, the file is then opened again, see :func:`chexus.hdf5.close_files`.
+    """
+    if backend not in ('highlevel', 'lowlevel'):
+        raise ValueError(f"Unknown backend: {backend}")
+    if lazy and backend == 'lowlevel':
+        raise ValueError("The lowlevel backend does not support lazy=True")
+    if lazy and cache is not None:
+        raise ValueError("Reading from a snapshot cache does not support lazy=True")
+    if profile is not None:
+        if profile not in FILE_ACCESS_PROFILES:
+            raise ValueError(f"Unknown file access profile: {profile}")
+        kwargs = {**FILE_ACCESS_PROFILES[profile], **kwargs}
+    spec = _FileSpec(os.path.abspath(path), kwargs)
     with h5py.File(path, "r", **kwargs) as f:
-        yield _read_group(f)
+        if cache is None:
+            group = _read_subtree(
+                f, root_path=root_path, lazy=lazy, backend=backend, spec=spec
+            )
+        else:
+            group = _read_cached(
+                f,
+                path=path,
+                cache=cache,
+                root_path=root_path,
+                backend=backend,
+                spec=spec,
+            )
+        register_source(
+            group,
+            TreeSource(
+                'hdf5',
+                path,
+                {'lazy': lazy, 'backend': backend, 'cache': cache, **kwargs},
+            ),
+        )
+        yield group
+
+
+def _read_cached(
+    f: h5py.File,
+    path: str,
+    cache: SnapshotCache,
+    root_path: str | None,
+    backend: str,
+    spec: _FileSpec,
+) -> Group:
+    """Read tree from snapshot if possible, else read it and store a snapshot
+
+    Snapshots only cover the subtree at ``root_path``, its ancestors are read
+    lazily from the file as in :func:`_read_subtree`.
+    """
+    names = [name for name in (root_path or '').split('/') if name]
+    key = '/' + '/'.join(names)
+    if (snapshot := cache.load(path, root_path=key)) is None:
+        group = _read_subtree(
+            f, root_path=root_path, lazy=False, backend=backend, spec=spec
+        )
+        cache.store(path, _make_snapshot(group), root_path=key)
+        return group
+    if not names:
+        return _from_snapshot(snapshot, spec=spec)
+    parent = _read_subtree(
+        f, root_path='/'.join(names[:-1]), lazy=True, backend='highlevel', spec=spec
+    )
+    group = _from_snapshot(snapshot, spec=spec, parent=parent)
+    parent.children[names[-1]] = group
+    return group
+
+
+def _make_snapshot(group: Group) -> list[tuple[Any, ...]]:
+    """Make snapshot of tree for :class:`chexus.SnapshotCache`
+
+    The snapshot lists one record for every node, parents before children.
+    Hard-linked datasets have the same address.
+    """
+    snapshot = [(Group, group.name, dict(group.attrs), None, None, None)]
+    for node in iter_tree(group):
+        if isinstance(node, Group):
+            snapshot.append((Group, node.name, dict(node.attrs), None, None, None))
+            continue
+        snapshot.append(
+            (
+                Dataset,
+                node.name,
+                dict(node.attrs),
+                node.shape,
+                node.dtype,
+                node.dataset.addr,
+            )
+        )
+    return snapshot
+
+
+def _from_snapshot(
+    snapshot: list[tuple[Any, ...]], spec: _FileSpec, parent: Group | None = None
+) -> Group:
+    """Restore tree from snapshot made by :func:`_make_snapshot`"""
+    _, name, attrs, *_ = snapshot[0]
+    root = Group(name=name, attrs=attrs or EMPTY, children=EMPTY, parent=parent)
+    groups = {name: root}
+    records = {}
+    for kind, name, attrs, shape, dtype, addr in snapshot[1:]:
+        parent_name, _, basename = name.rpartition('/')
+        parent = groups[parent_name or '/']
+        if kind is Group:
+            node = Group(name=name, attrs=attrs or EMPTY, children=EMPTY, parent=parent)
+            groups[name] = node
+        elif (first := records.get(addr)) is not None:
+            node = _alias(first, name=name, parent=parent)
+        else:
+            node = Dataset(
+                name=name,
+                shape=shape,
+                dtype=_intern_dtype(dtype),
+                attrs=attrs or EMPTY,
+                parent=parent,
+                dataset=_DatasetHandle(spec, name, addr),
+            )
+            records[addr] = node
+        parent.children[basename] = node
+    return root
+
+
+# dtype objects made by h5py are not shared, so we share them. Equality of dtypes
+# ignores metadata, which h5py uses for special types such as variable-length
+# strings, so the metadata is part of the key.
+_dtypes: dict[tuple[np.dtype, str], np.dtype] = {}
+
+
+def _intern_dtype(dtype: np.dtype) -> np.dtype:
+    return _dtypes.setdefault((dtype, repr(dtype.metadata)), dtype)
+
+
+def _read_subtree(
+    f: h5py.File,
+    root_path: str | None,
+    lazy: bool,
+    backend: str,
+    spec: _FileSpec,
+) -> Group:
+    """Read the group at ``root_path`` including lazily loaded ancestors"""
+    # Datasets by object address. Datasets that are hard-linked into several
+    # places share the h5py dataset and attributes of the first one we read.
+    # Lazily read subtrees may be unloaded again, see chexus.validate_stream, so
+    # we must not keep their datasets alive.
+    records: MutableMapping[int, Dataset] = (
+        weakref.WeakValueDictionary() if lazy else {}
+    )
+    names = [name for name in (root_path or '').split('/') if name]
+    if not names:
+        if backend == 'lowlevel':
+            return _crawl_group(f, records=records, spec=spec)
+        return _read_group(f, lazy=lazy, records=records, spec=spec)
+    group = f
+    parent = _read_group(f, lazy=True, records=records, spec=spec)
+    for i, name in enumerate(names):
+        if name not in group:
+            raise KeyError(f"Root path {root_path} not found")
+        group = group[name]
+        if not isinstance(group, h5py.Group):
+            raise ValueError(f"Root path {root_path} is not a group")
+        if i == len(names) - 1 and backend == 'lowlevel':
+            child = _crawl_group(group, parent=parent, records=records, spec=spec)
+        else:
+            is_root = i == len(names) - 1
+            child = _read_group(
+                group,
+                parent=parent,
+                lazy=lazy if is_root else True,
+                records=records,
+                spec=spec,
+            )
+        # Make sure the ancestors refer to the same node object.
+        parent.children[name] = child
+        parent = child
+    return parent
+
+
+def refresh(group: Group) -> list[Dataset | Group]:
+    """Refresh the datasets of a tree read from a file opened in SWMR mode.
+
+    Use ``read_hdf5(path, swmr=True)`` to open a file that is being written in
+    SWMR mode. In SWMR mode, the writer cannot add groups, datasets, or attributes,
+    but datasets can grow. This updates the shapes of the datasets below ``group``
+    that can grow, i.e., datasets with a ``maxshape`` larger than their shape.
+
+    Only growth is detected. Values that the writer rewrites in place, without
+    changing the shape, are not read again, so nodes with such values are not
+    returned and are not revalidated by :func:`chexus.revalidate`.
+
+    Returns
+    -------
+    :
+        The nodes whose validation results may have changed: Datasets that grew,
+        their parent groups, and the sibling groups, since validators of groups
+        may read the values of datasets in the parent group.
+    """
+    changed = {}
+    refreshed = set()
+    for node in iter_tree(group):
+        if not isinstance(node, Dataset) or not _can_grow(node):
+            continue
+        if id(node.dataset) not in refreshed:
+            refreshed.add(id(node.dataset))
+            node.dataset.refresh()
+        if node.shape == (shape := node.dataset.shape):
+            continue
+        node.shape = shape
+        changed[node.name] = node
+        changed[node.parent.name] = node.parent
+        for sibling in node.parent.children.values():
+            if isinstance(sibling, Group):
+                changed[sibling.name] = sibling
+    return list(changed.values())
+
+
+def _can_grow(node: Dataset) -> bool:
+    if node.dataset is None or (maxshape := node.dataset.maxshape) is None:
+        return False
+    return any(m is None or m > n for m, n in zip(maxshape, node.shape, strict=True))
+
+
+class _Dataset(h5py.Dataset):
+    """h5py dataset that reads from a memory map of the file where possible
+
+    Numeric datasets with contiguous layout are stored as a plain array in the
+    file, at the dataset's offset. Reading them through a read-only
+    ``numpy.memmap`` avoids copying the data, which is served from the page cache
+    instead. The memory map is created on first read, so reading the tree
+    does not pay for checking the layout.
+    """
+
+    _view: np.memmap | None
+
+    def __getitem__(self, args: Any, new_dtype: Any = None) -> Any:
+        if new_dtype is None and (view := self._memmap()) is not None:
+            return view[args]
+        return super().__getitem__(args, new_dtype=new_dtype)
+
+    def _memmap(self) -> np.memmap | None:
+        try:
+            return self._view
+        except AttributeError:
+            self._view = _make_memmap(self)
+            return self._view
+
+
+@dataclass(frozen=True, eq=False)
+class _FileSpec:
+    """How to open a file again: absolute path and options for ``h5py.File``"""
+
+    path: str
+    options: dict[str, Any]
+
+    @property
+    def key(self) -> tuple[str, str]:
+        return self.path, repr(sorted(self.options.items()))
+
+
+class _FilePool:
+    """Files opened by :class:`_DatasetHandle`, one per file and set of options
+
+    Files are opened on first use and stay open until :func:`close_files` is
+    called. HDF5 file handles cannot be shared between processes, so the pool is
+    emptied when it is first used in a forked child process.
+    """
+
+    def __init__(self) -> None:
+        self._files: dict[tuple[str, str], h5py.File] = {}
+        self._pid = os.getpid()
+
+    def get(self, spec: _FileSpec) -> h5py.File:
+        if self._pid != os.getpid():
+            # Closing the inherited handles would close them in the parent.
+            self._files = {}
+            self._pid = os.getpid()
+        file = self._files.get(spec.key)
+        if file is None or not file.id.valid:
+            file = h5py.File(spec.path, 'r', **spec.options)
+            self._files[spec.key] = file
+        return file
+
+    def close(self) -> None:
+        files, self._files = self._files, {}
+        if self._pid == os.getpid():
+            for file in files.values():
+                file.close()
+
+
+_file_pool = _FilePool()
+
+
+def close_files() -> None:
+    """Close the files that were opened to read values of datasets.
+
+    Datasets of trees returned by :func:`chexus.read_hdf5` can read their values
+    after the reader has been closed, or in another process after pickling, as
+    can attributes and lazily read children. The file is then opened again, and
+    kept open for reading other datasets of the same file, until this is called.
+    """
+    _file_pool.close()
+
+
+class _DatasetHandle:
+    """Stands in for an h5py dataset, which is opened again when needed
+
+    The handle stores the file, the path, and the address of the dataset in the
+    file. While the file that the tree was read from is open, the handle uses the
+    h5py dataset that was read, if any. Otherwise, e.g., for trees restored from
+    a snapshot, after the reader has been closed, or after unpickling, the file
+    is opened through a per-process pool of files. The address is used to check
+    that the path still refers to the same dataset. Pickling only stores the
+    path and address, so trees are cheap to send to other processes.
+    """
+
+    __slots__ = ('__weakref__', '_dataset', 'addr', 'name', 'spec')
+
+    def __init__(
+        self,
+        spec: _FileSpec,
+        name: str,
+        addr: int,
+        dataset: _Dataset | None = None,
+    ) -> None:
+        self.spec = spec
+        self.name = name
+        self.addr = addr
+        self._dataset = dataset
+
+    def _open(self) -> _Dataset:
+        dataset = self._dataset
+        if dataset is None or not dataset.id.valid:
+            dataset = _Dataset(_file_pool.get(self.spec)[self.name].id)
+            if h5o.get_info(dataset.id).addr != self.addr:
+                raise ValueError(
+                    f"{self.name} in {self.spec.path} is not the dataset that was "
+                    "read, the file has been modified"
+                )
+            self._dataset = dataset
+        return dataset
 
+    def __getattr__(self, name: str) -> Any:
+        if name in _DatasetHandle.__slots__:
+            # Not set yet, e.g., while unpickling
+            raise AttributeError(name)
+        return getattr(self._open(), name)
 
-def _read_attrs(node: h5py.Dataset | h5py.Group) -> dict[str, Any]:
-    """Read HDF5 attributes"""
-    attrs = dict(node.attrs)
+    def __getitem__(self, args: Any) -> Any:
+        return self._open()[args]
+
+    def __getstate__(self) -> tuple[_FileSpec, str, int]:
+        return self.spec, self.name, self.addr
+
+    def __setstate__(self, state: tuple[_FileSpec, str, int]) -> None:
+        self.spec, self.name, self.addr = state
+        self._dataset = None
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.spec.path!r}, {self.name!r})"
+
+
+def _make_memmap(dataset: h5py.Dataset) -> np.memmap | None:
+    """Return read-only memory map of a contiguous, unfiltered dataset"""
+    dtype = dataset.dtype
+    if dtype.kind not in 'biufc' or dtype.hasobject or dataset.size == 0:
+        return None
+    if dataset.file.driver not in ('sec2', 'stdio'):
+        return None
+    dcpl = dataset.id.get_create_plist()
+    if dcpl.get_layout() != h5d.CONTIGUOUS or dcpl.get_external_count() != 0:
+        return None
+    offset = dataset.id.get_offset()
+    if offset is None or dataset.id.get_storage_size() != dataset.nbytes:
+        # Not allocated, e.g., no values have been written
+        return None
+    return np.memmap(
+        dataset.file.filename,
+        dtype=dtype,
+        mode='r',
+        offset=offset,
+        shape=dataset.shape,
+    )
+
+
+class _Attrs(MutableMapping):
+    """HDF5 attributes that are read from the file only when accessed
+
+    The attribute names are listed when the node is read, so listing them (and
+    checking if an attribute exists) does not access the file. Values are read
+    and decoded individually on first access and then cached, so large
+    attributes that are never accessed are never read. Like
+    :class:`_DatasetHandle`, values are read from the object that was read while
+    the file is open, and otherwise through the pool of files. Pickling only
+    stores the file spec, the path, the names, and values that were set, so
+    values are read after unpickling, when accessed.
+    """
+
+    __slots__ = ('_assigned', '_names', '_node', '_path', '_spec', '_values')
+
+    def __init__(
+        self, spec: _FileSpec, path: str, node: h5py.Dataset | h5py.Group
+    ) -> None:
+        self._spec = spec
+        self._path = path
+        self._node = node
+        names = []
+        h5a.iterate(node.id, names.append)
+        self._names = dict.fromkeys(name.decode() for name in names)
+        self._values: dict[str, Any] | None = None
+        # Names of values that were set rather than read from the file
+        self._assigned: set[str] | None = None
+
+    def _open(self) -> h5py.Dataset | h5py.Group:
+        node = self._node
+        if node is None or not node.id.valid:
+            node = _file_pool.get(self._spec)[self._path]
+            self._node = node
+        return node
+
+    def __getitem__(self, key: str) -> Any:
+        if self._values is None:
+            self._values = {}
+        if key not in self._values:
+            if key not in self._names:
+                raise KeyError(key)
+            self._values[key] = _read_attr(self._open(), key)
+        return self._values[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self._names[key] = None
+        if self._values is None:
+            self._values = {}
+        self._values[key] = value
+        if self._assigned is None:
+            self._assigned = set()
+        self._assigned.add(key)
+
+    def __delitem__(self, key: str) -> None:
+        del self._names[key]
+        if self._values is not None:
+            self._values.pop(key, None)
+        if self._assigned is not None:
+            self._assigned.discard(key)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._names
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._names)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({list(self._names)})"
+
+    def __getstate__(self) -> tuple[_FileSpec, str, dict[str, None], dict[str, Any]]:
+        # The h5py object cannot be pickled, values are read again when accessed.
+        assigned = {key: self._values[key] for key in self._assigned or ()}
+        return self._spec, self._path, self._names, assigned
+
+    def __setstate__(
+        self, state: tuple[_FileSpec, str, dict[str, None], dict[str, Any]]
+    ) -> None:
+        self._spec, self._path, self._names, self._values = state
+        self._assigned = set(self._values)
+        self._node = None
+
+
+def _read_attr(node: h5py.Dataset | h5py.Group, key: str) -> Any:
+    """Read HDF5 attribute
+
+    Numeric attributes and scalar strings, i.e., the vast majority of attributes
+    in NeXus files, are read directly with ``h5a``. Anything else falls back to
+    the high-level API.
+    """
+    attr = h5a.open(node.id, key.encode())
+    shape = attr.shape
+    dtype = attr.dtype
+    if shape is not None and (
+        dtype.kind in 'biufc'
+        or (shape == () and h5py.check_string_dtype(dtype) is not None)
+    ):
+        value = np.empty(shape, dtype=dtype)
+        attr.read(value)
+        value = value[()] if value.ndim == 0 else value
+    else:
+        value = node.attrs[key]
     # Convert bytes to strings
-    for key, value in attrs.items():
-        if isinstance(value, bytes):
-            attrs[key] = value.decode(encoding='utf-8')
-    return attrs
+    if isinstance(value, bytes):
+        value = value.decode(encoding='utf-8')
+    return value
 
 
-def _read_group(group: h5py.File, parent: Group | None = None) -> Group:
+def _read_group(
+    group: h5py.Group,
+    parent: Group | None = None,
+    lazy: bool = False,
+    records: MutableMapping[int, Dataset] | None = None,
+    spec: _FileSpec | None = None,
+) -> Group:
     """Read HDF5 group"""
-    grp = Group(name=group.name, attrs=_read_attrs(group), children={}, parent=parent)
+    records = {} if records is None else records
+    spec = _FileSpec(group.file.filename, {}) if spec is None else spec
+    grp = Group(name=group.name, attrs=_Attrs(spec, group.name, group), parent=parent)
+    if lazy:
+        grp.children = LazyDict(_LoadChildren(spec, grp, group, records))
+    else:
+        grp.children = _read_children(
+            group, grp, lazy=False, records=records, spec=spec
+        )
+    return grp
+
+
+class _LoadChildren:
+    """Reads the children of a lazily read group, see :class:`chexus.tree.LazyDict`
+
+    Like :class:`_Attrs`, this reads from the h5py group that was read while the
+    file is open, and otherwise through the pool of files. Pickling only stores
+    the file spec and the group, so children that have not been loaded are
+    pickled by reference.
+    """
+
+    __slots__ = ('_group', '_records', 'parent', 'spec')
+
+    def __init__(
+        self,
+        spec: _FileSpec,
+        parent: Group,
+        group: h5py.Group | None = None,
+        records: MutableMapping[int, Dataset] | None = None,
+    ) -> None:
+        self.spec = spec
+        self.parent = parent
+        self._group = group
+        self._records = weakref.WeakValueDictionary() if records is None else records
+
+    def __call__(self) -> dict[str, Dataset | Group]:
+        group = self._group
+        if group is None or not group.id.valid:
+            group = _file_pool.get(self.spec)[self.parent.name]
+        return _read_children(
+            group, self.parent, lazy=True, records=self._records, spec=self.spec
+        )
+
+    def __getstate__(self) -> tuple[_FileSpec, Group]:
+        return self.spec, self.parent
+
+    def __setstate__(self, state: tuple[_FileSpec, Group]) -> None:
+        self.spec, self.parent = state
+        self._group = None
+        self._records = weakref.WeakValueDictionary()
+
+
+def _read_children(
+    group: h5py.Group,
+    parent: Group,
+    lazy: bool,
+    records: MutableMapping[int, Dataset],
+    spec: _FileSpec,
+) -> dict[str, Dataset | Group]:
+    """Read the children of an HDF5 group"""
+    children = {}
     for name, value in group.items():
         if isinstance(value, h5py.Dataset):
-            grp.children[name] = _read_dataset(value, parent=grp)
+            children[name] = _read_dataset(
+                value, parent=parent, records=records, spec=spec
+            )
         elif isinstance(value, h5py.Group):
-            grp.children[name] = _read_group(value, parent=grp)
+            children[name] = _read_group(
+                value, parent=parent, lazy=lazy, records=records, spec=spec
+            )
         else:
             raise ValueError(f"Unsupported type: {type(value)}")
-    return grp
+    return children
 
 
-def _read_dataset(dataset: h5py.Dataset, parent: Group) -> Dataset:
+def _read_dataset(
+    dataset: h5py.Dataset,
+    parent: Group,
+    records: MutableMapping[int, Dataset],
+    spec: _FileSpec,
+) -> Dataset:
     """Read HDF5 dataset"""
+    addr = h5o.get_info(dataset.id).addr
+    if (first := records.get(addr)) is not None:
+        return _alias(first, name=dataset.name, parent=parent)
+    dataset = _Dataset(dataset.id)
+    name = dataset.name
     ds = Dataset(
-        name=dataset.name,
+        name=name,
         shape=dataset.shape,
-        dtype=dataset.dtype,
-        attrs=_read_attrs(dataset),
+        dtype=_intern_dtype(dataset.dtype),
+        attrs=_Attrs(spec, name, dataset),
         parent=parent,
-        dataset=dataset,
+        dataset=_DatasetHandle(spec, name, addr, dataset),
     )
+    records[addr] = ds
     return ds
+
+
+def _alias(dataset: Dataset, name: str, parent: Group) -> Dataset:
+    """Make dataset that shares the underlying HDF5 object with ``dataset``"""
+    return Dataset(
+        name=name,
+        shape=dataset.shape,
+        dtype=dataset.dtype,
+        attrs=dataset.attrs,
+        parent=parent,
+        dataset=dataset.dataset,
+    )
+
+
+def _crawl_group(
+    group: h5py.Group,
+    parent: Group | None = None,
+    records: MutableMapping[int, Dataset] | None = None,
+    spec: _FileSpec | None = None,
+) -> Group:
+    """Read HDF5 group and its subtree using h5py's low-level API
+
+    ``h5o.visit`` collects type and number of attributes of every object and
+    ``H5Lvisit`` collects every link, each in a single traversal driven by HDF5.
+    Objects are then matched to links by their address, so only datasets
+    need to be opened individually (for shape and dtype) and attributes are
+    only read for objects that have any.
+    """
+    records = {} if records is None else records
+    spec = _FileSpec(group.file.filename, {}) if spec is None else spec
+    # 'info' objects are reused by h5py, so we extract what we need right away.
+    objects: dict[int, tuple[int, int]] = {}
+
+    def visit_object(name: bytes, info: h5o.ObjInfo) -> None:
+        objects[info.addr] = (info.type, info.num_attrs)
+
+    links: list[tuple[bytes, int, int | None]] = []
+
+    def visit_link(name: bytes, info: h5l.LinkInfo) -> None:
+        links.append((name, info.type, info.u if info.type == h5l.TYPE_HARD else None))
+
+    h5o.visit(group.id, visit_object, info=True)
+    group.id.links.visit(visit_link, info=True)
+
+    root = Group(
+        name=group.name,
+        attrs=_Attrs(spec, group.name, group),
+        children=EMPTY,
+        parent=parent,
+    )
+    prefix = group.name.rstrip('/')
+    # Groups that H5Lvisit descends into, keyed by path relative to 'group'.
+    # H5Lvisit descends into every group once, via the first hard link.
+    groups = {b'': root}
+    descended = set()
+    for name, link_type, addr in links:
+        parent_name, _, basename = name.rpartition(b'/')
+        grp = groups[parent_name]
+        path = f"{prefix}/{name.decode()}"
+        if addr in objects:
+            obj_type, num_attrs = objects[addr]
+        else:
+            # Soft or external link, resolved by HDF5
+            try:
+                info = h5o.get_info(group.id, name)
+            except KeyError:
+                raise ValueError(f"Unsupported type: cannot resolve {path}") from None
+            obj_type, num_attrs, addr = info.type, info.num_attrs, info.addr
+        if obj_type == h5o.TYPE_DATASET:
+            if (first := records.get(addr)) is not None:
+                child = _alias(first, name=path, parent=grp)
+            else:
+                dataset = _Dataset(h5o.open(group.id, name))
+                child = _crawl_dataset(
+                    dataset,
+                    path,
+                    num_attrs,
+                    parent=grp,
+                    handle=_DatasetHandle(spec, path, addr, dataset),
+                )
+                records[addr] = child
+        elif obj_type == h5o.TYPE_GROUP:
+            if link_type == h5l.TYPE_HARD and addr not in descended:
+                descended.add(addr)
+                attrs = EMPTY
+                if num_attrs:
+                    attrs = _Attrs(spec, path, h5py.Group(h5o.open(group.id, name)))
+                child = Group(
+                    name=path,
+                    attrs=attrs,
+                    children=EMPTY,
+                    parent=grp,
+                )
+                groups[name] = child
+            else:
+                # Linked group that H5Lvisit does not descend into
+                child = _crawl_group(
+                    group[name.decode()], parent=grp, records=records, spec=spec
+                )
+        else:
+            raise ValueError(f"Unsupported type: {obj_type}")
+        grp.children[basename.decode()] = child
+    return root
+
+
+def _crawl_dataset(
+    dataset: h5py.Dataset,
+    name: str,
+    num_attrs: int,
+    parent: Group,
+    handle: _DatasetHandle,
+) -> Dataset:
+    """Make dataset from low-level info"""
+    return Dataset(
+        name=name,
+        shape=dataset.id.shape,
+        dtype=_intern_dtype(dataset.id.dtype),
+        attrs=_Attrs(handle.spec, name, dataset) if num_attrs else EMPTY,
+        parent=parent,
+        dataset=handle,
+    )
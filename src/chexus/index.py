@@ -0,0 +1,79 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2024 Scipp contributors (https://github.com/scipp)
+from __future__ import annotations
+
+from collections.abc import Callable, Iterator, Sequence
+from functools import cached_property
+
+from .transformations import TransformationGraph
+from .tree import Dataset, Group, iter_tree
+
+
+class TreeIndex:
+    """Lookup tables for the nodes of a tree.
+
+    The index is built with a single pass over the tree below ``root`` (including
+    ``root``), skipping the subtrees for which ``prune`` returns True, see
+    :func:`chexus.iter_tree`. Nodes can then be found by NX_class, basename,
+    attribute name, or absolute path without scanning the tree again. Lookups
+    return the nodes in the order of :func:`chexus.iter_tree`. The returned
+    sequences must not be modified.
+
+    The index is not updated if the tree changes.
+    """
+
+    def __init__(
+        self, root: Group, prune: Callable[[Dataset | Group], bool] | None = None
+    ) -> None:
+        self.root = root
+        self._by_path: dict[str, Dataset | Group] = {}
+        self._by_nx_class: dict[str, list[Dataset | Group]] = {}
+        self._by_basename: dict[str, list[Dataset | Group]] = {}
+        self._by_attr: dict[str, list[Dataset | Group]] = {}
+        self._add(root)
+        for node in iter_tree(root, prune=prune):
+            self._add(node)
+
+    def _add(self, node: Dataset | Group) -> None:
+        self._by_path[node.name] = node
+        self._by_basename.setdefault(node.basename, []).append(node)
+        for key in node.attrs:
+            self._by_attr.setdefault(key, []).append(node)
+        if 'NX_class' in node.attrs:
+            nx_class = node.attrs['NX_class']
+            if isinstance(nx_class, str):
+                self._by_nx_class.setdefault(nx_class, []).append(node)
+
+    def __len__(self) -> int:
+        return len(self._by_path)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._by_path)
+
+    def __contains__(self, path: str) -> bool:
+        return path in self._by_path
+
+    def __getitem__(self, path: str) -> Dataset | Group:
+        """Node with the absolute ``path``"""
+        return self._by_path[path]
+
+    def get(self, path: str) -> Dataset | Group | None:
+        """Node with the absolute ``path``, or None if it is not in the index"""
+        return self._by_path.get(path)
+
+    def by_nx_class(self, nx_class: str) -> Sequence[Dataset | Group]:
+        """Nodes with the given NX_class attribute"""
+        return self._by_nx_class.get(nx_class, ())
+
+    def by_basename(self, basename: str) -> Sequence[Dataset | Group]:
+        """Nodes with the given name"""
+        return self._by_basename.get(basename, ())
+
+    def by_attr(self, key: str) -> Sequence[Dataset | Group]:
+        """Nodes that have an attribute ``key``"""
+        return self._by_attr.get(key, ())
+
+    @cached_property
+    def transformations(self) -> TransformationGraph:
+        """Graph of the depends_on links of the tree, built on first access"""
+        return TransformationGraph(self)
@@ -2,6 +2,39 @@
 # Copyright (c) 2023 Scipp contributors (https://github.com/scipp)
 import hashlib
 import os
+from typing import Any
+
+FILE_ACCESS_PROFILES: dict[str, dict[str, Any]] = {
+    # Building the tree only reads object headers and attributes, and validators
+    # read few values, in chunk-aligned blocks. The chunk cache, which is allocated
+    # per open dataset, is therefore useless. Skipping file locking saves a
+    # round-trip to the lock manager on parallel filesystems.
+    'metadata-crawl': {'rdcc_nbytes': 0, 'locking': False},
+    # Validators that read large datasets benefit from a large chunk cache with
+    # many slots to avoid hash collisions. Chunks that have been fully read are
+    # evicted first since data is read sequentially.
+    'bulk-data': {'rdcc_nbytes': 64 * 1024**2, 'rdcc_nslots': 100_003, 'rdcc_w0': 1.0},
+}
+"""Named sets of file-access options for ``h5py.File``, see :func:`chexus.read_hdf5`"""
+
+_HDF5_SIGNATURE = b'\x89HDF\r\n\x1a\n'
+
+
+def is_hdf5(path: str) -> bool:
+    """Check if a file is an HDF5 file without importing h5py.
+
+    The HDF5 superblock starts with a signature at offset 0, or after a user block
+    at offset 512, 1024, 2048, etc.
+    """
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        offset = 0
+        while offset + len(_HDF5_SIGNATURE) <= size:
+            f.seek(offset)
+            if f.read(len(_HDF5_SIGNATURE)) == _HDF5_SIGNATURE:
+                return True
+            offset = 512 if offset == 0 else 2 * offset
+    return False
 
 
 def compute_checksum(file_path) -> str:
@@ -5,13 +5,20 @@ from typing import Any
 
 import numpy as np
 
-from .tree import Dataset, Group
+from .tree import Dataset, Group, LazyDict, TreeSource, register_source
 
 
-def read_json(path: str) -> Group:
+def read_json(path: str, *, root_path: str | None = None, lazy: bool = False) -> Group:
     """
     Read JSON NeXus file and return tree of datasets and groups.
 
+    If ``root_path`` is given, only the group at this path and its subtree are
+    built, and that group is returned. Its ancestors are available through the
+    ``parent`` links, but their children are only built when accessed.
+
+    If ``lazy`` is True, the children of a group are only built when first
+    accessed.
+
     The JSON looks something like this:
 
     {
@@ -53,33 +60,97 @@ def read_json(path: str) -> Group:
     },
     """
     with open(path) as f:
-        return _read_group(json.load(f))
-
-
-def _read_group(group: dict[str, Any], parent: Group | None = None) -> Group:
+        structure = json.load(f)
+    group = _read_subtree(structure, root_path=root_path, lazy=lazy)
+    register_source(group, TreeSource('json', path, {'lazy': lazy}))
+    return group
+
+
+def _read_subtree(
+    structure: dict[str, Any], root_path: str | None, lazy: bool
+) -> Group:
+    """Read the group at ``root_path`` including lazily built ancestors"""
+    names = [name for name in (root_path or '').split('/') if name]
+    if not names:
+        return _read_group(structure, lazy=lazy)
+    group = structure
+    parent = _read_group(structure, lazy=True)
+    for i, name in enumerate(names):
+        group = _find_group(group, name, root_path)
+        is_root = i == len(names) - 1
+        child = _read_group(group, parent=parent, lazy=lazy or not is_root)
+        # Make sure the ancestors refer to the same node object.
+        parent.children[name] = child
+        parent = child
+    return parent
+
+
+def _find_group(group: dict[str, Any], name: str, root_path: str) -> dict[str, Any]:
+    """Find child group by name"""
+    for child in group["children"]:
+        if (
+            isinstance(child, dict)
+            and child.get("module") is None
+            and child.get("type") == "group"
+            and child.get("name") == name
+        ):
+            return child
+    raise KeyError(f"Root path {root_path} not found")
+
+
+def _read_group(
+    group: dict[str, Any], parent: Group | None = None, lazy: bool = False
+) -> Group:
     """Read JSON group"""
     name = group.get("name", '')
     if parent is not None:
         name = parent.name + '/' + name
-    grp = Group(name=name, attrs={}, children={}, parent=parent)
+    grp = Group(name=name, attrs=_read_attrs(group), parent=parent)
+    if lazy:
+        grp.children = LazyDict(_LoadChildren(group, grp))
+    else:
+        grp.children = _read_children(group, grp)
+    return grp
+
+
+class _LoadChildren:
+    """Reads the children of a lazily read group, see :class:`chexus.tree.LazyDict`
+
+    Unlike a closure, this can be pickled, with the JSON of the group.
+    """
+
+    __slots__ = ('group', 'parent')
+
+    def __init__(self, group: dict[str, Any], parent: Group) -> None:
+        self.group = group
+        self.parent = parent
+
+    def __call__(self) -> dict[str, Dataset | Group]:
+        return _read_children(self.group, self.parent, lazy=True)
+
+
+def _read_children(
+    group: dict[str, Any], parent: Group, lazy: bool = False
+) -> dict[str, Dataset | Group]:
+    """Read the children of a JSON group"""
+    children = {}
     for child in group["children"]:
         if not isinstance(child, dict):
             continue
         module = child.get("module")
         if module is None:
             if child["type"] == "group":
-                grp.children[child["name"]] = _read_group(child, parent=grp)
+                children[child["name"]] = _read_group(child, parent=parent, lazy=lazy)
         elif module == "dataset":
-            grp.children[child["config"]["name"]] = _read_dataset(child, parent=grp)
+            children[child["config"]["name"]] = _read_dataset(child, parent=parent)
         elif module in ["f142", 'f144']:
-            grp.children[child["config"]["source"]] = _read_source(child, parent=grp)
+            children[child["config"]["source"]] = _read_source(child, parent=parent)
         elif module in ['tdct', 'ev42', 'ev44']:
             # No useful info in these?
             pass
         else:
             raise ValueError(f"Unsupported module: {module}")
-    grp.attrs = _read_attrs(group)
-    return grp
+    return children
 
 
 def _read_dataset(dataset: dict[str, Any], parent: Group) -> Dataset:
@@ -0,0 +1,136 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2024 Scipp contributors (https://github.com/scipp)
+from __future__ import annotations
+
+import multiprocessing
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+
+from .hdf5 import read_hdf5
+from .json import read_json
+from .tree import Dataset, Group, TreeSource, iter_tree, tree_source
+from .validate import ValidationResult, Validator, Violation, validate
+
+PARTITION_CLASSES = ('NXentry', 'NXdetector')
+"""Groups with these NX_class attributes are validated in separate processes"""
+
+
+def validate_parallel(
+    group: Group,
+    validators: list[Validator],
+    *,
+    jobs: int,
+    skip_condition: Callable[[Dataset | Group], bool],
+    include_root: bool = False,
+    columnar: bool = False,
+    prune: Callable[[Dataset | Group], bool] | None = None,
+) -> dict[type, ValidationResult]:
+    """Validate subtrees of ``group`` in a pool of ``jobs`` processes.
+
+    This is the implementation of :func:`chexus.validate` with ``jobs > 1``.
+    Every group with an NX_class in :data:`PARTITION_CLASSES` is validated in a
+    worker process that reads the group from the file again. Nested groups of
+    these classes are separate tasks. The remaining nodes are validated in this
+    process while the workers run. Results are merged in the order of the
+    serial traversal, so they are the same as for ``jobs=1``.
+
+    Validators, ``skip_condition``, and ``prune`` are sent to the workers, so
+    they must be picklable.
+    """
+    if (source := tree_source(group)) is None:
+        raise ValueError(
+            "Validating with jobs > 1 requires a tree read with read_hdf5 or read_json"
+        )
+    nodes = iter_tree(group, prune=prune)
+    if include_root:
+        nodes = chain([group], nodes)
+    order = {}
+    roots = []
+    for i, node in enumerate(nodes):
+        order[node.name] = i
+        if _is_partition(node) and (node is not group or include_root):
+            roots.append(node)
+    root_names = {root.name for root in roots}
+    # Each task covers the subtree of a root except for nested roots.
+    tasks = [
+        (
+            root.name,
+            sorted(
+                name
+                for name in root_names
+                if name.startswith(root.name.rstrip('/') + '/')
+            ),
+        )
+        for root in roots
+    ]
+
+    def in_task(node: Dataset | Group) -> bool:
+        return (prune is not None and prune(node)) or node.name in root_names
+
+    results = {type(v): ValidationResult(v) for v in validators}
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=jobs, mp_context=context) as pool:
+        futures = [
+            pool.submit(
+                _validate_task,
+                source,
+                root_path,
+                excluded,
+                validators,
+                skip_condition,
+                columnar,
+                prune,
+            )
+            for root_path, excluded in tasks
+        ]
+        if group.name not in root_names:
+            results = validate(
+                group,
+                validators,
+                skip_condition=skip_condition,
+                include_root=include_root,
+                columnar=columnar,
+                prune=in_task,
+            )
+        for future in futures:
+            for result, (checks, violations) in zip(
+                results.values(), future.result(), strict=True
+            ):
+                result.checks += checks
+                result.violations.extend(violations)
+    for result in results.values():
+        result.violations.sort(key=lambda v: order.get(v.name, len(order)))
+        result.fails = len(result.violations)
+    return results
+
+
+def _is_partition(node: Dataset | Group) -> bool:
+    return isinstance(node, Group) and node.attrs.get('NX_class') in PARTITION_CLASSES
+
+
+def _validate_task(
+    source: TreeSource,
+    root_path: str,
+    excluded: list[str],
+    validators: list[Validator],
+    skip_condition: Callable[[Dataset | Group], bool],
+    columnar: bool,
+    prune: Callable[[Dataset | Group], bool] | None,
+) -> list[tuple[int, list[Violation]]]:
+    """Read the subtree at ``root_path`` and validate it, in a worker process"""
+    if source.format == 'hdf5':
+        reader = read_hdf5(source.path, root_path=root_path, **source.options)
+        group = next(reader)
+    else:
+        group = read_json(source.path, root_path=root_path, **source.options)
+    excluded = set(excluded)
+    results = validate(
+        group,
+        validators,
+        skip_condition=skip_condition,
+        include_root=True,
+        columnar=columnar,
+        prune=lambda node: node.name in excluded or (prune is not None and prune(node)),
+    )
+    return [(result.checks, result.violations) for result in results.values()]
@@ -0,0 +1,228 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2024 Scipp contributors (https://github.com/scipp)
+from __future__ import annotations
+
+import json
+import os
+import selectors
+import socket
+import stat
+from collections import deque
+from collections.abc import Callable, Iterable
+from typing import TYPE_CHECKING, Any
+
+from .batch import WorkerPool
+
+if TYPE_CHECKING:
+    from .validate import Validator
+
+
+MAX_REQUEST_BYTES = 1024**2
+"""Clients that send longer lines are disconnected"""
+
+
+class _Client:
+    """Connection of a client, with buffers for partial requests and for output
+
+    The socket is non-blocking, so a client that does not read its results
+    cannot stall the daemon. Output that the socket does not accept right away
+    is written when the socket becomes writable again.
+    """
+
+    def __init__(self, sock: socket.socket) -> None:
+        sock.setblocking(False)
+        self.sock = sock
+        self.buffer = b''
+        self.outgoing = bytearray()
+        self.pending = 0
+        self.closed = False
+
+    def send(self, message: dict[str, Any]) -> None:
+        if self.closed:
+            return
+        self.outgoing += json.dumps(message).encode() + b'\n'
+        self.flush()
+
+    def flush(self) -> None:
+        """Write buffered output until the socket would block"""
+        try:
+            while self.outgoing:
+                sent = self.sock.send(self.outgoing)
+                del self.outgoing[:sent]
+        except BlockingIOError:
+            pass
+        except OSError:
+            self.close()
+
+    def close(self) -> None:
+        self.closed = True
+        self.sock.close()
+
+
+def _wait(
+    readers: Iterable[Any], writers: Iterable[Any], timeout: float
+) -> tuple[list[Any], list[Any]]:
+    """Like :func:`multiprocessing.connection.wait`, but also for writing
+
+    Returns the objects that are ready for reading and for writing.
+    """
+    events: dict[Any, int] = {}
+    for obj in readers:
+        events[obj] = events.get(obj, 0) | selectors.EVENT_READ
+    for obj in writers:
+        events[obj] = events.get(obj, 0) | selectors.EVENT_WRITE
+    with selectors.DefaultSelector() as selector:
+        for obj, mask in events.items():
+            selector.register(obj, mask)
+        ready = selector.select(timeout)
+    readable = [key.fileobj for key, mask in ready if mask & selectors.EVENT_READ]
+    writable = [key.fileobj for key, mask in ready if mask & selectors.EVENT_WRITE]
+    return readable, writable
+
+
+def serve(
+    path: str,
+    validators: list[Validator],
+    *,
+    jobs: int = 1,
+    timeout: float | None = None,
+    memory_limit: int | None = None,
+    preload: Iterable[str] = (),
+    until: Callable[[], bool] | None = None,
+    **kwargs,
+) -> None:
+    """Validate files submitted through the Unix domain socket ``path``.
+
+    The workers of a :class:`chexus.batch.WorkerPool` are started right away and
+    ``preload`` modules such as ``'scipp'`` are imported, so the latency for a
+    file is close to the time for validating it. See :func:`submit` for the
+    client. ``jobs``, ``timeout``, ``memory_limit``, and other keyword
+    arguments are as in :func:`chexus.validate_many`.
+
+    Runs until interrupted, or until ``until`` returns True. Files of clients
+    that disconnect are still validated, but the results are dropped. Results
+    for clients that do not read them are buffered, without delaying other
+    clients. Clients that send a line longer than :data:`MAX_REQUEST_BYTES` are
+    disconnected.
+
+    The protocol is line-based JSON. A client sends one request per line::
+
+        {"paths": ["/data/a.nxs", "/data/b.json"]}
+
+    and receives one line per file with :meth:`chexus.batch.FileResult.to_dict`,
+    in the order in which the files finish, followed by ``{"done": true}``.
+    """
+    if os.path.exists(path) and stat.S_ISSOCK(os.stat(path).st_mode):
+        # Left over from a daemon that was killed.
+        os.unlink(path)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(path)
+    server.listen()
+    pool = WorkerPool(
+        validators,
+        jobs=jobs,
+        timeout=timeout,
+        memory_limit=memory_limit,
+        preload=preload,
+        **kwargs,
+    )
+    pool.start()
+    clients: dict[socket.socket, _Client] = {}
+    # Clients waiting for the result of a file. A file submitted by several
+    # clients is validated for each of them.
+    waiting: dict[str, deque[_Client]] = {}
+    try:
+        while until is None or not until():
+            for sock in [s for s, client in clients.items() if client.closed]:
+                del clients[sock]
+            readable, writable = _wait(
+                [server, *clients, *pool.connections],
+                [sock for sock, client in clients.items() if client.outgoing],
+                timeout=0.5,
+            )
+            if server in readable:
+                sock, _ = server.accept()
+                clients[sock] = _Client(sock)
+            for sock in writable:
+                clients[sock].flush()
+            for sock in [s for s in readable if s in clients]:
+                client = clients[sock]
+                if client.closed:
+                    continue
+                try:
+                    data = sock.recv(64 * 1024)
+                except BlockingIOError:
+                    continue
+                except OSError:
+                    data = b''
+                if not data:
+                    client.close()
+                    continue
+                *lines, client.buffer = (client.buffer + data).split(b'\n')
+                for line in lines:
+                    _handle_request(client, line, pool, waiting)
+                if len(client.buffer) > MAX_REQUEST_BYTES:
+                    client.send({'error': 'Request too long', 'done': True})
+                    client.close()
+            for result in pool.poll(timeout=0):
+                client = waiting[result.path].popleft()
+                if not waiting[result.path]:
+                    del waiting[result.path]
+                client.send(result.to_dict())
+                client.pending -= 1
+                if client.pending == 0:
+                    client.send({'done': True})
+    finally:
+        pool.close()
+        for client in clients.values():
+            client.close()
+        server.close()
+        os.unlink(path)
+
+
+def _handle_request(
+    client: _Client, line: bytes, pool: WorkerPool, waiting: dict[str, deque[_Client]]
+) -> None:
+    try:
+        paths = json.loads(line)['paths']
+    except (ValueError, KeyError, TypeError):
+        paths = None
+    if not isinstance(paths, list) or not all(isinstance(p, str) for p in paths):
+        client.send({'error': 'Invalid request', 'done': True})
+        return
+    for path in paths:
+        waiting.setdefault(path, deque()).append(client)
+        client.pending += 1
+        pool.submit(path)
+    if not paths:
+        client.send({'done': True})
+
+
+def submit(
+    path: str,
+    files: Iterable[str],
+    callback: Callable[[dict[str, Any]], None] | None = None,
+) -> list[dict[str, Any]]:
+    """Validate files with the daemon listening on the Unix domain socket ``path``.
+
+    ``files`` are sent as absolute paths, the daemon does not know the working
+    directory of the client. ``callback`` is called with each result as soon as
+    it arrives. Returns the results, in the order in which files finished, as
+    returned by :meth:`chexus.batch.FileResult.to_dict`.
+    """
+    results = []
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(path)
+        request = {'paths': [os.path.abspath(file) for file in files]}
+        sock.sendall(json.dumps(request).encode() + b'\n')
+        with sock.makefile('rb') as stream:
+            for line in stream:
+                message = json.loads(line)
+                if message.get('done'):
+                    if 'error' in message:
+                        raise ValueError(message['error'])
+                    return results
+                results.append(message)
+                if callback is not None:
+                    callback(message)
+    raise ConnectionError("The validation daemon closed the connection")
@@ -0,0 +1,90 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2024 Scipp contributors (https://github.com/scipp)
+import hashlib
+import os
+import pickle
+from typing import Any
+
+# Increment when the content of snapshots changes to invalidate existing ones.
+_FORMAT_VERSION = 1
+# Enough to cover the superblock and root group of typical files.
+_HEADER_BYTES = 64 * 1024
+
+
+class SnapshotCache:
+    """On-disk cache of metadata snapshots of HDF5 files.
+
+    A snapshot holds names, shapes, dtypes, attributes, and object addresses of all
+    groups and datasets of a file, or of the subtree at a root path, i.e.,
+    everything except dataset values. Pass a cache to :func:`chexus.read_hdf5` to
+    skip reading the metadata of files that have been read before.
+
+    Snapshots are keyed by the root path and by the absolute path, size, and
+    modification time of the file, and a hash of its first bytes, so snapshots of
+    modified files are never used. When the total size of the snapshots exceeds
+    ``max_bytes``, the least recently used snapshots are removed.
+
+    Snapshots are stored with :mod:`pickle`, so ``directory`` must not be writable
+    by untrusted users.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 1024**3) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def load(self, path: str, root_path: str = '/') -> list[tuple[Any, ...]] | None:
+        """Return the snapshot of the subtree of a file, or None if there is none"""
+        file = self._snapshot_file(path, root_path)
+        try:
+            with open(file, 'rb') as f:
+                snapshot = pickle.load(f)  # noqa: S301
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            return None
+        # The modification time of snapshots tracks when they were last used.
+        os.utime(file)
+        return snapshot
+
+    def store(
+        self, path: str, snapshot: list[tuple[Any, ...]], root_path: str = '/'
+    ) -> None:
+        """Store the snapshot of the subtree of a file and evict old snapshots"""
+        file = self._snapshot_file(path, root_path)
+        tmp = f"{file}.{os.getpid()}.tmp"
+        with open(tmp, 'wb') as f:
+            pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+        # Atomic, so concurrent readers never see partial snapshots.
+        os.replace(tmp, file)
+        self._evict()
+
+    def _snapshot_file(self, path: str, root_path: str = '/') -> str:
+        stat = os.stat(path)
+        with open(path, 'rb') as f:
+            header = f.read(_HEADER_BYTES)
+        key = hashlib.sha256(usedforsecurity=False)
+        key.update(
+            f"{_FORMAT_VERSION}\0{os.path.abspath(path)}\0"
+            f"{stat.st_size}\0{stat.st_mtime_ns}\0{root_path}\0".encode()
+        )
+        key.update(header)
+        return os.path.join(self.directory, f"{key.hexdigest()}.snapshot")
+
+    def _evict(self) -> None:
+        entries = []
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith('.snapshot'):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, file in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(file)
+            except FileNotFoundError:
+                pass
+            total -= size
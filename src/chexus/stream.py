@@ -0,0 +1,87 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2024 Scipp contributors (https://github.com/scipp)
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable, Iterator
+from itertools import chain
+
+from .io import is_hdf5
+from .json import read_json
+from .tree import Dataset, Group, LazyDict
+from .validate import ValidationResult, Validator, _Dispatcher
+
+
+def validate_stream(
+    path: str,
+    validators: list[Validator],
+    *,
+    root_path: str | None = None,
+    skip_condition: Callable[[Dataset | Group], bool] | None = None,
+    prune: Callable[[Dataset | Group], bool] | None = None,
+    **kwargs,
+) -> dict[type, ValidationResult]:
+    """Validate a HDF5 or JSON file while traversing it.
+
+    Unlike :func:`chexus.validate`, this does not build the whole tree first.
+    The file is read lazily and every node is validated when it is reached.
+    Once all nodes below a group have been validated, the children of the group
+    are dropped again. Validators can always access the ancestors of a node and
+    their children, i.e., the parent and siblings of the node, so memory is
+    bounded by the depth and fan-out of the tree instead of the total number
+    of objects.
+
+    Nodes elsewhere in the tree, e.g., absolute ``depends_on`` targets, are read
+    again from the file when accessed. :meth:`Validator.prepare` is not called,
+    since building a :class:`chexus.TreeIndex` requires the whole tree, but
+    :meth:`Validator.finish` is.
+
+    ``root_path``, ``skip_condition``, and ``prune`` are as in
+    :func:`chexus.read_hdf5` and :func:`chexus.validate`. Other keyword
+    arguments are forwarded to :func:`chexus.read_hdf5`.
+    """
+    results = {type(v): ValidationResult(v) for v in validators}
+    dispatcher = _Dispatcher(results.values())
+    if is_hdf5(path):
+        from .hdf5 import read_hdf5
+
+        reader = read_hdf5(path, root_path=root_path, lazy=True, **kwargs)
+        group = next(reader)
+    else:
+        reader = None
+        group = read_json(path, root_path=root_path, lazy=True)
+    try:
+        nodes: Iterable[Dataset | Group] = _iter_and_unload(group, prune=prune)
+        if group.parent is not None:
+            # Validate the group at root_path itself, like the CLI does.
+            nodes = chain([group], nodes)
+        for node in nodes:
+            if skip_condition is not None and skip_condition(node):
+                continue
+            for validation in dispatcher.route(node):
+                validation.apply(node)
+    finally:
+        for validator in validators:
+            validator.finish()
+        if reader is not None:
+            reader.close()
+    return results
+
+
+def _iter_and_unload(
+    root: Group, prune: Callable[[Dataset | Group], bool] | None
+) -> Iterator[Dataset | Group]:
+    """Like :func:`chexus.iter_tree` but unload subtrees that have been visited"""
+    stack = [(root, iter(root.children.values()))]
+    while stack:
+        group, children = stack[-1]
+        for node in children:
+            if prune is not None and prune(node):
+                continue
+            yield node
+            if isinstance(node, Group):
+                stack.append((node, iter(node.children.values())))
+            break
+        else:
+            stack.pop()
+            if group is not root and isinstance(group.children, LazyDict):
+                group.children.unload()
@@ -0,0 +1,172 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2024 Scipp contributors (https://github.com/scipp)
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable, Sequence
+from typing import Any
+
+import numpy as np
+
+from .tree import Dataset, Group
+
+GROUP = 0
+DATASET = 1
+
+ATTRIBUTES = (
+    'NX_class',
+    'depends_on',
+    'offset',
+    'offset_units',
+    'transformation_type',
+    'units',
+    'vector',
+)
+"""Attributes whose presence is recorded by :class:`TreeTable` by default"""
+
+
+class TreeTable:
+    """Columnar view of the nodes of a tree
+
+    Each node is a row. The columns are NumPy arrays, so simple validators can be
+    evaluated for all nodes at once with :meth:`chexus.Validator.masks` instead of
+    calling :meth:`chexus.Validator.applies_to` and
+    :meth:`chexus.Validator.validate` for every node:
+
+    - ``kind``: :data:`GROUP` or :data:`DATASET`.
+    - ``parent``: Row of the parent, -1 if the parent is not in the table.
+    - ``nx_class``: Index into ``nx_classes``, -1 if there is no NX_class attribute.
+    - ``basename``: Index into ``basenames``.
+    - ``dtype``: Index into ``dtypes``, -1 for groups.
+    - ``dtype_kind``: NumPy dtype kind character, empty for groups and for
+      datasets with a dtype that is not understood by NumPy.
+    - ``attr_bits``: Bitmask of the attributes in ``attrs`` that are present.
+
+    Building the table looks at each node once and reads only the NX_class
+    attribute values.
+    """
+
+    def __init__(
+        self,
+        nodes: Sequence[Dataset | Group],
+        *,
+        attrs: Sequence[str] = ATTRIBUTES,
+    ) -> None:
+        if len(attrs) > 64:
+            raise ValueError("TreeTable can record at most 64 attributes")
+        self.nodes = nodes
+        self.attrs = tuple(attrs)
+        self.nx_classes: list[Any] = []
+        self.basenames: list[str] = []
+        self.dtypes: list[Any] = []
+        rows = {id(node): row for row, node in enumerate(nodes)}
+        nx_classes: dict[Any, int] = {}
+        basenames: dict[str, int] = {}
+        # Keyed by type as well since, e.g., 'float32' == np.dtype('float32') but
+        # validators may treat them differently.
+        dtypes: dict[tuple[type, Any], int] = {}
+        bit_of = {name: 1 << i for i, name in enumerate(self.attrs)}
+        kind = []
+        parent = []
+        nx_class = []
+        basename = []
+        dtype = []
+        attr_bits = []
+        for node in nodes:
+            node_attrs = node.attrs
+            # Nodes have few attributes, so this is faster than checking for each
+            # of the recorded attributes.
+            attr_bits.append(sum(bit_of.get(name, 0) for name in node_attrs))
+            parent.append(rows.get(id(node.parent), -1))
+            basename.append(_code(node.basename, basenames, self.basenames))
+            nx_class.append(
+                _code(_hashable(node_attrs['NX_class']), nx_classes, self.nx_classes)
+                if 'NX_class' in node_attrs
+                else -1
+            )
+            if isinstance(node, Group):
+                kind.append(GROUP)
+                dtype.append(-1)
+            else:
+                kind.append(DATASET)
+                dtype.append(
+                    _code(
+                        node.dtype,
+                        dtypes,
+                        self.dtypes,
+                        key=(type(node.dtype), node.dtype),
+                    )
+                )
+        self.kind = np.array(kind, dtype=np.uint8)
+        self.parent = np.array(parent, dtype=np.int64)
+        self.nx_class = np.array(nx_class, dtype=np.int32)
+        self.basename = np.array(basename, dtype=np.int32)
+        self.dtype = np.array(dtype, dtype=np.int32)
+        # The extra entry at the end is selected by code -1.
+        self.dtype_kind = np.array(
+            [*(_dtype_kind(d) for d in self.dtypes), ''], dtype='U1'
+        )[self.dtype]
+        self.attr_bits = np.array(attr_bits, dtype=np.uint64)
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    @property
+    def is_group(self) -> np.ndarray:
+        return self.kind == GROUP
+
+    @property
+    def is_dataset(self) -> np.ndarray:
+        return self.kind == DATASET
+
+    def has_attr(self, name: str) -> np.ndarray:
+        """Mask of nodes that have the attribute ``name``"""
+        try:
+            bit = np.uint64(1 << self.attrs.index(name))
+        except ValueError:
+            raise KeyError(f"Attribute {name} is not recorded in the table") from None
+        return (self.attr_bits & bit) != 0
+
+    def nx_class_in(self, nx_classes: Iterable[str]) -> np.ndarray:
+        """Mask of nodes with an NX_class attribute in ``nx_classes``"""
+        nx_classes = set(nx_classes)
+        return self._lookup(self.nx_class, [c in nx_classes for c in self.nx_classes])
+
+    def basename_in(self, names: Iterable[str]) -> np.ndarray:
+        """Mask of nodes with a basename in ``names``"""
+        names = set(names)
+        return self._lookup(self.basename, [b in names for b in self.basenames])
+
+    def dtype_matches(self, predicate: Callable[[Any], bool]) -> np.ndarray:
+        """Mask of datasets with a dtype for which ``predicate`` returns True.
+
+        The predicate is called once per distinct dtype.
+        """
+        return self._lookup(self.dtype, [bool(predicate(d)) for d in self.dtypes])
+
+    @staticmethod
+    def _lookup(codes: np.ndarray, values: list[bool]) -> np.ndarray:
+        # The extra False at the end is selected by code -1.
+        return np.array([*values, False], dtype=bool)[codes]
+
+
+def _code(value: Any, codes: dict[Any, int], values: list[Any], key: Any = None) -> int:
+    key = value if key is None else key
+    if (code := codes.get(key)) is None:
+        code = codes[key] = len(values)
+        values.append(value)
+    return code
+
+
+def _hashable(value: Any) -> Any:
+    try:
+        hash(value)
+    except TypeError:
+        return repr(value)
+    return value
+
+
+def _dtype_kind(dtype: Any) -> str:
+    try:
+        return np.dtype(dtype).kind
+    except TypeError:
+        return ''
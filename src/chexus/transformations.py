@@ -0,0 +1,191 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2024 Scipp contributors (https://github.com/scipp)
+from __future__ import annotations
+
+from collections.abc import Iterator
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+from .tree import Dataset, Group
+
+if TYPE_CHECKING:
+    from .index import TreeIndex
+
+
+@dataclass(frozen=True)
+class DependsOn:
+    """A ``depends_on`` link of a node"""
+
+    node: Dataset | Group
+    """The ``depends_on`` field, or the node with a ``depends_on`` attribute"""
+    path: Any
+    """The target path, ``'.'`` for the end of a chain"""
+    target: Dataset | Group | None
+    """The node at ``path``, or None if there is none or ``path`` is ``'.'``"""
+
+    @property
+    def is_dangling(self) -> bool:
+        """True if the target is missing"""
+        return self.target is None and not self.is_end
+
+    @property
+    def is_end(self) -> bool:
+        """True if the node does not depend on anything"""
+        return isinstance(self.path, str) and self.path == "."
+
+
+def _depends_on_path(node: Dataset | Group) -> Any:
+    if node.name.endswith("/depends_on"):
+        return node.value
+    return node.attrs.get("depends_on")
+
+
+def _find_root(node: Dataset | Group) -> Dataset | Group:
+    while node.parent is not None:
+        node = node.parent
+    return node
+
+
+class TransformationGraph:
+    """Graph of the ``depends_on`` links of a tree.
+
+    The links are ``depends_on`` fields, e.g., of an NXdetector, and the
+    ``depends_on`` attributes of transformations. Targets are resolved relative
+    to the parent group of the link, or from the root of the tree for absolute
+    paths. Nodes in ``index`` are found with a lookup instead of walking the
+    tree. Targets outside of the indexed subtree, or all targets if ``index``
+    is None, are found by walking the tree.
+
+    Resolved links and chains are memoised, so chains of transformations that
+    are shared by many components are followed once. Links are resolved again
+    if their path changed, and missing targets are looked up again, e.g., for
+    files that are still being written. Memoised chains are not updated if the
+    tree changes. Use :attr:`chexus.TreeIndex.transformations` for the graph
+    of an indexed tree.
+    """
+
+    def __init__(self, index: TreeIndex | None = None) -> None:
+        self.index = index
+        self._links: dict[str, DependsOn] = {}
+        self._chains: dict[str, tuple[Dataset | Group, ...]] = {}
+        self._cycles: dict[str, tuple[Dataset | Group, ...]] = {}
+
+    def _resolve(self, node: Dataset | Group, path: str) -> Dataset | Group | None:
+        if (
+            self.index is not None
+            and node.parent is not None
+            and self.index.get(node.name) is node
+        ):
+            if path.startswith("/"):
+                absolute = path
+            else:
+                parent = "" if node.parent.name == "/" else node.parent.name
+                absolute = f"{parent}/{path.removeprefix('./')}"
+            if (target := self.index.get(absolute)) is not None:
+                return target
+        names = path.split("/")
+        if names[0] == "":
+            start = _find_root(node)
+            names = names[1:]
+        elif (start := node.parent) is None:
+            return None
+        if names[0] == ".":
+            names = names[1:]
+        for name in names:
+            if not isinstance(start, Group) or name not in start.children:
+                return None
+            start = start.children[name]
+        return start
+
+    def depends_on(self, node: Dataset | Group) -> DependsOn | None:
+        """The link of a ``depends_on`` field or of a node with a ``depends_on``
+        attribute, None for other nodes.
+
+        The path of a ``depends_on`` field without a value, e.g., read from JSON,
+        is None, and its target is None.
+        """
+        if not node.name.endswith("/depends_on") and "depends_on" not in node.attrs:
+            return None
+        path = _depends_on_path(node)
+        if not isinstance(path, str) or path == ".":
+            return DependsOn(node, path, None)
+        link = self._links.get(node.name)
+        if link is not None and link.node is node and link.path == path:
+            return link
+        link = DependsOn(node, path, self._resolve(node, path))
+        if link.target is not None:
+            self._links[node.name] = link
+        return link
+
+    def chain(self, node: Dataset | Group) -> tuple[Dataset | Group, ...]:
+        """The transformations that ``node`` depends on, in order.
+
+        ``node`` is a ``depends_on`` field, a transformation, or a group with a
+        ``depends_on`` field. The chain ends before a link to ``'.'`` or a
+        missing target, or after a target without ``depends_on``. If the chain
+        has a cycle, it ends with the first node that repeats.
+        """
+        if isinstance(node, Group) and "depends_on" not in node.attrs:
+            if isinstance(field := node.children.get("depends_on"), Dataset):
+                node = field
+        if node.name in self._chains:
+            return self._chains[node.name]
+        path = [node]
+        position = {node.name: 0}
+        while True:
+            link = self.depends_on(path[-1])
+            if link is None or link.target is None:
+                # Chains that end in a missing target are not memoised, the
+                # target may still be added.
+                tail = ()
+                complete = link is None or link.is_end
+                break
+            target = link.target
+            complete = True
+            if target.name in self._chains:
+                tail = (target, *self._chains[target.name])
+                break
+            if target.name in position:
+                start = position[target.name]
+                cycle = tuple(path[start:])
+                for i, member in enumerate(cycle):
+                    self._cycles[member.name] = cycle
+                    self._chains[member.name] = (*cycle[i + 1 :], *cycle[: i + 1])
+                path = path[:start]
+                tail = (target, *self._chains[target.name])
+                break
+            position[target.name] = len(path)
+            path.append(target)
+        chains = {}
+        for current in reversed(path):
+            chains[current.name] = tail
+            tail = (current, *tail)
+        if complete:
+            self._chains.update(chains)
+        return chains.get(node.name, self._chains.get(node.name, ()))
+
+    def is_cyclic(self, node: Dataset | Group) -> bool:
+        """True if ``node`` is part of a cycle of ``depends_on`` links"""
+        self.chain(node)
+        return node.name in self._cycles
+
+    def links(self) -> Iterator[DependsOn]:
+        """All links in the indexed tree, in the order of :func:`chexus.iter_tree`"""
+        if self.index is None:
+            return
+        for path in self.index:
+            if (link := self.depends_on(self.index[path])) is not None:
+                yield link
+
+    def dangling(self) -> list[DependsOn]:
+        """Links in the indexed tree with a missing target"""
+        return [link for link in self.links() if link.is_dangling]
+
+    def cycles(self) -> list[tuple[Dataset | Group, ...]]:
+        """Cycles of links in the indexed tree"""
+        cycles = {}
+        for link in self.links():
+            if self.is_cyclic(link.node):
+                cycle = self._cycles[link.node.name]
+                cycles.setdefault(min(member.name for member in cycle), cycle)
+        return list(cycles.values())
@@ -2,28 +2,263 @@
 # Copyright (c) 2023 Scipp contributors (https://github.com/scipp)
 from __future__ import annotations
 
+import copyreg
+import sys
+import weakref
+from collections.abc import Callable, Iterator, Mapping, MutableMapping
 from dataclasses import dataclass, field
-from typing import Any
+from math import prod
+from typing import TYPE_CHECKING, Any, Literal
 
-import h5py
+if TYPE_CHECKING:
+    import h5py
 
-_no_value_set = object()
+
+class _NoValue:
+    def __reduce__(self) -> str:
+        return '_no_value_set'
+
+
+_no_value_set = _NoValue()
+
+
+class _Empty(Mapping):
+    __slots__ = ()
+
+    def __getitem__(self, key: str) -> Any:
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(())
+
+    def __len__(self) -> int:
+        return 0
+
+    def __repr__(self) -> str:
+        return 'EMPTY'
+
+    def __reduce__(self) -> str:
+        # Unpickle as the shared instance, readers test for it with 'is'.
+        return 'EMPTY'
+
+
+EMPTY: Mapping[str, Any] = _Empty()
+"""Read-only mapping shared by the readers for nodes without attributes or children
+
+Nodes return a :class:`_CopyOnWrite` mapping instead, which allocates a dict for
+the node when an item is first set.
+"""
+
+
+class _CopyOnWrite(MutableMapping):
+    """The attributes or children of a node that stores :data:`EMPTY`.
+
+    Empty until an item is set, which replaces :data:`EMPTY` in ``slot`` of
+    ``node`` by a dict that holds the item.
+    """
+
+    __slots__ = ('_data', '_node', '_slot')
+
+    def __init__(self, node: Dataset | Group, slot: str) -> None:
+        self._node = node
+        self._slot = slot
+        self._data: Mapping[str, Any] = EMPTY
+
+    def __getitem__(self, key: str) -> Any:
+        return self._data[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if self._data is EMPTY:
+            # Another mapping of the same node may have allocated the dict.
+            if (data := getattr(self._node, self._slot)) is EMPTY:
+                data = {}
+                setattr(self._node, self._slot, data)
+            self._data = data
+        self._data[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        if self._data is EMPTY:
+            raise KeyError(key)
+        del self._data[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __repr__(self) -> str:
+        return repr(dict(self._data))
+
+    def __reduce__(self) -> tuple[type, tuple[dict[str, Any]]]:
+        return dict, (dict(self._data),)
+
+
+def _stored(mapping: MutableMapping[str, Any]) -> Mapping[str, Any]:
+    """The mapping to store in a node, unwrapping :class:`_CopyOnWrite`"""
+    if type(mapping) is _CopyOnWrite:
+        return mapping._data
+    return mapping
+
+
+DEFAULT_BLOCK_BYTES = 64 * 1024**2
+"""Default memory budget for blocks returned by :meth:`Dataset.iter_blocks`"""
+
+
+class LazyDict(MutableMapping):
+    """Dict that is populated by calling ``load`` on first access.
+
+    Used by the readers to defer reading children and attributes from the file
+    until a validator (or :func:`unroll_tree`) actually looks at them.
+
+    A LazyDict that has not been loaded is pickled with ``load``, which must
+    then be picklable, and is loaded on first access after unpickling. Readers
+    use loaders that refer to the file, so that pickling does not read it.
+    """
+
+    __slots__ = ('_data', '_load', '_pending')
+
+    def __init__(self, load: Callable[[], dict[str, Any]]) -> None:
+        self._load = load
+        self._data: dict[str, Any] | None = None
+        self._pending: dict[str, Any] = {}
+
+    @property
+    def loaded(self) -> bool:
+        """True if the content has been loaded"""
+        return self._data is not None
+
+    def unload(self) -> None:
+        """Drop the loaded content, it is loaded again on next access.
+
+        Items that were set before are dropped as well.
+        """
+        self._data = None
+        self._pending = {}
+
+    def _get(self) -> dict[str, Any]:
+        if self._data is None:
+            self._data = self._load()
+            self._data.update(self._pending)
+            self._pending = {}
+        return self._data
+
+    def __getitem__(self, key: str) -> Any:
+        return self._get()[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        # Setting an item does not trigger loading. The value overrides
+        # whatever is loaded for the same key later.
+        if self._data is None:
+            self._pending[key] = value
+        else:
+            self._data[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        del self._get()[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._get())
+
+    def __len__(self) -> int:
+        return len(self._get())
+
+    def __repr__(self) -> str:
+        if self._data is None:
+            return f"{type(self).__name__}(<not loaded>)"
+        return f"{type(self).__name__}({self._data!r})"
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        if self._data is not None:
+            # 'load' may be a closure, which cannot be pickled.
+            return dict, (self._data,)
+        # Pickle the object itself before the state, which may refer back to it.
+        return copyreg.__newobj__, (type(self),), (self._load, self._pending)
+
+    def __setstate__(self, state: tuple[Callable[[], dict[str, Any]], dict]) -> None:
+        self._load, self._pending = state
+        self._data = None
+
+
+def _child_name(parent: Group, basename: str) -> str:
+    return f"{'' if parent.name == '/' else parent.name}/{basename}"
 
 
-@dataclass
 class Dataset:
-    """Info about an HDF5 dataset"""
+    """Info about an HDF5 dataset
+
+    Trees of large files have millions of datasets, so datasets are kept small:
+    They have no ``__dict__``, and unless the name does not match the parent,
+    they only store their (interned) basename and compute the full name from the
+    parent when needed. Readers share one empty mapping among all nodes without
+    attributes, which is replaced by a dict when an attribute is first set.
+
+    Datasets and groups are not dataclasses: they compare equal only if they are
+    the same object, and :func:`dataclasses.replace` does not support them.
+    """
+
+    __slots__ = (
+        '__weakref__',
+        '_attrs',
+        '_basename',
+        '_name',
+        '_value',
+        'dataset',
+        'dtype',
+        'parent',
+        'shape',
+    )
+
+    def __init__(
+        self,
+        name: str,
+        shape: tuple[int, ...],
+        dtype: str,
+        parent: Group,
+        attrs: MutableMapping[str, Any] | None = None,
+        value: Any | None = _no_value_set,
+        dataset: h5py.Dataset | None = None,
+    ) -> None:
+        self.parent = parent
+        self.name = name
+        self.shape = shape
+        self.dtype = dtype
+        self.attrs = {} if attrs is None else attrs
+        self.value = value
+        self.dataset = dataset
+
+    @property
+    def name(self) -> str:
+        """Absolute path of the dataset"""
+        if self._name is None:
+            return _child_name(self.parent, self._basename)
+        return self._name
+
+    @name.setter
+    def name(self, name: str) -> None:
+        self._basename = sys.intern(name.rpartition('/')[2])
+        if self.parent is not None and name == _child_name(self.parent, self._basename):
+            self._name = None
+        else:
+            self._name = name
+
+    @property
+    def basename(self) -> str:
+        """Last component of the name"""
+        return self._basename
+
+    @property
+    def attrs(self) -> MutableMapping[str, Any]:
+        """Attributes of the dataset"""
+        attrs = self._attrs
+        return attrs if attrs is not EMPTY else _CopyOnWrite(self, '_attrs')
 
-    name: str
-    shape: tuple[int, ...]
-    dtype: str
-    parent: Group
-    attrs: dict[str, Any] = field(default_factory=dict)
-    value: Any | None = None
-    dataset: h5py.Dataset | None = None
+    @attrs.setter
+    def attrs(self, attrs: MutableMapping[str, Any]) -> None:
+        self._attrs = _stored(attrs)
 
     @property
-    def value(self) -> Any | None:  # noqa: F811
+    def value(self) -> Any | None:
         '''Returns the value of the dataset.
         If the value attribute has been set by the user
         that value is returned.
@@ -39,39 +274,156 @@ class Dataset:
             # by saving them in the _value attribute.
             # The reason is that we don't want to
             # run out of memory if the file is large.
-            try:
-                return self.dataset.asstr()[()]
-            except TypeError:
-                return self.dataset[()]
+            return self._read(())
         return None
 
     @value.setter
     def value(self, value: Any):
-        # When the dataclass object is created
-        # the setter will be called with
-        # an instance of type property.
-        # Set _value to uninitialized in that case.
-        if isinstance(value, property):
-            self._value = _no_value_set
-        else:
-            self._value = value
+        self._value = value
+
+    def iter_blocks(self, max_bytes: int = DEFAULT_BLOCK_BYTES) -> Iterator[Any]:
+        """Iterate over the value of the dataset in blocks along the first axis.
+
+        Blocks are aligned with the storage chunks of the h5py dataset. A block
+        holds at most ``max_bytes`` unless a single chunk (or a single row for
+        contiguous datasets) is larger. If the value was set by the user,
+        the dataset is scalar, or it has no h5py dataset, the full value is
+        returned as a single block.
+        """
+        if (
+            self._value is not _no_value_set
+            or self.dataset is None
+            or not self.dataset.shape
+        ):
+            yield self.value
+            return
+        shape = self.dataset.shape
+        row_bytes = max(1, self.dataset.dtype.itemsize * prod(shape[1:]))
+        rows = max(1, max_bytes // row_bytes)
+        if (chunks := self.dataset.chunks) is not None:
+            rows = max(chunks[0], rows // chunks[0] * chunks[0])
+        for start in range(0, shape[0], rows):
+            yield self._read(slice(start, start + rows))
+
+    def _read(self, selection: slice | tuple[()]) -> Any:
+        try:
+            return self.dataset.asstr()[selection]
+        except TypeError:
+            return self.dataset[selection]
+
+    def __repr__(self) -> str:
+        return (
+            f"{type(self).__name__}(name={self.name!r}, shape={self.shape!r}, "
+            f"dtype={self.dtype!r})"
+        )
 
 
-@dataclass
 class Group:
-    """Info about an HDF5 group"""
+    """Info about an HDF5 group
+
+    Like :class:`Dataset`, groups without attributes or children share an empty
+    mapping until an item is first set, and compare equal only to themselves.
+    """
 
-    name: str
-    parent: Group | None = None
-    attrs: dict[str, Any] = field(default_factory=dict)
-    children: dict[str, Dataset | Group] = field(default_factory=dict)
+    __slots__ = ('__weakref__', '_attrs', '_children', 'name', 'parent')
+
+    def __init__(
+        self,
+        name: str,
+        parent: Group | None = None,
+        attrs: MutableMapping[str, Any] | None = None,
+        children: MutableMapping[str, Dataset | Group] | None = None,
+    ) -> None:
+        self.name = name
+        self.parent = parent
+        self.attrs = {} if attrs is None else attrs
+        self.children = {} if children is None else children
+
+    @property
+    def basename(self) -> str:
+        """Last component of the name"""
+        return self.name.rpartition('/')[2]
+
+    @property
+    def attrs(self) -> MutableMapping[str, Any]:
+        """Attributes of the group"""
+        attrs = self._attrs
+        return attrs if attrs is not EMPTY else _CopyOnWrite(self, '_attrs')
+
+    @attrs.setter
+    def attrs(self, attrs: MutableMapping[str, Any]) -> None:
+        self._attrs = _stored(attrs)
+
+    @property
+    def children(self) -> MutableMapping[str, Dataset | Group]:
+        """Datasets and groups in the group, by basename"""
+        children = self._children
+        return children if children is not EMPTY else _CopyOnWrite(self, '_children')
+
+    @children.setter
+    def children(self, children: MutableMapping[str, Dataset | Group]) -> None:
+        self._children = _stored(children)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(name={self.name!r})"
+
+
+def iter_tree(
+    tree: Group, prune: Callable[[Dataset | Group], bool] | None = None
+) -> Iterator[Dataset | Group]:
+    """Iterate over the nodes below ``tree``, parents before their children.
+
+    The tree is traversed without recursion, so arbitrarily deep trees are
+    supported, and nodes are yielded as they are reached. Nodes for which
+    ``prune`` returns True are skipped together with everything below them, so
+    their children are never loaded.
+    """
+    stack = [iter(tree.children.values())]
+    while stack:
+        for node in stack[-1]:
+            if prune is not None and prune(node):
+                continue
+            yield node
+            if isinstance(node, Group):
+                stack.append(iter(node.children.values()))
+            break
+        else:
+            stack.pop()
 
 
 def unroll_tree(tree: Group) -> dict[str, Dataset | Group]:
     """Unroll tree into a flat dictionary"""
-    result = {}
-    for child in tree.children.values():
-        result[child.name] = child
-        if isinstance(child, Group):
-            result.update(unroll_tree(child))
-    return result
+    return {node.name: node for node in iter_tree(tree)}
+
+
+@dataclass(frozen=True)
+class TreeSource:
+    """The file a tree was read from, and how it was read.
+
+    Used to read parts of the tree again in other processes, see
+    :func:`chexus.validate` with ``jobs``.
+    """
+
+    format: Literal['hdf5', 'json']
+    path: str
+    options: dict[str, Any] = field(default_factory=dict)
+    """Keyword arguments of the reader, except ``root_path``"""
+
+
+_sources: weakref.WeakKeyDictionary[Group, TreeSource] = weakref.WeakKeyDictionary()
+
+
+def register_source(tree: Group, source: TreeSource) -> None:
+    """Record the source of a tree, called by the readers"""
+    _sources[_root(tree)] = source
+
+
+def tree_source(node: Dataset | Group) -> TreeSource | None:
+    """Return the source of the tree that ``node`` belongs to, if known"""
+    return _sources.get(_root(node))
+
+
+def _root(node: Dataset | Group) -> Group:
+    while node.parent is not None:
+        node = node.parent
+    return node
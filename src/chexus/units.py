@@ -0,0 +1,343 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2024 Scipp contributors (https://github.com/scipp)
+"""Parser for the units used in NeXus files, without scipp.
+
+Only a subset of UDUNITS is supported: the units in the tables below, with SI
+prefixes where applicable, combined with ``*``, ``.``, ``/``, parentheses, and
+integer powers such as ``m^2``, ``m**2``, ``m2``, or ``s-1``. As in UDUNITS, a
+space between two factors multiplies them, e.g., ``'m s-1'`` or ``'1/(m s)'``,
+if the second factor is a unit or in parentheses. Within the subset, results
+agree with scipp, which tests check on a conformance corpus, except for some
+products with spaces that scipp parses differently or rejects, such as
+``'kg m2 s-2'``. Strings outside of the subset, e.g., ``'2m'`` or ``'m 2'``,
+raise :class:`UnitError` even if scipp can parse them.
+"""
+
+from __future__ import annotations
+
+import functools
+import math
+import re
+from dataclasses import dataclass
+
+# Base units of scipp, in the order of Unit.powers
+BASE_UNITS = ("m", "kg", "s", "A", "K", "mol", "cd", "rad", "counts")
+
+# Powers of base units that are supported
+_MAX_POWER = 7
+
+
+class UnitError(ValueError):
+    """Raised for unit strings that cannot be parsed"""
+
+
+@dataclass(frozen=True)
+class Unit:
+    """Unit as multiple of a product of powers of :data:`BASE_UNITS`"""
+
+    scale: float
+    powers: tuple[int, ...]
+
+    def __mul__(self, other: Unit) -> Unit:
+        return Unit(
+            self.scale * other.scale,
+            tuple(a + b for a, b in zip(self.powers, other.powers, strict=True)),
+        )
+
+    def __rmul__(self, scale: float) -> Unit:
+        return Unit(scale * self.scale, self.powers)
+
+    def __truediv__(self, other: Unit) -> Unit:
+        return self * other**-1
+
+    def __pow__(self, exponent: int) -> Unit:
+        return Unit(self.scale**exponent, tuple(p * exponent for p in self.powers))
+
+    def is_convertible(self, other: Unit) -> bool:
+        """Check if values can be converted between the units"""
+        return self.powers == other.powers
+
+    @property
+    def base_units(self) -> str:
+        """The product of base units, e.g., ``'kg*m^2*s^-2'``, without the scale"""
+        factors = [
+            name if power == 1 else f"{name}^{power}"
+            for name, power in zip(BASE_UNITS, self.powers, strict=True)
+            if power
+        ]
+        return "*".join(factors) or "dimensionless"
+
+
+def _base(name: str) -> Unit:
+    return Unit(1.0, tuple(int(base == name) for base in BASE_UNITS))
+
+
+_one = Unit(1.0, (0,) * len(BASE_UNITS))
+_m, _kg, _s, _A, _K, _mol, _cd, _rad, _counts = map(_base, BASE_UNITS)
+_g = 1e-3 * _kg
+_N = _kg * _m / _s**2
+_J = _N * _m
+_W = _J / _s
+_C = _A * _s
+_V = _W / _A
+_Pa = _N / _m**2
+_T = _V * _s / _m**2
+_deg = math.pi / 180 * _rad
+_rev = 2 * math.pi * _rad
+_min = 60 * _s
+
+# Symbols that can be combined with SI prefixes, e.g., 'mm' or 'kHz'
+_PREFIXABLE = {
+    "m": _m,
+    "s": _s,
+    "g": _g,
+    "A": _A,
+    "K": _K,
+    "mol": _mol,
+    "rad": _rad,
+    "Hz": _s**-1,
+    "N": _N,
+    "J": _J,
+    "W": _W,
+    "C": _C,
+    "V": _V,
+    "ohm": _V / _A,
+    "Ω": _V / _A,
+    "S": _A / _V,
+    "Wb": _V * _s,
+    "T": _T,
+    "Pa": _Pa,
+    "bar": 1e5 * _Pa,
+    "eV": 1.602176634e-19 * _J,
+    "L": 1e-3 * _m**3,
+}
+
+_SYMBOLS = {
+    **_PREFIXABLE,
+    "dimensionless": _one,
+    "%": 0.01 * _one,
+    "percent": 0.01 * _one,
+    "counts": _counts,
+    "count": _counts,
+    # Length
+    "Å": 1e-10 * _m,
+    "angstrom": 1e-10 * _m,
+    "Angstrom": 1e-10 * _m,
+    "angstroms": 1e-10 * _m,
+    "Angstroms": 1e-10 * _m,
+    "micron": 1e-6 * _m,
+    "microns": 1e-6 * _m,
+    "in": 0.0254 * _m,
+    "inch": 0.0254 * _m,
+    "ft": 0.3048 * _m,
+    "barn": 1e-28 * _m**2,
+    # Angle
+    "deg": _deg,
+    "°": _deg,
+    "arcmin": 1 / 60 * _deg,
+    "arcsec": 1 / 3600 * _deg,
+    "sr": _rad**2,
+    "rev": _rev,
+    "turn": _rev,
+    # Time and frequency
+    "sec": _s,
+    "min": _min,
+    "h": 60 * _min,
+    "hr": 60 * _min,
+    "rpm": _rev / _min,
+    # Other
+    "kg": _kg,
+    "hPa": 100 * _Pa,
+    "atm": 101325 * _Pa,
+    "torr": 101325 / 760 * _Pa,
+    "Torr": 101325 / 760 * _Pa,
+    "G": 1e-4 * _T,
+    "gauss": 1e-4 * _T,
+    "Gs": 1e-4 * _T,
+    "cd": _cd,
+    # Not prefixable, 'pH' is not picohenry and 'GF' not gigafarad
+    "H": _V * _s / _A,
+    "F": _C / _V,
+}
+
+# Names that can be combined with the names of SI prefixes, e.g., 'millimetre',
+# and can be plural
+_NAMES = {
+    "metre": _m,
+    "meter": _m,
+    "second": _s,
+    "gram": _g,
+    "ampere": _A,
+    "kelvin": _K,
+    "mole": _mol,
+    "radian": _rad,
+    "degree": _deg,
+    "hertz": _s**-1,
+    "newton": _N,
+    "joule": _J,
+    "watt": _W,
+    "volt": _V,
+    "tesla": _T,
+    "pascal": _Pa,
+    "electronvolt": _PREFIXABLE["eV"],
+}
+
+# Names of units that cannot have a prefix
+_UNPREFIXED_NAMES = {
+    "minute": _min,
+    "hour": 60 * _min,
+    "day": 24 * 60 * _min,
+    "revolution": _rev,
+}
+
+_PREFIXES = {
+    "f": 1e-15,
+    "p": 1e-12,
+    "n": 1e-9,
+    "u": 1e-6,
+    "µ": 1e-6,
+    "μ": 1e-6,
+    "m": 1e-3,
+    "c": 1e-2,
+    "k": 1e3,
+    "M": 1e6,
+    "G": 1e9,
+    "T": 1e12,
+}
+
+_PREFIX_NAMES = {
+    "femto": 1e-15,
+    "pico": 1e-12,
+    "nano": 1e-9,
+    "micro": 1e-6,
+    "milli": 1e-3,
+    "centi": 1e-2,
+    "kilo": 1e3,
+    "mega": 1e6,
+    "giga": 1e9,
+}
+
+_TOKEN = re.compile(
+    r"\s*(?:(?P<number>\d+(?:\.\d+)?(?:[eE][-+]?\d+)?)"
+    r"|(?P<name>[^\W\d_]+|[%°])(?P<power>[-+]?\d+)?"
+    r"|(?P<op>\*\*|[*.·/^()]))"
+)
+_INTEGER = re.compile(r"\s*([-+]?\d+)")
+
+
+def _lookup(name: str) -> Unit:
+    if name in _SYMBOLS:
+        return _SYMBOLS[name]
+    singular = name[:-1] if name.endswith("s") else name
+    for names in (_NAMES, _UNPREFIXED_NAMES):
+        if singular in names:
+            return names[singular]
+    for prefix, scale in _PREFIXES.items():
+        if name.startswith(prefix) and name[len(prefix) :] in _PREFIXABLE:
+            return scale * _PREFIXABLE[name[len(prefix) :]]
+    for prefix, scale in _PREFIX_NAMES.items():
+        if singular.startswith(prefix) and singular[len(prefix) :] in _NAMES:
+            return scale * _NAMES[singular[len(prefix) :]]
+    raise UnitError(f"Unknown unit '{name}'")
+
+
+class _Parser:
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self.pos = 0
+
+    def error(self) -> UnitError:
+        return UnitError(f"Cannot parse unit '{self.text}' at position {self.pos}")
+
+    def peek(self) -> re.Match | None:
+        return _TOKEN.match(self.text, self.pos)
+
+    def parse(self) -> Unit:
+        unit = self.product()
+        if self.text[self.pos :].strip():
+            raise self.error()
+        return unit
+
+    def product(self) -> Unit:
+        unit = self.factor()
+        while token := self.peek():
+            if token["op"] in ("*", ".", "·", "/"):
+                self.pos = token.end()
+                if token["op"] == "/":
+                    unit = unit / self.factor()
+                else:
+                    unit = unit * self.factor()
+            elif self.text[self.pos].isspace() and (
+                token["name"] is not None or token["op"] == "("
+            ):
+                # Factors separated by a space, 'factor' reads the token again.
+                unit = unit * self.factor()
+            else:
+                break
+        return unit
+
+    def factor(self) -> Unit:
+        token = self.peek()
+        if token is None:
+            raise self.error()
+        self.pos = token.end()
+        if token["number"] is not None:
+            return float(token["number"]) * _one
+        if token["op"] == "(":
+            unit = self.product()
+            if (token := self.peek()) is None or token["op"] != ")":
+                raise self.error()
+            self.pos = token.end()
+        elif token["name"] is not None:
+            unit = _lookup(token["name"])
+            if token["power"] is not None:
+                return unit ** int(token["power"])
+        else:
+            raise self.error()
+        if (token := self.peek()) and token["op"] in ("^", "**"):
+            self.pos = token.end()
+            if (power := _INTEGER.match(self.text, self.pos)) is None:
+                raise self.error()
+            self.pos = power.end()
+            unit = unit ** int(power[1])
+        return unit
+
+
+@functools.lru_cache(maxsize=1024)
+def _parse(text: str) -> Unit:
+    if not text:
+        return _one
+    if text in _SYMBOLS:
+        return _SYMBOLS[text]
+    unit = _Parser(text).parse()
+    if any(abs(power) > _MAX_POWER for power in unit.powers):
+        raise UnitError(f"Unsupported power in unit '{text}'")
+    return unit
+
+
+def parse_unit(text: str) -> Unit:
+    """Parse a unit string, raising :class:`UnitError` if it is not supported"""
+    if not isinstance(text, str):
+        raise UnitError(f"Invalid unit type {type(text)}")
+    return _parse(text.strip())
+
+
+def is_parsable(text: str) -> bool:
+    """Check if ``text`` is a supported unit string"""
+    try:
+        parse_unit(text)
+    except UnitError:
+        return False
+    return True
+
+
+def is_convertible(text: str, target: str) -> bool:
+    """Check if ``text`` is a supported unit that can be converted to ``target``
+
+    E.g., ``target='m'`` checks for a length, ``'rad'`` for an angle, and
+    ``'Hz'`` for 1/time.
+    """
+    try:
+        return parse_unit(text).is_convertible(parse_unit(target))
+    except UnitError:
+        return False
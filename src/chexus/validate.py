@@ -3,10 +3,16 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from collections.abc import Callable
+from collections.abc import Callable, Collection, Iterable
 from dataclasses import dataclass
+from itertools import chain
 
-from .tree import Dataset, Group, unroll_tree
+import numpy as np
+
+from .formatting import format_counts, format_violation
+from .index import TreeIndex
+from .table import TreeTable
+from .tree import Dataset, Group, iter_tree
 
 
 @dataclass
@@ -15,14 +21,55 @@ class Violation:
     description: str | None = None
 
     def format(self) -> str:
-        return (
-            f"{self.name} ({self.description})"
-            if self.description is not None
-            else self.name
-        )
+        return format_violation(self.name, self.description)
+
+
+@dataclass(frozen=True)
+class Selector:
+    """Nodes that a validator can apply to.
+
+    All conditions that are not None must hold. Selectors are used by
+    :func:`validate` to skip validators that cannot apply to a node without calling
+    :meth:`Validator.applies_to`, so they must select (at least) all nodes for
+    which ``applies_to`` returns True.
+    """
+
+    kind: type[Dataset | Group] | None = None
+    """Only datasets or only groups"""
+    nx_classes: Collection[str] | None = None
+    """Only nodes with one of these NX_class attributes"""
+    basenames: Collection[str] | None = None
+    """Only nodes with one of these names"""
+    attr: str | None = None
+    """Only nodes with this attribute"""
+
+    def matches(self, node: Dataset | Group) -> bool:
+        if self.kind is not None and not isinstance(node, self.kind):
+            return False
+        if self.basenames is not None and node.basename not in self.basenames:
+            return False
+        if self.attr is not None and self.attr not in node.attrs:
+            return False
+        if self.nx_classes is not None:
+            return _nx_class(node) in self.nx_classes
+        return True
+
+
+def _nx_class(node: Dataset | Group) -> str | None:
+    if "NX_class" not in node.attrs:
+        return None
+    nx_class = node.attrs["NX_class"]
+    return nx_class if isinstance(nx_class, str) else None
 
 
 class Validator(ABC):
+    selectors: tuple[Selector, ...] = ()
+    """Nodes this validator can apply to, see :class:`Selector`.
+
+    A node is passed to :meth:`applies_to` only if it matches any of the selectors.
+    If there are no selectors, every node is passed.
+    """
+
     def __init__(self, name: str, description: str) -> None:
         self.name = name
         self.description = description
@@ -35,6 +82,36 @@ class Validator(ABC):
     def validate(self, node: Dataset | Group) -> Violation | None:
         """Return a Violation if the given node violates this validator"""
 
+    def prepare(self, index: TreeIndex) -> None:
+        """Called by :func:`validate` before validating any node.
+
+        ``index`` is an index of the validated tree. Override this to look up
+        related nodes once instead of searching the tree for every node. The
+        default does nothing. Validators should still work if this was not
+        called, e.g., when calling :meth:`validate` directly.
+        """
+        return None
+
+    def finish(self) -> None:
+        """Called by :func:`validate` after validating all nodes.
+
+        Override this to drop state set by :meth:`prepare`, such as references to
+        the index, so that the validated tree can be freed while the validator is
+        kept for validating other trees. The default does nothing.
+        """
+        return None
+
+    def masks(self, table: TreeTable) -> tuple[np.ndarray, np.ndarray] | None:
+        """Return masks of the nodes in ``table`` that this validator applies to
+        and of the nodes that violate it.
+
+        Override this for validators that can be expressed in terms of the columns
+        of the table. :meth:`validate` is then only called for the violating nodes,
+        to make the violations. The default returns None, i.e., the validator is
+        applied to one node at a time.
+        """
+        return None
+
 
 class ValidationResult:
     def __init__(self, validator: Validator) -> None:
@@ -50,6 +127,25 @@ class ValidationResult:
                 self.fails += 1
                 self.violations.append(violation)
 
+    def apply_masks(
+        self, table: TreeTable, applies: np.ndarray, fails: np.ndarray
+    ) -> None:
+        """Record the result of :meth:`Validator.masks` for all nodes of a table"""
+        self.checks += int(np.count_nonzero(applies))
+        for row in np.flatnonzero(applies & fails):
+            if (violation := self.validator.validate(table.nodes[row])) is not None:
+                self.fails += 1
+                self.violations.append(violation)
+
+    def revalidate(self, node: Dataset | Group) -> None:
+        """Replace the violations for a node that changed since it was validated"""
+        if not self.validator.applies_to(node):
+            return
+        self.violations = [v for v in self.violations if v.name != node.name]
+        if (violation := self.validator.validate(node)) is not None:
+            self.violations.append(violation)
+        self.fails = len(self.violations)
+
     def format_details(self) -> str:
         details = ''
         for violation in self.violations:
@@ -60,33 +156,173 @@ class ValidationResult:
         return f"{self.validator.name}: {self.fails}/{self.checks}\n"
 
 
+class _Dispatcher:
+    """Route nodes to the validators whose selectors they match.
+
+    Whether a selector matches only depends on the kind, basename, NX_class and
+    attribute names of a node. The matching validators are therefore computed once
+    for every combination of these that occurs in the tree, and looked up for
+    all other nodes instead of calling :meth:`Validator.applies_to` of every
+    validator.
+    """
+
+    def __init__(self, results: Collection[ValidationResult]) -> None:
+        self._results = list(results)
+        selectors = [s for r in self._results for s in r.validator.selectors]
+        self._basenames = {
+            name for s in selectors if s.basenames is not None for name in s.basenames
+        }
+        self._nx_classes = {
+            c for s in selectors if s.nx_classes is not None for c in s.nx_classes
+        }
+        attrs = sorted({s.attr for s in selectors if s.attr is not None})
+        self._attr_bits = {attr: 1 << i for i, attr in enumerate(attrs)}
+        self._routes: dict[tuple, list[ValidationResult]] = {}
+
+    def route(self, node: Dataset | Group) -> list[ValidationResult]:
+        """Validations of the validators that may apply to the node"""
+        basename = node.basename
+        nx_class = _nx_class(node) if self._nx_classes else None
+        key = (
+            isinstance(node, Group),
+            basename if basename in self._basenames else None,
+            nx_class if nx_class in self._nx_classes else None,
+            sum(self._attr_bits.get(name, 0) for name in node.attrs)
+            if self._attr_bits
+            else 0,
+        )
+        if (routed := self._routes.get(key)) is None:
+            routed = self._routes[key] = [
+                result
+                for result in self._results
+                if not (selectors := result.validator.selectors)
+                or any(selector.matches(node) for selector in selectors)
+            ]
+        return routed
+
+
+def _never(node: Dataset | Group) -> bool:
+    return False
+
+
 def validate(
     group: Group,
     validators: list[Validator],
-    skip_condition: Callable[Group | Dataset, bool] = lambda n: False,
+    skip_condition: Callable[Group | Dataset, bool] = _never,
+    include_root: bool = False,
+    columnar: bool = False,
+    prune: Callable[[Dataset | Group], bool] | None = None,
+    jobs: int = 1,
 ) -> dict[type, ValidationResult]:
-    tree = unroll_tree(group)
+    """Validate all nodes below ``group``.
+
+    If ``include_root`` is True, ``group`` itself is validated as well. This is
+    useful when validating a subtree, e.g., from
+    ``read_hdf5(path, root_path=...)``.
+
+    Nodes are validated while the tree is traversed with :func:`chexus.iter_tree`.
+    Unlike ``skip_condition``, which only skips the node itself, ``prune`` skips
+    the node and its subtree, which is then never loaded.
+
+    If ``columnar`` is True, a :class:`chexus.table.TreeTable` of the nodes is built
+    and validators that implement :meth:`Validator.masks` are applied to all nodes
+    at once. The results are the same.
+
+    Validators are only applied to the nodes that match their
+    :attr:`Validator.selectors`. If any validator implements
+    :meth:`Validator.prepare`, a :class:`chexus.TreeIndex` of ``group`` is built
+    and passed to it. :meth:`Validator.finish` is called when done, also if
+    validation fails with an exception.
+
+    If ``jobs`` is greater than 1, subtrees such as NXentry and NXdetector groups
+    are validated in a pool of ``jobs`` processes, see
+    :func:`chexus.parallel.validate_parallel`. Each process reads its subtree
+    from the file again, so this requires a tree returned by
+    :func:`chexus.read_hdf5` or :func:`chexus.read_json`. The results are the
+    same as for ``jobs=1``.
+    """
+    if jobs > 1:
+        from .parallel import validate_parallel
+
+        return validate_parallel(
+            group,
+            validators,
+            jobs=jobs,
+            skip_condition=skip_condition,
+            include_root=include_root,
+            columnar=columnar,
+            prune=prune,
+        )
     results = {type(v): ValidationResult(v) for v in validators}
-    for node in tree.values():
-        if skip_condition(node):
-            continue
+    try:
+        _validate_nodes(
+            group,
+            results,
+            skip_condition=skip_condition,
+            include_root=include_root,
+            columnar=columnar,
+            prune=prune,
+        )
+    finally:
+        for validator in validators:
+            validator.finish()
+    return results
+
+
+def _validate_nodes(
+    group: Group,
+    results: dict[type, ValidationResult],
+    skip_condition: Callable[Group | Dataset, bool],
+    include_root: bool,
+    columnar: bool,
+    prune: Callable[[Dataset | Group], bool] | None,
+) -> None:
+    validators = [result.validator for result in results.values()]
+    if any(type(v).prepare is not Validator.prepare for v in validators):
+        index = TreeIndex(group, prune=prune)
+        for validator in validators:
+            validator.prepare(index)
+    nodes: Iterable[Dataset | Group] = iter_tree(group, prune=prune)
+    if include_root:
+        nodes = chain([group], nodes)
+    nodes = (node for node in nodes if not skip_condition(node))
+    per_node = list(results.values())
+    if columnar:
+        nodes = list(nodes)
+        table = TreeTable(nodes)
+        per_node = []
         for validation in results.values():
+            if (masks := validation.validator.masks(table)) is None:
+                per_node.append(validation)
+            else:
+                validation.apply_masks(table, *masks)
+    dispatcher = _Dispatcher(per_node)
+    for node in nodes:
+        for validation in dispatcher.route(node):
             validation.apply(node)
-    return results
+
+
+def revalidate(
+    results: dict[type, ValidationResult], nodes: list[Dataset | Group]
+) -> None:
+    """Update results of :func:`validate` for nodes that changed.
+
+    Only the given nodes are validated again, e.g., the nodes returned by
+    :func:`chexus.hdf5.refresh` for a file that is still being written.
+    """
+    for node in nodes:
+        for result in results.values():
+            result.revalidate(node)
 
 
 def report(results: dict[type, ValidationResult]) -> str:
     details = 'Violations\n----------\n'
-    summary = 'Summary\n-------\n'
-    total_checks = 0
-    total_violations = 0
     for result in results.values():
-        total_checks += result.checks
-        total_violations += result.fails
         details += result.format_details()
-        summary += result.format_summary()
-    summary += '\n'
-    summary += f"Total: {total_violations}/{total_checks}"
+    summary = format_counts(
+        (result.validator.name, result.fails, result.checks)
+        for result in results.values()
+    )
     return f'{details}\n\n{summary}'
 
 
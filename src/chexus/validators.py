@@ -1,12 +1,89 @@
 # SPDX-License-Identifier: BSD-3-Clause
 # Copyright (c) 2023 Scipp contributors (https://github.com/scipp)
+import functools
+import weakref
+from collections.abc import Callable
+from typing import Any
+
 import numpy as np
 
-from .tree import Dataset, Group
-from .validate import Validator, Violation
+from . import units
+from .index import TreeIndex
+from .table import TreeTable
+from .transformations import TransformationGraph
+from .tree import DEFAULT_BLOCK_BYTES, Dataset, Group
+from .validate import Selector, Validator, Violation
+
+
+class _ObjectCache:
+    """Cache of results computed from the values of one or more datasets
+
+    Results are keyed by the underlying HDF5 objects. Datasets that are hard-linked
+    into several places share those, so the values only need to be read once.
+    Entries are dropped together with the HDF5 objects, and recomputed if the
+    shape of a dataset changed, e.g., after :func:`chexus.hdf5.refresh`. Results for
+    datasets that are not backed by a file are not cached.
+    """
+
+    def __init__(self) -> None:
+        self._cache = weakref.WeakKeyDictionary()
+
+    def __getstate__(self) -> dict[str, Any]:
+        # Validators are sent to worker processes by chexus.validate(jobs=...).
+        # The cached HDF5 objects cannot be, and are meaningless there anyway.
+        return {}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__init__()
+
+    def get(self, *datasets: Dataset, compute: Callable[[], Any]) -> Any:
+        if any(ds.dataset is None for ds in datasets):
+            return compute()
+        cache = self._cache
+        for ds in datasets[:-1]:
+            cache = cache.setdefault(ds.dataset, weakref.WeakKeyDictionary())
+        key = datasets[-1].dataset
+        shapes = tuple(ds.shape for ds in datasets)
+        if (entry := cache.get(key)) is None or entry[0] != shapes:
+            entry = cache[key] = (shapes, compute())
+        return entry[1]
+
+
+@functools.lru_cache(maxsize=1024)
+def _is_valid_unit(unit: Any, target: str | None, use_scipp: bool) -> bool:
+    """Check if ``unit`` can be parsed and, if given, converted to ``target``
+
+    Units are parsed by scipp if ``use_scipp`` is True, and otherwise by
+    :mod:`chexus.units`, which supports a subset of the units of scipp. Files
+    have many datasets but few distinct units, so the result is cached for each
+    unit and target. See :func:`unit_cache_info` for hits and misses.
+    """
+    if not use_scipp:
+        try:
+            parsed = units.parse_unit(unit)
+        except units.UnitError:
+            return False
+        return target is None or parsed.is_convertible(units.parse_unit(target))
+    import scipp as sc
+
+    try:
+        if target is None:
+            sc.Unit(unit)
+        else:
+            sc.scalar(1, unit=unit).to(unit=target)
+    except sc.UnitError:
+        return False
+    return True
+
+
+def unit_cache_info() -> functools._CacheInfo:
+    """Hits, misses, and size of the cache of units checked by the validators"""
+    return _is_valid_unit.cache_info()
 
 
 class NX_class_attr_missing(Validator):
+    selectors = (Selector(kind=Group),)
+
     def __init__(self) -> None:
         super().__init__("NX_class_attr_missing", "NX_class attribute is missing")
 
@@ -17,8 +94,50 @@ class NX_class_attr_missing(Validator):
         if "NX_class" not in node.attrs:
             return Violation(node.name)
 
+    def masks(self, table: TreeTable) -> tuple[np.ndarray, np.ndarray]:
+        return table.is_group, ~table.has_attr("NX_class")
+
+
+class _DependsOnValidator(Validator):
+    """Base for validators that follow depends_on links"""
+
+    def __init__(self, name: str, description: str) -> None:
+        super().__init__(name, description)
+        self._graph: TransformationGraph | None = None
+        self._unindexed: tuple[Group, TransformationGraph] | None = None
+
+    def prepare(self, index: TreeIndex) -> None:
+        self._graph = index.transformations
+
+    def finish(self) -> None:
+        # The graphs refer to the validated tree, which must not be kept alive.
+        self._graph = None
+        self._unindexed = None
+
+    def __getstate__(self) -> dict[str, Any]:
+        # The graphs refer to HDF5 objects, which cannot be pickled.
+        return {**self.__dict__, '_graph': None, '_unindexed': None}
+
+    def _transformations(self, node: Dataset | Group) -> TransformationGraph:
+        """The graph of the validated tree, or a graph without index if there is
+        none or ``node`` is not in it.
+
+        The graph without index is shared by all nodes of a tree until
+        :meth:`finish` is called, e.g., by :func:`chexus.validate_stream`.
+        """
+        if self._graph is not None and self._graph.index.get(node.name) is node:
+            return self._graph
+        root = node
+        while root.parent is not None:
+            root = root.parent
+        if self._unindexed is None or self._unindexed[0] is not root:
+            self._unindexed = (root, TransformationGraph())
+        return self._unindexed[1]
+
+
+class depends_on_target_missing(_DependsOnValidator):
+    selectors = (Selector(basenames=("depends_on",)), Selector(attr="depends_on"))
 
-class depends_on_target_missing(Validator):
     def __init__(self) -> None:
         super().__init__(
             "depends_on_target_missing",
@@ -29,38 +148,43 @@ class depends_on_target_missing(Validator):
         return node.name.endswith("/depends_on") or "depends_on" in node.attrs
 
     def validate(self, node: Dataset | Group) -> Violation | None:
-        if node.name.endswith("/depends_on"):
-            target = node.value
-        else:
-            target = node.attrs["depends_on"]
-        if target == ".":
+        link = self._transformations(node).depends_on(node)
+        if link.is_end:
             return None
+        target = link.path
         if not isinstance(target, str):
             return Violation(node.name, f"depends_on target {target} is not a string")
-        path = target.split("/")
-        if path[0] == "":
-            start = self._find_root(node)
-            path = path[1:]
-        else:
-            start = node.parent
-        if path[0] == ".":
-            path = path[1:]
-        for name in path:
-            if name not in start.children:
-                return Violation(node.name, f"depends_on target {target} is missing")
-            start = start.children[name]
-        if not is_transformation(start):
+        if link.target is None:
+            return Violation(node.name, f"depends_on target {target} is missing")
+        if not is_transformation(link.target):
             return Violation(
                 node.name, f"depends_on target {target} is not a transformation"
             )
 
-    def _find_root(self, node: Dataset | Group) -> Dataset | Group:
-        while node.parent is not None:
-            node = node.parent
-        return node
+
+class depends_on_cycle(_DependsOnValidator):
+    selectors = (Selector(attr="depends_on"),)
+
+    def __init__(self) -> None:
+        super().__init__(
+            "depends_on_cycle",
+            "Chain of depends_on links should not have a cycle.",
+        )
+
+    def applies_to(self, node: Dataset | Group) -> bool:
+        return "depends_on" in node.attrs
+
+    def validate(self, node: Dataset | Group) -> Violation | None:
+        graph = self._transformations(node)
+        if graph.is_cyclic(node):
+            cycle = " -> ".join(n.name for n in (node, *graph.chain(node)))
+            return Violation(node.name, f"depends_on cycle {cycle}")
 
 
 class NX_class_is_legacy(Validator):
+    legacy_classes = ("NXgeometry", "NXorientation", "NXshape", "NXtranslation")
+    selectors = (Selector(kind=Group, attr="NX_class"),)
+
     def __init__(self) -> None:
         super().__init__("NX_class_is_legacy", "Check if NX_class is deprecated")
 
@@ -69,11 +193,19 @@ class NX_class_is_legacy(Validator):
 
     def validate(self, node: Dataset | Group) -> Violation | None:
         nx_class = node.attrs.get("NX_class")
-        if nx_class in ["NXgeometry", "NXorientation", "NXshape", "NXtranslation"]:
+        if nx_class in self.legacy_classes:
             return Violation(node.name, f"NX_class {nx_class} is deprecated")
 
+    def masks(self, table: TreeTable) -> tuple[np.ndarray, np.ndarray]:
+        return (
+            table.is_group & table.has_attr("NX_class"),
+            table.nx_class_in(self.legacy_classes),
+        )
+
 
 class group_has_units(Validator):
+    selectors = (Selector(kind=Group),)
+
     def __init__(self) -> None:
         super().__init__("group_has_units", "Group should not have units attribute")
 
@@ -84,8 +216,13 @@ class group_has_units(Validator):
         if "units" in node.attrs:
             return Violation(node.name)
 
+    def masks(self, table: TreeTable) -> tuple[np.ndarray, np.ndarray]:
+        return table.is_group, table.has_attr("units")
+
 
 class units_invalid(Validator):
+    selectors = (Selector(kind=Dataset, attr="units"),)
+
     def __init__(self) -> None:
         super().__init__("units_invalid", "Invalid units attribute")
 
@@ -103,32 +240,41 @@ class units_invalid(Validator):
 
 
 class index_has_units(Validator):
+    names = (
+        "cue_index",
+        "cylinders",
+        "detector_faces",
+        "detector_number",
+        "event_id",
+        "event_index",
+        "faces",
+        "image_key",
+        "winding_order",
+    )
+    selectors = (Selector(kind=Dataset, basenames=names),)
+
     def __init__(self) -> None:
         super().__init__(
             "index_has_units", "Index or mask should not have units attribute"
         )
 
     def applies_to(self, node: Dataset | Group) -> bool:
-        names = [
-            "cue_index",
-            "cylinders",
-            "detector_faces",
-            "detector_number",
-            "event_id",
-            "event_index",
-            "faces",
-            "image_key",
-            "winding_order",
-        ]
-        name = node.name.split("/")[-1]
-        return isinstance(node, Dataset) and name in names
+        return isinstance(node, Dataset) and node.basename in self.names
 
     def validate(self, node: Dataset | Group) -> Violation | None:
         if "units" in node.attrs:
             return Violation(node.name)
 
+    def masks(self, table: TreeTable) -> tuple[np.ndarray, np.ndarray]:
+        return (
+            table.is_dataset & table.basename_in(self.names),
+            table.has_attr("units"),
+        )
+
 
 class mask_has_units(Validator):
+    selectors = (Selector(kind=Dataset),)
+
     def __init__(self) -> None:
         super().__init__("mask_has_units", "Mask should not have units attribute")
 
@@ -141,39 +287,49 @@ class mask_has_units(Validator):
 
 
 class float_dataset_units_missing(Validator):
+    selectors = (Selector(kind=Dataset),)
+
     def __init__(self) -> None:
         super().__init__(
             "float_dataset_units_missing", "Float dataset should have units attribute"
         )
 
     def applies_to(self, node: Dataset | Group) -> bool:
-        return isinstance(node, Dataset) and node.dtype in [np.float32, np.float64]
+        return isinstance(node, Dataset) and self._is_float(node.dtype)
 
     def validate(self, node: Dataset | Group) -> Violation | None:
         if "units" not in node.attrs:
             return Violation(node.name)
 
+    def masks(self, table: TreeTable) -> tuple[np.ndarray, np.ndarray]:
+        return table.dtype_matches(self._is_float), ~table.has_attr("units")
+
+    @staticmethod
+    def _is_float(dtype: Any) -> bool:
+        return dtype in [np.float32, np.float64]
+
 
 class dataset_units_check(Validator):
-    def __init__(self) -> None:
+    selectors = (Selector(kind=Dataset, attr="units"),)
+
+    def __init__(self, *, use_scipp: bool = True) -> None:
         super().__init__(
             "dataset_units_check",
             "Dataset should have units parasable by scipp",
         )
+        self.use_scipp = use_scipp
 
     def applies_to(self, node: Dataset | Group) -> bool:
         return isinstance(node, Dataset) and "units" in node.attrs
 
     def validate(self, node: Dataset | Group) -> Violation | None:
-        import scipp as sc
-
-        try:
-            sc.Unit(node.attrs["units"])
-        except sc.UnitError:
+        if not _is_valid_unit(node.attrs["units"], None, self.use_scipp):
             return Violation(node.name)
 
 
 class non_numeric_dataset_has_units(Validator):
+    selectors = (Selector(kind=Dataset),)
+
     def __init__(self) -> None:
         super().__init__(
             "non_numeric_dataset_has_units",
@@ -181,18 +337,31 @@ class non_numeric_dataset_has_units(Validator):
         )
 
     def applies_to(self, node: Dataset | Group) -> bool:
-        return isinstance(node, Dataset) and not np.issubdtype(node.dtype, np.number)
+        return isinstance(node, Dataset) and self._is_non_numeric(node.dtype)
 
     def validate(self, node: Dataset | Group) -> Violation | None:
         if "units" in node.attrs:
             return Violation(node.name)
 
+    def masks(self, table: TreeTable) -> tuple[np.ndarray, np.ndarray]:
+        return table.dtype_matches(self._is_non_numeric), table.has_attr("units")
+
+    @staticmethod
+    def _is_non_numeric(dtype: Any) -> bool:
+        return not np.issubdtype(dtype, np.number)
+
 
 def is_transformation(node: Dataset | Group) -> bool:
     return "transformation_type" in node.attrs and "vector" in node.attrs
 
 
+def _is_transformation_mask(table: TreeTable) -> np.ndarray:
+    return table.has_attr("transformation_type") & table.has_attr("vector")
+
+
 class transformation_offset_units_missing(Validator):
+    selectors = (Selector(attr="offset"),)
+
     def __init__(self) -> None:
         super().__init__(
             "transformation_offset_units_missing",
@@ -206,34 +375,42 @@ class transformation_offset_units_missing(Validator):
         if "offset_units" not in node.attrs:
             return Violation(node.name)
 
+    def masks(self, table: TreeTable) -> tuple[np.ndarray, np.ndarray]:
+        return (
+            _is_transformation_mask(table) & table.has_attr("offset"),
+            ~table.has_attr("offset_units"),
+        )
+
 
 class transformation_offset_units_invalid(Validator):
-    def __init__(self) -> None:
+    selectors = (Selector(attr="offset_units"),)
+
+    def __init__(self, *, use_scipp: bool = True) -> None:
         super().__init__(
             "transformation_offset_units_invalid",
             "Transformation offset_units attr. should be a length unit",
         )
+        self.use_scipp = use_scipp
 
     def applies_to(self, node: Dataset | Group) -> bool:
         return is_transformation(node) and "offset_units" in node.attrs
 
     def validate(self, node: Dataset | Group) -> Violation | None:
-        import scipp as sc
-
-        try:
-            sc.scalar(1, unit=node.attrs["offset_units"]).to(unit="m")
-        except sc.UnitError:
+        if not _is_valid_unit(node.attrs["offset_units"], "m", self.use_scipp):
             return Violation(node.name)
 
 
 class transformation_units_invalid(Validator):
-    def __init__(self) -> None:
+    selectors = (Selector(attr="transformation_type"),)
+
+    def __init__(self, *, use_scipp: bool = True) -> None:
         super().__init__(
             "transformation_value_units_invalid",
             "Transformation value units should be a length unit "
             "if transformation type is translation and "
             "a rotation unit if transformation type is rotation",
         )
+        self.use_scipp = use_scipp
 
     def applies_to(self, node: Dataset | Group) -> bool:
         return is_transformation(node) and (
@@ -242,21 +419,19 @@ class transformation_units_invalid(Validator):
         )
 
     def validate(self, node: Dataset | Group) -> Violation | None:
-        import scipp as sc
-
         unit = (node.children['value'] if isinstance(node, Group) else node).attrs.get(
             'units'
         )
         expected_unit = (
             "m" if node.attrs["transformation_type"] == "translation" else "rad"
         )
-        try:
-            sc.scalar(1, unit=unit).to(unit=expected_unit)
-        except sc.UnitError:
+        if not _is_valid_unit(unit, expected_unit, self.use_scipp):
             return Violation(node.name)
 
 
 class transformation_depends_on_missing(Validator):
+    selectors = (Selector(kind=Dataset, attr="transformation_type"),)
+
     def __init__(self) -> None:
         super().__init__(
             "transformation_depends_on_missing",
@@ -270,13 +445,22 @@ class transformation_depends_on_missing(Validator):
         if "depends_on" not in node.attrs:
             return Violation(node.name)
 
+    def masks(self, table: TreeTable) -> tuple[np.ndarray, np.ndarray]:
+        return (
+            table.is_dataset & _is_transformation_mask(table),
+            ~table.has_attr("depends_on"),
+        )
+
 
 class chopper_frequency_units_invalid(Validator):
-    def __init__(self) -> None:
+    selectors = (Selector(kind=Group, nx_classes=("NXdisk_chopper",)),)
+
+    def __init__(self, *, use_scipp: bool = True) -> None:
         super().__init__(
             "chopper_frequency_unit_invalid",
             "The unit of NXdisk_chopper.rotation_speed should have dimension 1/Time",
         )
+        self.use_scipp = use_scipp
 
     def applies_to(self, node: Dataset | Group) -> bool:
         return (
@@ -286,8 +470,6 @@ class chopper_frequency_units_invalid(Validator):
         )
 
     def validate(self, node: Dataset | Group) -> Violation | None:
-        import scipp as sc
-
         rotation_speed = node.children.get("rotation_speed")
         if (
             "NXlog" == rotation_speed.attrs.get("NX_class")
@@ -298,22 +480,21 @@ class chopper_frequency_units_invalid(Validator):
             unit = rotation_speed.attrs.get("units")
         else:
             return
-        try:
-            sc.scalar(1, unit=unit).to(unit="Hz")
-        except sc.UnitError:
-            pass
-        else:
-            return
-        return Violation(node.name)
+        if not _is_valid_unit(unit, "Hz", self.use_scipp):
+            return Violation(node.name)
 
 
 class detector_numbers_unique_in_detector(Validator):
-    def __init__(self) -> None:
+    selectors = (Selector(kind=Group, nx_classes=("NXdetector",)),)
+
+    def __init__(self, *, max_bytes: int = DEFAULT_BLOCK_BYTES) -> None:
         super().__init__(
             "detector_numbers are not unique",
             "The values in all detector_numbers fields in all "
             "detectors should be unique.",
         )
+        self.max_bytes = max_bytes
+        self._cache = _ObjectCache()
 
     def applies_to(self, node: Dataset | Group) -> bool:
         return (
@@ -323,21 +504,43 @@ class detector_numbers_unique_in_detector(Validator):
         )
 
     def validate(self, node: Dataset | Group) -> Violation | None:
-        detector_numbers = np.asarray(node.children['detector_number'].value)
-        if not hasattr(detector_numbers, '__len__'):
-            return
-        if not len(detector_numbers.ravel()) == len(np.unique(detector_numbers)):
+        detector_number = node.children['detector_number']
+        if not self._cache.get(
+            detector_number, compute=lambda: self._is_unique(detector_number)
+        ):
             return Violation(node.name)
 
+    def _is_unique(self, detector_number: Dataset) -> bool:
+        # Duplicates within a block are found while reading. Across blocks, the
+        # sorted uniques of all blocks are merged with a single sort at the end,
+        # which exploits that they are sorted runs. If the values are unique,
+        # this holds all of them plus one copy for the merge, i.e., about twice
+        # the size of the dataset.
+        blocks = []
+        for block in detector_number.iter_blocks(max_bytes=self.max_bytes):
+            values = np.asarray(block).ravel()
+            unique = np.unique(values)
+            if len(unique) != len(values):
+                return False
+            blocks.append(unique)
+        if len(blocks) < 2:
+            return True
+        merged = np.sort(np.concatenate(blocks), kind='stable')
+        return not np.any(merged[1:] == merged[:-1])
+
 
 class event_id_subset_of_detector_number(Validator):
-    def __init__(self) -> None:
+    selectors = (Selector(kind=Group, nx_classes=("NXevent_data",)),)
+
+    def __init__(self, *, max_bytes: int = DEFAULT_BLOCK_BYTES) -> None:
         super().__init__(
             "event_id is not subset of associated detector_numbers",
             "The values in the event_id field in NXevent_data should be "
             "a subset of the values in the detector_number dataset on the "
             "associated NXdetector.",
         )
+        self.max_bytes = max_bytes
+        self._cache = _ObjectCache()
 
     def applies_to(self, node: Dataset | Group) -> bool:
         return (
@@ -348,14 +551,28 @@ class event_id_subset_of_detector_number(Validator):
         )
 
     def validate(self, node: Dataset | Group) -> Violation | None:
-        if not np.isin(
-            node.children['event_id'].value,
-            node.parent.children['detector_number'].value,
-        ).all():
+        event_id = node.children['event_id']
+        detector_number = node.parent.children['detector_number']
+        if not self._cache.get(
+            event_id,
+            detector_number,
+            compute=lambda: self._is_subset(event_id, detector_number),
+        ):
             return Violation(node.name)
 
+    def _is_subset(self, event_id: Dataset, detector_number: Dataset) -> bool:
+        # There are typically many more events than detector pixels, so only
+        # event_id is read in blocks.
+        detector_numbers = np.unique(detector_number.value)
+        return all(
+            np.isin(block, detector_numbers).all()
+            for block in event_id.iter_blocks(max_bytes=self.max_bytes)
+        )
+
 
 class NXdetector_pixel_offsets_are_unambiguous(Validator):
+    selectors = (Selector(kind=Group, nx_classes=("NXdetector",)),)
+
     def __init__(self) -> None:
         super().__init__(
             "Shape of pixel offsets does not correspond to detector_number",
@@ -423,6 +640,8 @@ physical_components = [
 
 
 class depends_on_missing(Validator):
+    selectors = (Selector(kind=Group, nx_classes=physical_components),)
+
     def __init__(self) -> None:
         super().__init__(
             "depends_on_missing",
@@ -441,6 +660,8 @@ class depends_on_missing(Validator):
 
 
 class NXlog_has_value(Validator):
+    selectors = (Selector(kind=Group, nx_classes=("NXlog",)),)
+
     def __init__(self) -> None:
         super().__init__(
             "NXlog_has_value",
@@ -461,10 +682,18 @@ class NXlog_has_value(Validator):
                 return Violation(node.name, "NXlog must have a value")
 
 
-def base_validators(*, has_scipp=True):
-    validators = [
+def base_validators(*, has_scipp=True, max_bytes: int = DEFAULT_BLOCK_BYTES):
+    """Return the default validators.
+
+    Units are checked with scipp if ``has_scipp`` is True, and otherwise with the
+    parser in :mod:`chexus.units`, which reports units that it does not support
+    as invalid. ``max_bytes`` is the memory budget for blocks of dataset values
+    read by validators that check values.
+    """
+    return [
         depends_on_missing(),
         depends_on_target_missing(),
+        depends_on_cycle(),
         float_dataset_units_missing(),
         group_has_units(),
         index_has_units(),
@@ -476,15 +705,11 @@ def base_validators(*, has_scipp=True):
         transformation_offset_units_missing(),
         units_invalid(),
         NXlog_has_value(),
-        detector_numbers_unique_in_detector(),
-        event_id_subset_of_detector_number(),
+        detector_numbers_unique_in_detector(max_bytes=max_bytes),
+        event_id_subset_of_detector_number(max_bytes=max_bytes),
         NXdetector_pixel_offsets_are_unambiguous(),
+        chopper_frequency_units_invalid(use_scipp=has_scipp),
+        dataset_units_check(use_scipp=has_scipp),
+        transformation_offset_units_invalid(use_scipp=has_scipp),
+        transformation_units_invalid(use_scipp=has_scipp),
     ]
-    if has_scipp:
-        validators += [
-            chopper_frequency_units_invalid(),
-            dataset_units_check(),
-            transformation_offset_units_invalid(),
-            transformation_units_invalid(),
-        ]
-    return validators
@@ -0,0 +1,314 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2024 Scipp contributors (https://github.com/scipp)
+from __future__ import annotations
+
+import ctypes
+import os
+import select
+import socket
+import stat
+import struct
+import sys
+import time
+from collections.abc import Callable
+from typing import TextIO
+
+import h5py
+
+from .batch import FILE_SUFFIXES, FileResult, WorkerPool
+from .validate import Validator
+
+# From <sys/inotify.h>
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_Q_OVERFLOW = 0x00004000
+_IN_ISDIR = 0x40000000
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_EVENT = struct.Struct('iIII')
+
+_libc = ctypes.CDLL(None, use_errno=True) if sys.platform == 'linux' else None
+
+
+class DirectoryWatcher:
+    """Find files in a directory tree once they have been written.
+
+    Files with one of the :data:`chexus.batch.FILE_SUFFIXES` that are created or
+    moved into ``directory`` or its subdirectories after the watcher was created
+    are returned by :meth:`poll` once they are finished, i.e., once the writer
+    has closed them.
+
+    On Linux, the watcher is notified by the kernel with inotify when a file that
+    was open for writing is closed or when a file is moved into the directory.
+    HDF5 files that are locked by a writer at that point, e.g., because the
+    writer opened the file again, are checked by polling as described below.
+    Elsewhere, or if ``use_inotify`` is False or inotify is not available, e.g.,
+    on network filesystems, the directory is scanned every ``interval`` seconds.
+    A file is then considered to be finished if its size and modification time
+    did not change for ``settle`` seconds and, for HDF5 files, if it is not
+    locked by a writer. The watcher also switches to scanning if a directory
+    cannot be watched with inotify, e.g., because the limit of watches is reached.
+
+    In both modes, a file that is written again after it was returned is
+    returned again.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        *,
+        use_inotify: bool = True,
+        interval: float = 1.0,
+        settle: float = 2.0,
+    ) -> None:
+        self.directory = directory
+        self.interval = interval
+        self.settle = settle
+        # Candidates for polling: path -> (size, mtime, time of last change)
+        self._candidates: dict[str, tuple[int, float, float]] = {}
+        # Files known when polling: path -> (size, mtime)
+        self._seen: dict[str, tuple[int, float]] = {}
+        self._fd: int | None = None
+        self._watches: dict[int, str] = {}
+        # New directories that could not be watched with inotify
+        self._unwatched: list[str] = []
+        if use_inotify and sys.platform == 'linux':
+            self._fd = _inotify_init()
+        if self._fd is None:
+            self._seen = self._scan(directory)
+        elif not self._watch_tree(directory, add_files=False):
+            self._use_polling()
+
+    @property
+    def uses_inotify(self) -> bool:
+        return self._fd is not None
+
+    def close(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def poll(self, timeout: float | None = None) -> list[str]:
+        """Wait for at most ``timeout`` seconds and return the finished files.
+
+        Returns as soon as any file is finished.
+        """
+        end = None if timeout is None else time.monotonic() + timeout
+        while True:
+            if self._fd is not None:
+                finished = self._read_events(self._wait_time(end))
+            else:
+                finished = []
+                files = self._scan(self.directory)
+                for path, info in files.items():
+                    if self._seen.get(path) != info and path not in self._candidates:
+                        self._candidates[path] = (-1, -1.0, time.monotonic())
+                # Forget deleted files, so that new files of the same name and
+                # size are found.
+                self._seen = {p: self._seen[p] for p in files if p in self._seen}
+            finished += self._check_candidates()
+            if finished or (end is not None and time.monotonic() >= end):
+                return finished
+            if self._fd is None:
+                time.sleep(self._wait_time(end))
+
+    def _wait_time(self, end: float | None) -> float:
+        wait = self.interval
+        if end is not None:
+            wait = min(wait, max(0.0, end - time.monotonic()))
+        return wait
+
+    def _scan(self, directory: str) -> dict[str, tuple[int, float]]:
+        """Return size and modification time of the files below ``directory``"""
+        files = {}
+        for root, _, names in os.walk(directory):
+            for name in names:
+                if not name.endswith(FILE_SUFFIXES):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    info = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                files[path] = (info.st_size, info.st_mtime)
+        return files
+
+    def _check_candidates(self) -> list[str]:
+        finished = []
+        now = time.monotonic()
+        for path, (size, mtime, changed) in list(self._candidates.items()):
+            try:
+                info = os.stat(path)
+            except FileNotFoundError:
+                del self._candidates[path]
+                continue
+            if (info.st_size, info.st_mtime) != (size, mtime):
+                self._candidates[path] = (info.st_size, info.st_mtime, now)
+            elif now - changed >= self.settle and not _is_locked(path):
+                del self._candidates[path]
+                finished.append(path)
+                if self._fd is None:
+                    self._seen[path] = (size, mtime)
+        return finished
+
+    def _watch_tree(self, directory: str, add_files: bool) -> bool:
+        """Watch ``directory`` and its subdirectories, return False on failure"""
+        mask = _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE
+        for root, _, names in os.walk(directory):
+            wd = _libc.inotify_add_watch(self._fd, os.fsencode(root), mask)
+            if wd < 0:
+                # E.g., ENOSPC if the limit of watches per user is reached
+                return False
+            self._watches[wd] = root
+            if add_files:
+                # Files created before the watch was added, check them by polling.
+                for name in names:
+                    if name.endswith(FILE_SUFFIXES):
+                        self._candidates[os.path.join(root, name)] = (-1, -1.0, 0.0)
+        return True
+
+    def _use_polling(self) -> None:
+        """Stop using inotify and find files by scanning the directory"""
+        os.close(self._fd)
+        self._fd = None
+        self._watches = {}
+        # Files below new directories are checked, the others are known.
+        new = tuple(os.path.join(directory, '') for directory in self._unwatched)
+        self._unwatched = []
+        for path, info in self._scan(self.directory).items():
+            if path.startswith(new):
+                self._candidates.setdefault(path, (-1, -1.0, 0.0))
+            else:
+                self._seen[path] = info
+
+    def _read_events(self, timeout: float) -> list[str]:
+        """Wait for events and handle all of them that are queued"""
+        finished = []
+        while select.select([self._fd], [], [], timeout)[0]:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            finished += self._handle_events(data)
+            timeout = 0
+        if self._unwatched:
+            self._use_polling()
+        return list(dict.fromkeys(finished))
+
+    def _handle_events(self, data: bytes) -> list[str]:
+        finished = []
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = _EVENT.unpack_from(data, offset)
+            offset += _EVENT.size
+            name = os.fsdecode(data[offset : offset + length].rstrip(b'\0'))
+            offset += length
+            if mask & _IN_Q_OVERFLOW:
+                # Events were lost, find files written in the meantime by polling.
+                for path in self._scan(self.directory):
+                    self._candidates.setdefault(path, (-1, -1.0, 0.0))
+                continue
+            if wd not in self._watches:
+                continue
+            path = os.path.join(self._watches[wd], name)
+            if mask & _IN_ISDIR:
+                if mask & (_IN_CREATE | _IN_MOVED_TO) and not self._watch_tree(
+                    path, add_files=True
+                ):
+                    self._unwatched.append(path)
+            elif mask & (_IN_CLOSE_WRITE | _IN_MOVED_TO) and name.endswith(
+                FILE_SUFFIXES
+            ):
+                if _is_locked(path):
+                    # Reopened by the writer, e.g., when switching to SWMR mode.
+                    # Check it by polling until it is unlocked.
+                    self._candidates[path] = (-1, -1.0, 0.0)
+                else:
+                    self._candidates.pop(path, None)
+                    finished.append(path)
+        return finished
+
+
+def _inotify_init() -> int | None:
+    """Return an inotify file descriptor, or None if inotify is not available"""
+    try:
+        init = _libc.inotify_init1
+    except AttributeError:
+        return None
+    fd = init(_IN_NONBLOCK | _IN_CLOEXEC)
+    if fd < 0:
+        return None
+    return fd
+
+
+def _is_locked(path: str) -> bool:
+    """Return True if ``path`` is an HDF5 file that is open for writing"""
+    if not h5py.is_hdf5(path):
+        return False
+    try:
+        with h5py.File(path, 'r'):
+            return False
+    except BlockingIOError:
+        # HDF5 locks files that are open for writing, unless locking is disabled.
+        return True
+    except OSError:
+        # E.g., a corrupt file, which is reported when validating it.
+        return False
+
+
+def watch(
+    directory: str,
+    validators: list[Validator],
+    callback: Callable[[FileResult], None],
+    *,
+    jobs: int = 1,
+    timeout: float | None = None,
+    memory_limit: int | None = None,
+    use_inotify: bool = True,
+    interval: float = 1.0,
+    settle: float = 2.0,
+    until: Callable[[], bool] | None = None,
+    **kwargs,
+) -> None:
+    """Validate files as soon as they have been written to ``directory``.
+
+    Files are found with a :class:`DirectoryWatcher` and validated in a
+    :class:`chexus.batch.WorkerPool`, whose workers keep the validators and their
+    dependencies loaded. ``callback`` is called with the result of each file.
+
+    Runs until interrupted, or until ``until`` returns True. ``jobs``,
+    ``timeout``, ``memory_limit``, and other keyword arguments are as in
+    :func:`chexus.validate_many`.
+    """
+    watcher = DirectoryWatcher(
+        directory, use_inotify=use_inotify, interval=interval, settle=settle
+    )
+    pool = WorkerPool(
+        validators, jobs=jobs, timeout=timeout, memory_limit=memory_limit, **kwargs
+    )
+    try:
+        while until is None or not until():
+            for path in watcher.poll(timeout=0 if pool.pending else interval):
+                pool.submit(path)
+            for result in pool.poll(timeout=interval if pool.pending else 0):
+                callback(result)
+    finally:
+        pool.close()
+        watcher.close()
+
+
+def open_sink(path: str) -> TextIO:
+    """Open a file or a Unix domain socket for writing results.
+
+    If ``path`` is a socket, e.g., of a log collector, it is connected to.
+    Otherwise, the file is opened for appending.
+    """
+    if os.path.exists(path) and stat.S_ISSOCK(os.stat(path).st_mode):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(path)
+        sink = sock.makefile('w', encoding='utf-8')
+        # The file object keeps the connection open.
+        sock.close()
+        return sink
+    return open(path, 'a', encoding='utf-8')
@@ -0,0 +1,164 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2024 Scipp contributors (https://github.com/scipp)
+import os
+import subprocess
+import sys
+
+import h5py
+import pytest
+
+import chexus
+from chexus.batch import find_files
+
+# Validators that misbehave on datasets with a given name. They are defined in a
+# module that the spawned worker processes can import.
+MISBEHAVING = '''
+import os
+import time
+
+import numpy as np
+
+from chexus.validate import Validator
+
+
+class misbehaving(Validator):
+    def __init__(self):
+        super().__init__("misbehaving", "misbehaves on some datasets")
+
+    def applies_to(self, node):
+        return node.name.endswith(("/hang", "/crash", "/allocate", "/raise"))
+
+    def validate(self, node):
+        if node.name.endswith("/hang"):
+            time.sleep(60)
+        elif node.name.endswith("/crash"):
+            os._exit(3)
+        elif node.name.endswith("/allocate"):
+            np.ones(2**40, dtype=np.uint8)
+        else:
+            raise RuntimeError("bad dataset")
+'''
+
+
+def _make_file(path: str, dataset: str | None = None) -> str:
+    with h5py.File(path, 'w') as f:
+        entry = f.create_group('entry')
+        entry.attrs['NX_class'] = 'NXentry'
+        f.create_group('unclassified')
+        if dataset is not None:
+            entry[dataset] = 1.0
+    return path
+
+
+@pytest.fixture
+def files(tmp_path) -> list[str]:
+    os.makedirs(tmp_path / 'a' / 'b')
+    return [
+        _make_file(str(tmp_path / 'a' / 'one.nxs')),
+        _make_file(str(tmp_path / 'a' / 'b' / 'two.h5')),
+        _make_file(str(tmp_path / 'three.nxs')),
+    ]
+
+
+@pytest.fixture
+def misbehaving(tmp_path, monkeypatch: pytest.MonkeyPatch):
+    (tmp_path / 'misbehaving_validators.py').write_text(MISBEHAVING)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    import misbehaving_validators
+
+    return misbehaving_validators.misbehaving()
+
+
+def test_find_files_expands_directories_and_globs(tmp_path, files) -> None:
+    (tmp_path / 'a' / 'notes.txt').write_text('')
+    one, two, three = files
+    assert find_files([str(tmp_path / 'a')]) == [one, two]
+    assert find_files([str(tmp_path / '*.nxs'), three, one]) == [three, one]
+    assert find_files([str(tmp_path / '**' / '*.h5')]) == [two]
+    assert find_files([str(tmp_path / 'missing.nxs')]) == [
+        str(tmp_path / 'missing.nxs')
+    ]
+
+
+def test_validate_many_gives_same_results_as_validate(tmp_path, files) -> None:
+    validators = chexus.validators.base_validators(has_scipp=False)
+    batch = chexus.validate_many([str(tmp_path)], validators, jobs=2)
+    assert [file.path for file in batch.files] == [files[2], files[0], files[1]]
+    for file in batch.files:
+        reader = chexus.read_hdf5(file.path)
+        expected = chexus.validate(next(reader), validators)
+        assert file.status == 'failed'
+        assert chexus.report(file.results) == chexus.report(expected)
+    fails, checks = batch.counts()['NX_class_attr_missing']
+    assert (fails, checks) == (3, 6)
+    assert batch.statuses() == {'passed': 0, 'failed': 3, 'error': 0, 'timeout': 0}
+    assert not batch.ok
+    assert 'NX_class_attr_missing: 3/6' in batch.format_summary()
+
+
+def test_format_result_and_summary_match_report(tmp_path, files) -> None:
+    validators = chexus.validators.base_validators(has_scipp=False)
+    batch = chexus.validate_many([files[0]], validators)
+    (file,) = batch.files
+    report = chexus.report(file.results)
+    details, summary = report.split('\n\n\n')
+    lines = chexus.batch.format_result(file.to_dict()).splitlines()
+    assert lines[0].startswith(f'{files[0]}: failed')
+    assert [line.strip() for line in lines[1:]] == details.splitlines()[2:]
+    assert batch.format_summary().startswith(summary + '\n')
+
+
+def test_validate_many_isolates_failing_files(tmp_path, misbehaving) -> None:
+    paths = [
+        _make_file(str(tmp_path / f'{name}.nxs'), dataset=name)
+        for name in ('hang', 'crash', 'raise', 'fine', 'allocate')
+    ]
+    paths.append(str(tmp_path / 'missing.nxs'))
+    received = []
+    batch = chexus.validate_many(
+        paths,
+        [misbehaving],
+        jobs=2,
+        timeout=5,
+        memory_limit=2**32,
+        callback=received.append,
+    )
+    statuses = {os.path.basename(file.path): file.status for file in batch.files}
+    assert statuses == {
+        'hang.nxs': 'timeout',
+        'crash.nxs': 'error',
+        'raise.nxs': 'error',
+        'fine.nxs': 'passed',
+        'allocate.nxs': 'error',
+        'missing.nxs': 'error',
+    }
+    errors = {os.path.basename(file.path): file.error for file in batch.files}
+    assert 'exit code 3' in errors['crash.nxs']
+    assert errors['raise.nxs'] == 'RuntimeError: bad dataset'
+    assert errors['allocate.nxs'] == 'Memory limit exceeded'
+    assert errors['missing.nxs'].startswith('FileNotFoundError')
+    assert sorted(r.path for r in received) == sorted(paths)
+
+
+def test_cli_validates_directory(tmp_path, files) -> None:
+    result = subprocess.run(  # noqa: S603
+        [
+            sys.executable,
+            '-m',
+            'chexus',
+            '--ignore-missing',
+            '--exit-on-fail',
+            '-j',
+            '2',
+            str(tmp_path / 'a'),
+            files[2],
+        ],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    assert result.returncode == 1
+    for path in files:
+        assert f'{path}: failed' in result.stdout
+    assert result.stdout.count('NX_class_attr_missing @ /unclassified') == 3
+    assert '0 passed, 3 failed, 0 error, 0 timeout (3 files)' in result.stdout
@@ -0,0 +1,548 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2024 Scipp contributors (https://github.com/scipp)
+import multiprocessing
+import operator
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+import h5py
+import numpy as np
+import pytest
+
+import chexus
+
+
+@pytest.fixture
+def nexus_file(tmp_path) -> str:
+    path = str(tmp_path / 'test.nxs')
+    with h5py.File(path, 'w') as f:
+        entry = f.create_group('entry')
+        entry.attrs['NX_class'] = 'NXentry'
+        instrument = entry.create_group('instrument')
+        instrument.attrs['NX_class'] = 'NXinstrument'
+        detector = instrument.create_group('detector')
+        detector.attrs['NX_class'] = 'NXdetector'
+        detector_number = detector.create_dataset(
+            'detector_number', data=np.arange(12).reshape(3, 4)
+        )
+        detector_number.attrs['units'] = b''
+        detector.create_dataset('depends_on', data=b'/entry/transform')
+        transform = entry.create_dataset('transform', data=1.5)
+        transform.attrs['transformation_type'] = 'translation'
+        transform.attrs['vector'] = [0.0, 0.0, 1.0]
+        transform.attrs['units'] = 'm'
+        transform.attrs['depends_on'] = '.'
+    return path
+
+
+def test_read_hdf5_reads_structure(nexus_file: str) -> None:
+    reader = chexus.read_hdf5(nexus_file)
+    group = next(reader)
+    assert group.name == '/'
+    tree = chexus.unroll_tree(group)
+    assert list(tree) == [
+        '/entry',
+        '/entry/instrument',
+        '/entry/instrument/detector',
+        '/entry/instrument/detector/depends_on',
+        '/entry/instrument/detector/detector_number',
+        '/entry/transform',
+    ]
+    detector_number = tree['/entry/instrument/detector/detector_number']
+    assert detector_number.shape == (3, 4)
+    assert detector_number.attrs == {'units': ''}
+    assert detector_number.parent is tree['/entry/instrument/detector']
+    np.testing.assert_array_equal(detector_number.value, np.arange(12).reshape(3, 4))
+    assert tree['/entry/instrument/detector/depends_on'].value == '/entry/transform'
+
+
+@pytest.mark.parametrize('backend', ['highlevel', 'lowlevel'])
+def test_read_hdf5_builds_compact_nodes(nexus_file: str, backend: str) -> None:
+    reader = chexus.read_hdf5(nexus_file, backend=backend)
+    tree = chexus.unroll_tree(next(reader))
+    for node in tree.values():
+        assert not hasattr(node, '__dict__')
+    detector_number = tree['/entry/instrument/detector/detector_number']
+    assert detector_number._name is None
+    assert detector_number.basename == 'detector_number'
+    assert detector_number.name == '/entry/instrument/detector/detector_number'
+    if backend == 'lowlevel':
+        depends_on = tree['/entry/instrument/detector/depends_on']
+        assert depends_on._attrs is chexus.tree.EMPTY
+
+
+@pytest.mark.parametrize('cached', [False, True])
+def test_read_hdf5_nodes_without_attrs_or_children_are_writable(
+    nexus_file: str, tmp_path, cached: bool
+) -> None:
+    cache = chexus.SnapshotCache(str(tmp_path / 'cache')) if cached else None
+    if cached:
+        next(chexus.read_hdf5(nexus_file, cache=cache))
+    reader = chexus.read_hdf5(nexus_file, backend='lowlevel', cache=cache)
+    tree = chexus.unroll_tree(next(reader))
+    depends_on = tree['/entry/instrument/detector/depends_on']
+    transform = tree['/entry/transform']
+    first = depends_on.attrs
+    second = depends_on.attrs
+    assert first == {}
+    first['units'] = 'm'
+    second['long_name'] = 'transform'
+    assert depends_on.attrs == {'units': 'm', 'long_name': 'transform'}
+    assert depends_on.attrs is depends_on.attrs
+    assert transform.parent.children['transform'] is transform
+    assert 'units' not in tree['/entry/instrument'].attrs
+    empty = chexus.tree.EMPTY
+    group = chexus.Group(name='/entry/empty', attrs=empty, children=empty)
+    group.children['depends_on'] = depends_on
+    assert group.children == {'depends_on': depends_on}
+    other = chexus.Group(name='/entry/other', attrs=group.attrs)
+    other.attrs['NX_class'] = 'NXcollection'
+    assert group.attrs == {}
+
+
+def test_read_hdf5_lazy_defers_reading_children(nexus_file: str) -> None:
+    reader = chexus.read_hdf5(nexus_file, lazy=True)
+    group = next(reader)
+    assert not group.children.loaded
+    entry = group.children['entry']
+    assert group.children.loaded
+    assert not entry.children.loaded
+    assert entry.attrs['NX_class'] == 'NXentry'
+    assert not entry.children.loaded
+
+
+def test_read_hdf5_lazy_gives_same_tree_as_eager(nexus_file: str) -> None:
+    eager_reader = chexus.read_hdf5(nexus_file)
+    lazy_reader = chexus.read_hdf5(nexus_file, lazy=True)
+    eager = chexus.unroll_tree(next(eager_reader))
+    lazy = chexus.unroll_tree(next(lazy_reader))
+    assert list(lazy) == list(eager)
+    for name, node in lazy.items():
+        assert set(node.attrs) == set(eager[name].attrs)
+        assert node.parent.name == eager[name].parent.name
+
+
+def test_validate_lazy_gives_same_results_as_eager(nexus_file: str) -> None:
+    validators = chexus.validators.base_validators()
+    eager_reader = chexus.read_hdf5(nexus_file)
+    lazy_reader = chexus.read_hdf5(nexus_file, lazy=True)
+    eager = chexus.validate(next(eager_reader), validators)
+    lazy = chexus.validate(next(lazy_reader), validators)
+    assert chexus.report(lazy) == chexus.report(eager)
+
+
+def test_read_hdf5_reads_attribute_values_only_when_accessed(nexus_file: str) -> None:
+    reader = chexus.read_hdf5(nexus_file)
+    group = next(reader)
+    attrs = group.children['entry'].children['transform'].attrs
+    assert set(attrs) == {'transformation_type', 'vector', 'units', 'depends_on'}
+    assert 'vector' in attrs
+    assert 'offset' not in attrs
+    assert not attrs._values
+    assert attrs['units'] == 'm'
+    assert attrs._values == {'units': 'm'}
+    np.testing.assert_array_equal(attrs['vector'], [0.0, 0.0, 1.0])
+    assert attrs.get('offset') is None
+    with pytest.raises(KeyError):
+        attrs['offset']
+
+
+@pytest.mark.parametrize('backend', ['highlevel', 'lowlevel'])
+def test_read_hdf5_reads_attributes_after_reader_is_closed(
+    nexus_file: str, backend: str
+) -> None:
+    reader = chexus.read_hdf5(nexus_file, backend=backend)
+    group = next(reader)
+    reader.close()
+    transform = group.children['entry'].children['transform']
+    assert transform.attrs['units'] == 'm'
+    assert dict(transform.attrs)['depends_on'] == '.'
+    assert group.children['entry'].attrs['NX_class'] == 'NXentry'
+    chexus.hdf5.close_files()
+
+
+def test_read_hdf5_decodes_attributes(tmp_path) -> None:
+    path = str(tmp_path / 'attrs.h5')
+    with h5py.File(path, 'w') as f:
+        f.attrs['vlen'] = 'abc'
+        f.attrs['bytes'] = b'abc'
+        f.attrs['fixed'] = np.bytes_('abc')
+        f.attrs['float'] = 1.5
+        f.attrs['array'] = [1, 2]
+        f.attrs['strings'] = ['a', 'b']
+        f.attrs['empty'] = h5py.Empty('f')
+    reader = chexus.read_hdf5(path)
+    attrs = next(reader).attrs
+    assert attrs['vlen'] == 'abc'
+    assert attrs['bytes'] == 'abc'
+    assert attrs['fixed'] == 'abc'
+    assert attrs['float'] == 1.5
+    np.testing.assert_array_equal(attrs['array'], [1, 2])
+    assert list(attrs['strings']) == ['a', 'b']
+    assert attrs['empty'] == h5py.Empty('f')
+
+
+def test_read_hdf5_root_path_reads_only_subtree(nexus_file: str) -> None:
+    reader = chexus.read_hdf5(nexus_file, root_path='/entry/instrument/detector')
+    detector = next(reader)
+    assert detector.name == '/entry/instrument/detector'
+    assert set(detector.children) == {'depends_on', 'detector_number'}
+    instrument = detector.parent
+    entry = instrument.parent
+    assert instrument.children['detector'] is detector
+    assert not entry.children.loaded
+    assert entry.parent.name == '/'
+    assert entry.parent.parent is None
+
+
+def test_read_hdf5_root_path_resolves_absolute_depends_on(nexus_file: str) -> None:
+    reader = chexus.read_hdf5(nexus_file, root_path='entry/instrument/detector/')
+    detector = next(reader)
+    validators = [
+        chexus.validators.depends_on_target_missing(),
+        chexus.validators.depends_on_missing(),
+    ]
+    results = chexus.validate(detector, validators, include_root=True)
+    assert results[chexus.validators.depends_on_target_missing].checks == 1
+    assert results[chexus.validators.depends_on_target_missing].fails == 0
+    assert results[chexus.validators.depends_on_missing].checks == 1
+
+
+def test_read_hdf5_root_path_raises_if_missing(nexus_file: str) -> None:
+    with pytest.raises(KeyError, match='Root path /entry/missing not found'):
+        next(chexus.read_hdf5(nexus_file, root_path='/entry/missing'))
+
+
+def test_read_hdf5_root_path_raises_if_dataset(nexus_file: str) -> None:
+    with pytest.raises(ValueError, match='not a group'):
+        next(chexus.read_hdf5(nexus_file, root_path='/entry/transform'))
+
+
+def _tree_summary(group: chexus.Group) -> dict[str, tuple]:
+    return {
+        name: (
+            type(node).__name__,
+            node.parent.name,
+            getattr(node, 'shape', None),
+            getattr(node, 'dtype', None),
+            sorted(node.attrs),
+        )
+        for name, node in chexus.unroll_tree(group).items()
+    }
+
+
+@pytest.mark.parametrize('root_path', [None, '/entry', '/entry/instrument'])
+def test_read_hdf5_lowlevel_gives_same_tree_as_highlevel(
+    nexus_file: str, root_path: str | None
+) -> None:
+    with h5py.File(nexus_file, 'a') as f:
+        f['entry/detector_number'] = f['entry/instrument/detector/detector_number']
+        f['entry/instrument/detector_alias'] = f['entry/instrument/detector']
+        f['entry/instrument/soft_detector'] = h5py.SoftLink(
+            '/entry/instrument/detector'
+        )
+        f['entry/soft_transform'] = h5py.SoftLink('/entry/transform')
+    highlevel_reader = chexus.read_hdf5(nexus_file, root_path=root_path)
+    lowlevel_reader = chexus.read_hdf5(
+        nexus_file, root_path=root_path, backend='lowlevel'
+    )
+    highlevel = next(highlevel_reader)
+    lowlevel = next(lowlevel_reader)
+    assert _tree_summary(lowlevel) == _tree_summary(highlevel)
+    assert '/entry/instrument/soft_detector/detector_number' in _tree_summary(lowlevel)
+    nodes = chexus.unroll_tree(lowlevel)
+    name = '/entry/instrument/detector/detector_number'
+    np.testing.assert_array_equal(nodes[name].value, np.arange(12).reshape(3, 4))
+    assert nodes[name].attrs == {'units': ''}
+
+
+def test_read_hdf5_lowlevel_does_not_support_lazy(nexus_file: str) -> None:
+    with pytest.raises(ValueError, match='lazy'):
+        next(chexus.read_hdf5(nexus_file, backend='lowlevel', lazy=True))
+
+
+@pytest.mark.parametrize('backend', ['highlevel', 'lowlevel'])
+def test_read_hdf5_hard_links_share_dataset_and_attrs(
+    nexus_file: str, backend: str
+) -> None:
+    with h5py.File(nexus_file, 'a') as f:
+        detector2 = f['entry/instrument'].create_group('detector2')
+        detector2.attrs['NX_class'] = 'NXdetector'
+        detector2['detector_number'] = f['entry/instrument/detector/detector_number']
+    reader = chexus.read_hdf5(nexus_file, backend=backend)
+    tree = chexus.unroll_tree(next(reader))
+    first = tree['/entry/instrument/detector/detector_number']
+    second = tree['/entry/instrument/detector2/detector_number']
+    assert second.name == '/entry/instrument/detector2/detector_number'
+    assert second.parent is tree['/entry/instrument/detector2']
+    assert second.dataset is first.dataset
+    assert second.attrs is first.attrs
+
+
+def test_detector_numbers_unique_reads_hard_linked_values_once(
+    nexus_file: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    with h5py.File(nexus_file, 'a') as f:
+        detector2 = f['entry/instrument'].create_group('detector2')
+        detector2.attrs['NX_class'] = 'NXdetector'
+        detector2['detector_number'] = f['entry/instrument/detector/detector_number']
+    validator = chexus.validators.detector_numbers_unique_in_detector()
+    calls = []
+    is_unique = validator._is_unique
+    monkeypatch.setattr(
+        validator, '_is_unique', lambda ds: calls.append(ds.name) or is_unique(ds)
+    )
+    reader = chexus.read_hdf5(nexus_file)
+    results = chexus.validate(next(reader), [validator])
+    assert results[type(validator)].checks == 2
+    assert results[type(validator)].fails == 0
+    assert calls == ['/entry/instrument/detector/detector_number']
+
+
+def test_refresh_updates_grown_datasets_in_swmr_mode(tmp_path) -> None:
+    path = str(tmp_path / 'swmr.nxs')
+    with h5py.File(path, 'w', libver='latest') as writer:
+        detector = writer.create_group('detector')
+        detector.attrs['NX_class'] = 'NXdetector'
+        detector_number = detector.create_dataset(
+            'detector_number', data=[1, 2], maxshape=(None,), chunks=(4,)
+        )
+        fixed = detector.create_dataset('fixed', data=[1, 2])
+        writer.create_group('other')
+        writer.swmr_mode = True
+
+        reader = chexus.read_hdf5(path, swmr=True)
+        group = next(reader)
+        validators = [chexus.validators.detector_numbers_unique_in_detector()]
+        results = chexus.validate(group, validators)
+        result = results[chexus.validators.detector_numbers_unique_in_detector]
+        assert result.checks == 1
+        assert result.fails == 0
+        assert chexus.hdf5.refresh(group) == []
+
+        fixed[0] = 2
+        fixed.flush()
+        assert chexus.hdf5.refresh(group) == []
+        detector_number.resize((3,))
+        detector_number[2] = 1
+        detector_number.flush()
+        changed = chexus.hdf5.refresh(group)
+        assert [node.name for node in changed] == [
+            '/detector/detector_number',
+            '/detector',
+        ]
+        assert group.children['detector'].children['detector_number'].shape == (3,)
+        chexus.revalidate(results, changed)
+        assert result.checks == 1
+        assert result.fails == 1
+        assert result.violations[0].name == '/detector'
+
+
+def test_iter_blocks_aligns_blocks_with_chunks(tmp_path) -> None:
+    path = str(tmp_path / 'blocks.h5')
+    with h5py.File(path, 'w') as f:
+        f.create_dataset('chunked', data=np.arange(10), chunks=(4,))
+        f.create_dataset('contiguous', data=np.arange(12).reshape(6, 2))
+        f.create_dataset('scalar', data=1.5)
+    reader = chexus.read_hdf5(path)
+    children = next(reader).children
+    blocks = list(children['chunked'].iter_blocks(max_bytes=5 * 8))
+    assert [len(block) for block in blocks] == [4, 4, 2]
+    np.testing.assert_array_equal(np.concatenate(blocks), np.arange(10))
+    blocks = list(children['chunked'].iter_blocks(max_bytes=1))
+    assert [len(block) for block in blocks] == [4, 4, 2]
+    blocks = list(children['contiguous'].iter_blocks(max_bytes=2 * 16))
+    assert [block.shape for block in blocks] == [(2, 2), (2, 2), (2, 2)]
+    assert list(children['scalar'].iter_blocks()) == [1.5]
+
+
+@pytest.mark.parametrize(
+    ('values', 'unique'),
+    [
+        (np.arange(100), True),
+        (np.array([*range(50), 3, *range(50, 99)]), False),
+        (np.array([*range(99), 98]), False),
+        (np.random.default_rng(0).permutation(100), True),
+        (np.array([*range(90, 100), *range(90)]), True),
+    ],
+)
+def test_detector_numbers_unique_across_blocks(
+    tmp_path, values: np.ndarray, unique: bool
+) -> None:
+    path = str(tmp_path / 'detector.nxs')
+    with h5py.File(path, 'w') as f:
+        detector = f.create_group('detector')
+        detector.attrs['NX_class'] = 'NXdetector'
+        detector.create_dataset('detector_number', data=values, chunks=(10,))
+    validator = chexus.validators.detector_numbers_unique_in_detector(max_bytes=80)
+    reader = chexus.read_hdf5(path)
+    results = chexus.validate(next(reader), [validator])
+    assert results[type(validator)].checks == 1
+    assert results[type(validator)].fails == (0 if unique else 1)
+
+
+@pytest.mark.parametrize(('last_event_id', 'subset'), [(7, True), (8, False)])
+def test_event_id_subset_of_detector_number_across_blocks(
+    tmp_path, last_event_id: int, subset: bool
+) -> None:
+    path = str(tmp_path / 'events.nxs')
+    with h5py.File(path, 'w') as f:
+        detector = f.create_group('detector')
+        detector.attrs['NX_class'] = 'NXdetector'
+        detector.create_dataset('detector_number', data=np.arange(8))
+        events = detector.create_group('events')
+        events.attrs['NX_class'] = 'NXevent_data'
+        event_id = np.array([*(np.arange(1000) % 8), last_event_id])
+        events.create_dataset('event_id', data=event_id, chunks=(16,))
+    validator = chexus.validators.event_id_subset_of_detector_number(max_bytes=128)
+    reader = chexus.read_hdf5(path)
+    results = chexus.validate(next(reader), [validator])
+    assert results[type(validator)].checks == 1
+    assert results[type(validator)].fails == (0 if subset else 1)
+
+
+@pytest.mark.parametrize('backend', ['highlevel', 'lowlevel'])
+@pytest.mark.parametrize('userblock_size', [0, 512])
+def test_contiguous_datasets_are_memory_mapped(
+    tmp_path, backend: str, userblock_size: int
+) -> None:
+    path = str(tmp_path / 'memmap.h5')
+    with h5py.File(path, 'w', userblock_size=userblock_size) as f:
+        f.create_dataset('contiguous', data=np.arange(12, dtype='>i4').reshape(3, 4))
+        f.create_dataset('chunked', data=np.arange(12), chunks=(4,))
+        f.create_dataset('compressed', data=np.arange(12), compression='gzip')
+        f.create_dataset('unallocated', shape=(4,), dtype='f8')
+        f.create_dataset('string', data='abc')
+    reader = chexus.read_hdf5(path, backend=backend)
+    children = next(reader).children
+    value = children['contiguous'].value
+    assert isinstance(value, np.memmap)
+    assert not value.flags.writeable
+    np.testing.assert_array_equal(value, np.arange(12).reshape(3, 4))
+    blocks = list(children['contiguous'].iter_blocks(max_bytes=16))
+    assert all(isinstance(block, np.memmap) for block in blocks)
+    np.testing.assert_array_equal(np.concatenate(blocks), value)
+    for name in ('chunked', 'compressed'):
+        value = children[name].value
+        assert not isinstance(value, np.memmap)
+        np.testing.assert_array_equal(value, np.arange(12))
+    assert not isinstance(children['unallocated'].value, np.memmap)
+    assert children['string'].value == 'abc'
+
+
+@pytest.mark.parametrize('profile', ['metadata-crawl', 'bulk-data'])
+def test_read_hdf5_with_file_access_profile(nexus_file: str, profile: str) -> None:
+    reader = chexus.read_hdf5(nexus_file, profile=profile)
+    tree = chexus.unroll_tree(next(reader))
+    assert '/entry/instrument/detector/detector_number' in tree
+
+
+def test_read_hdf5_keyword_arguments_take_precedence_over_profile(
+    nexus_file: str,
+) -> None:
+    reader = chexus.read_hdf5(
+        nexus_file, profile='bulk-data', rdcc_nbytes=1024, locking=False
+    )
+    options = chexus.tree.tree_source(next(reader)).options
+    assert options['rdcc_nbytes'] == 1024
+    assert options['rdcc_nslots'] == 100_003
+    assert options['locking'] is False
+
+
+def test_read_hdf5_raises_for_unknown_profile(nexus_file: str) -> None:
+    with pytest.raises(ValueError, match='Unknown file access profile'):
+        next(chexus.read_hdf5(nexus_file, profile='fast'))
+
+
+@pytest.mark.parametrize('backend', ['highlevel', 'lowlevel'])
+def test_pickled_tree_reads_values_after_reader_is_closed(
+    nexus_file: str, backend: str
+) -> None:
+    reader = chexus.read_hdf5(nexus_file, backend=backend)
+    group = next(reader)
+    chexus.unroll_tree(group)
+    data = pickle.dumps(group)
+    reader.close()
+    assert b'detector_number' in data
+    tree = chexus.unroll_tree(pickle.loads(data))  # noqa: S301
+    detector_number = tree['/entry/instrument/detector/detector_number']
+    assert detector_number.attrs == {'units': ''}
+    assert tree['/entry/instrument'].attrs['NX_class'] == 'NXinstrument'
+    np.testing.assert_array_equal(detector_number.value, np.arange(12).reshape(3, 4))
+    assert tree['/entry/transform'].value == 1.5
+    chexus.hdf5.close_files()
+
+
+def test_pickled_tree_refers_to_unread_attributes_and_children(
+    nexus_file: str,
+) -> None:
+    full = chexus.read_hdf5(nexus_file)
+    full_size = len(pickle.dumps(next(full)))
+    reader = chexus.read_hdf5(nexus_file, root_path='/entry/instrument/detector')
+    detector = next(reader)
+    entry = detector.parent.parent
+    data = pickle.dumps(detector)
+    assert len(data) < full_size
+    assert not entry.children.loaded
+    assert not entry.attrs._values
+    assert b'NXentry' not in data
+    full.close()
+    reader.close()
+    detector = pickle.loads(data)  # noqa: S301
+    entry = detector.parent.parent
+    assert not entry.children.loaded
+    assert entry.attrs['NX_class'] == 'NXentry'
+    assert set(entry.children) == {'instrument', 'transform'}
+    assert entry.children['instrument'].children['detector'] is detector
+    assert entry.children['transform'].value == 1.5
+    chexus.hdf5.close_files()
+
+
+def test_pickled_attributes_keep_values_that_were_set(nexus_file: str) -> None:
+    reader = chexus.read_hdf5(nexus_file)
+    transform = next(reader).children['entry'].children['transform']
+    transform.attrs['units'] = 'mm'
+    transform.attrs['offset'] = [1.0, 0.0, 0.0]
+    del transform.attrs['depends_on']
+    data = pickle.dumps(transform)
+    reader.close()
+    attrs = pickle.loads(data).attrs  # noqa: S301
+    assert set(attrs) == {'transformation_type', 'vector', 'units', 'offset'}
+    assert attrs['units'] == 'mm'
+    assert attrs['offset'] == [1.0, 0.0, 0.0]
+    assert attrs['transformation_type'] == 'translation'
+    chexus.hdf5.close_files()
+
+
+def test_pickled_dataset_reads_value_in_other_process(nexus_file: str) -> None:
+    reader = chexus.read_hdf5(nexus_file, lazy=True)
+    tree = chexus.unroll_tree(next(reader))
+    detector_number = tree['/entry/instrument/detector/detector_number']
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+        value = pool.submit(operator.attrgetter('value'), detector_number).result()
+    np.testing.assert_array_equal(value, np.arange(12).reshape(3, 4))
+
+
+def test_pickled_snapshot_tree_reads_values(nexus_file: str, tmp_path) -> None:
+    cache = chexus.SnapshotCache(str(tmp_path / 'cache'))
+    next(chexus.read_hdf5(nexus_file, cache=cache))
+    reader = chexus.read_hdf5(nexus_file, cache=cache)
+    data = pickle.dumps(next(reader))
+    reader.close()
+    tree = chexus.unroll_tree(pickle.loads(data))  # noqa: S301
+    assert tree['/entry/transform'].value == 1.5
+    chexus.hdf5.close_files()
+
+
+def test_dataset_handle_raises_if_file_was_modified(nexus_file: str) -> None:
+    reader = chexus.read_hdf5(nexus_file)
+    data = pickle.dumps(next(reader))
+    reader.close()
+    with h5py.File(nexus_file, 'a') as f:
+        f.move('entry/transform', 'entry/old_transform')
+        f['entry/transform'] = 2.5
+    tree = chexus.unroll_tree(pickle.loads(data))  # noqa: S301
+    with pytest.raises(ValueError, match='modified'):
+        _ = tree['/entry/transform'].value
+    chexus.hdf5.close_files()
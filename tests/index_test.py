@@ -0,0 +1,124 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2024 Scipp contributors (https://github.com/scipp)
+import pytest
+
+import chexus
+
+
+@pytest.fixture
+def tree() -> chexus.Group:
+    root = chexus.Group(name='/')
+    entry = chexus.Group(name='/entry', attrs={'NX_class': 'NXentry'}, parent=root)
+    root.children['entry'] = entry
+    for name in ('detector1', 'detector2'):
+        detector = chexus.Group(
+            name=f'/entry/{name}', attrs={'NX_class': 'NXdetector'}, parent=entry
+        )
+        entry.children[name] = detector
+        detector.children['depends_on'] = chexus.Dataset(
+            name=f'/entry/{name}/depends_on',
+            shape=(),
+            dtype=str,
+            parent=detector,
+            value='/entry/transform',
+        )
+    entry.children['transform'] = chexus.Dataset(
+        name='/entry/transform',
+        shape=(),
+        dtype='float64',
+        attrs={
+            'transformation_type': 'translation',
+            'vector': [0, 0, 1],
+            'depends_on': '.',
+        },
+        parent=entry,
+        value=1.0,
+    )
+    return root
+
+
+def test_tree_index_lookups(tree: chexus.Group) -> None:
+    index = chexus.TreeIndex(tree)
+    entry = tree.children['entry']
+    assert len(index) == 7
+    assert list(index) == ['/', *chexus.unroll_tree(tree)]
+    assert index['/'] is tree
+    assert index['/entry/transform'] is entry.children['transform']
+    assert '/entry/detector3' not in index
+    assert index.get('/entry/detector3') is None
+    assert index.by_nx_class('NXdetector') == [
+        entry.children['detector1'],
+        entry.children['detector2'],
+    ]
+    assert index.by_nx_class('NXmonitor') == ()
+    assert [node.name for node in index.by_basename('depends_on')] == [
+        '/entry/detector1/depends_on',
+        '/entry/detector2/depends_on',
+    ]
+    assert index.by_attr('vector') == [entry.children['transform']]
+
+
+def test_validate_passes_index_to_prepare(tree: chexus.Group) -> None:
+    class count_detectors(chexus.Validator):
+        def __init__(self) -> None:
+            super().__init__('count_detectors', 'Entry has a single detector')
+            self.detectors = None
+
+        def prepare(self, index: chexus.TreeIndex) -> None:
+            self.detectors = index.by_nx_class('NXdetector')
+
+        def applies_to(self, node) -> bool:
+            return node.attrs.get('NX_class') == 'NXentry'
+
+        def validate(self, node) -> chexus.Violation | None:
+            if len(self.detectors) != 1:
+                return chexus.Violation(node.name)
+
+    results = chexus.validate(tree, validators=[count_detectors()])
+    assert results[count_detectors].fails == 1
+
+
+def test_depends_on_target_missing_finds_target_with_or_without_index(
+    tree: chexus.Group,
+) -> None:
+    validator = chexus.validators.depends_on_target_missing()
+    depends_on = tree.children['entry'].children['detector1'].children['depends_on']
+    assert validator.validate(depends_on) is None
+    validator.prepare(chexus.TreeIndex(tree))
+    assert validator.validate(depends_on) is None
+    depends_on.value = 'transform2'
+    assert validator.validate(depends_on) is not None
+    depends_on.value = '../transform'
+    assert validator.validate(depends_on) is not None
+
+
+def test_depends_on_target_missing_ignores_index_of_other_tree(
+    tree: chexus.Group,
+) -> None:
+    validator = chexus.validators.depends_on_target_missing()
+    validator.prepare(chexus.TreeIndex(tree))
+    other = chexus.Group(name='/')
+    depends_on = chexus.Dataset(
+        name='/depends_on', shape=(), dtype=str, parent=other, value='/entry/transform'
+    )
+    other.children['depends_on'] = depends_on
+    assert validator.validate(depends_on) is not None
+
+
+def test_validate_calls_finish_to_drop_index(tree: chexus.Group) -> None:
+    validator = chexus.validators.depends_on_target_missing()
+    chexus.validate(tree, validators=[validator])
+    assert validator._graph is None
+    assert validator._unindexed is None
+
+
+def test_depends_on_validator_shares_graph_without_index(tree: chexus.Group) -> None:
+    validator = chexus.validators.depends_on_target_missing()
+    entry = tree.children['entry']
+    validator.validate(entry.children['detector1'].children['depends_on'])
+    root, graph = validator._unindexed
+    assert root is tree
+    validator.validate(entry.children['detector2'].children['depends_on'])
+    assert validator._unindexed[1] is graph
+    validator.finish()
+    assert validator._unindexed is None
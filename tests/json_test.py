@@ -0,0 +1,91 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2024 Scipp contributors (https://github.com/scipp)
+import json
+import pickle
+
+import pytest
+
+import chexus
+
+
+@pytest.fixture
+def nexus_structure(tmp_path) -> str:
+    path = str(tmp_path / 'structure.json')
+    structure = {
+        "children": [
+            {
+                "name": "entry",
+                "type": "group",
+                "attributes": [
+                    {"name": "NX_class", "dtype": "string", "values": "NXentry"}
+                ],
+                "children": [
+                    {
+                        "name": "instrument",
+                        "type": "group",
+                        "attributes": [
+                            {
+                                "name": "NX_class",
+                                "dtype": "string",
+                                "values": "NXinstrument",
+                            }
+                        ],
+                        "children": [
+                            {
+                                "module": "dataset",
+                                "config": {"name": "name", "values": "DREAM"},
+                            }
+                        ],
+                    },
+                    {
+                        "module": "f144",
+                        "config": {
+                            "source": "temperature",
+                            "topic": "topic",
+                            "dtype": "double",
+                            "value_units": "K",
+                        },
+                    },
+                ],
+            }
+        ]
+    }
+    with open(path, 'w') as f:
+        json.dump(structure, f)
+    return path
+
+
+def test_read_json_reads_structure(nexus_structure: str) -> None:
+    group = chexus.read_json(nexus_structure)
+    tree = chexus.unroll_tree(group)
+    assert list(tree) == [
+        '/entry',
+        '/entry/instrument',
+        '/entry/instrument/name',
+        '/entry/temperature',
+    ]
+    assert tree['/entry'].attrs == {'NX_class': 'NXentry'}
+    assert tree['/entry/temperature'].attrs == {'units': 'K'}
+
+
+def test_read_json_root_path_reads_only_subtree(nexus_structure: str) -> None:
+    instrument = chexus.read_json(nexus_structure, root_path='/entry/instrument')
+    assert instrument.name == '/entry/instrument'
+    assert list(instrument.children) == ['name']
+    entry = instrument.parent
+    assert entry.attrs == {'NX_class': 'NXentry'}
+    assert not entry.children.loaded
+    assert entry.children['instrument'] is instrument
+    assert set(entry.children) == {'instrument', 'temperature'}
+
+
+def test_read_json_root_path_raises_if_missing(nexus_structure: str) -> None:
+    with pytest.raises(KeyError):
+        chexus.read_json(nexus_structure, root_path='/entry/missing')
+
+
+def test_pickled_lazy_tree_loads_children_on_access(nexus_structure: str) -> None:
+    group = chexus.read_json(nexus_structure, lazy=True)
+    tree = pickle.loads(pickle.dumps(group))  # noqa: S301
+    assert not tree.children.loaded
+    assert list(chexus.unroll_tree(tree)) == list(chexus.unroll_tree(group))
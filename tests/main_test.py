@@ -0,0 +1,112 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2024 Scipp contributors (https://github.com/scipp)
+import os
+import sys
+
+import h5py
+import pytest
+
+import chexus
+import chexus.__main__
+
+
+@pytest.fixture
+def nexus_file(tmp_path) -> str:
+    path = str(tmp_path / 'test.nxs')
+    with h5py.File(path, 'w') as f:
+        entry = f.create_group('entry')
+        entry.attrs['NX_class'] = 'NXentry'
+        entry.create_dataset('title', data=b'test')
+    return path
+
+
+def _main(monkeypatch: pytest.MonkeyPatch, *args: str) -> None:
+    monkeypatch.setattr(sys, 'argv', ['chexus', *args])
+    chexus.__main__.main()
+
+
+def test_file_access_options_are_passed_to_read_hdf5(
+    nexus_file: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    calls = []
+    read_hdf5 = chexus.read_hdf5
+
+    def recording_read_hdf5(path, **kwargs):
+        calls.append(kwargs)
+        return read_hdf5(path, **kwargs)
+
+    monkeypatch.setattr(chexus, 'read_hdf5', recording_read_hdf5)
+    _main(
+        monkeypatch,
+        '--access-profile',
+        'bulk-data',
+        '--rdcc-nbytes',
+        '1024',
+        '--rdcc-nslots',
+        '521',
+        '--rdcc-w0',
+        '0.5',
+        '--driver',
+        'sec2',
+        '--no-locking',
+        nexus_file,
+    )
+    (kwargs,) = calls
+    assert kwargs['profile'] == 'bulk-data'
+    assert kwargs['rdcc_nbytes'] == 1024
+    assert kwargs['rdcc_nslots'] == 521
+    assert kwargs['rdcc_w0'] == 0.5
+    assert kwargs['driver'] == 'sec2'
+    assert kwargs['locking'] is False
+    assert 'page_buf_size' not in kwargs
+
+
+def test_unknown_access_profile_is_rejected(
+    nexus_file: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    with pytest.raises(SystemExit) as exc_info:
+        _main(monkeypatch, '--access-profile', 'fast', nexus_file)
+    assert exc_info.value.code == 2
+
+
+@pytest.mark.parametrize('stream', [False, True])
+@pytest.mark.parametrize(
+    ('root_path', 'message'),
+    [
+        ('/entry/missing', 'Error: Root path /entry/missing not found'),
+        ('/entry/title', 'Error: Root path /entry/title is not a group'),
+    ],
+)
+def test_invalid_root_path_exits_with_error(
+    nexus_file: str,
+    monkeypatch: pytest.MonkeyPatch,
+    stream: bool,
+    root_path: str,
+    message: str,
+) -> None:
+    args = ['--root-path', root_path, nexus_file]
+    with pytest.raises(SystemExit) as exc_info:
+        _main(monkeypatch, *(['--stream', *args] if stream else args))
+    assert exc_info.value.code == message
+
+
+def test_serve_runs_daemon(
+    tmp_path, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    with pytest.raises(SystemExit) as exc_info:
+        _main(monkeypatch, 'serve', '--help')
+    assert exc_info.value.code == 0
+    assert capsys.readouterr().out.startswith('usage: chexus serve')
+
+
+def test_file_named_serve_is_validated(
+    nexus_file: str,
+    tmp_path,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture,
+) -> None:
+    os.rename(nexus_file, tmp_path / 'serve')
+    monkeypatch.chdir(tmp_path)
+    _main(monkeypatch, 'serve')
+    assert 'Total: ' in capsys.readouterr().out
@@ -7,6 +7,9 @@ Note that additional imports need to be added for repositories that
 contain multiple packages.
 """
 
+import subprocess
+import sys
+
 import chexus as pkg
 
 
@@ -14,7 +17,34 @@ def test_has_version():
     assert hasattr(pkg, '__version__')
 
 
+def test_exports_are_importable():
+    for name in pkg.__all__:
+        assert getattr(pkg, name) is not None
+    # The function, not the submodule of the same name
+    assert callable(pkg.validate)
+
+
+def test_cli_help_starts_without_importing_dependencies():
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-m', 'chexus', '--help'],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    # Lines are 'import time: self [us] | cumulative | imported package'
+    imports = {
+        name.strip(): int(cumulative)
+        for _, cumulative, name in (
+            line.split('|') for line in result.stderr.splitlines()[1:]
+        )
+    }
+    assert not {'h5py', 'numpy', 'scipp'} & set(imports)
+    # Seconds to import the package, generous for slow CI machines
+    assert imports['chexus'] / 1e6 < 0.5
+
+
 # This is for CI package tests. They need to run tests with minimal dependencies,
 # that is, without installing pytest. This code does not affect pytest.
 if __name__ == '__main__':
     test_has_version()
+    test_exports_are_importable()
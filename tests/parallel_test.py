@@ -0,0 +1,96 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2024 Scipp contributors (https://github.com/scipp)
+import h5py
+import numpy as np
+import pytest
+
+import chexus
+
+
+@pytest.fixture
+def nexus_file(tmp_path) -> str:
+    path = str(tmp_path / 'test.nxs')
+    with h5py.File(path, 'w') as f:
+        for e in range(2):
+            entry = f.create_group(f'entry{e}')
+            entry.attrs['NX_class'] = 'NXentry'
+            entry.create_dataset('duration', data=1.5)
+            instrument = entry.create_group('instrument')
+            instrument.attrs['NX_class'] = 'NXinstrument'
+            for i in range(3):
+                detector = instrument.create_group(f'detector{i}')
+                detector.attrs['NX_class'] = 'NXdetector'
+                detector_number = detector.create_dataset(
+                    'detector_number', data=np.arange(4) % (3 + i % 2)
+                )
+                detector_number.attrs['units'] = ''
+                detector.create_dataset('depends_on', data=f'/entry{e}/transform')
+                events = detector.create_group('events')
+                events.attrs['NX_class'] = 'NXevent_data'
+                events.create_dataset('event_id', data=np.arange(10) % (4 + i))
+            transform = entry.create_dataset('transform', data=1.5)
+            transform.attrs['transformation_type'] = 'translation'
+            transform.attrs['vector'] = [0.0, 0.0, 1.0]
+            transform.attrs['units'] = 'm'
+        f.create_group('unclassified')
+    return path
+
+
+@pytest.mark.parametrize('root_path', [None, '/entry1'])
+def test_validate_with_jobs_gives_same_results_as_serial(
+    nexus_file: str, root_path: str | None
+) -> None:
+    validators = chexus.validators.base_validators(has_scipp=False)
+    reader = chexus.read_hdf5(nexus_file, root_path=root_path)
+    group = next(reader)
+    include_root = group.parent is not None
+    expected = chexus.validate(group, validators, include_root=include_root)
+    results = chexus.validate(group, validators, include_root=include_root, jobs=2)
+    assert chexus.report(results) == chexus.report(expected)
+    assert chexus.has_violations(results)
+    for key, result in results.items():
+        assert result.checks == expected[key].checks
+        assert result.violations == expected[key].violations
+
+
+def test_validate_with_jobs_requires_tree_read_from_file() -> None:
+    group = chexus.Group(name='/')
+    with pytest.raises(ValueError, match='jobs > 1'):
+        chexus.validate(group, chexus.validators.base_validators(), jobs=2)
+
+
+class AllNodes(chexus.Validator):
+    def __init__(self, fail: str | None = None) -> None:
+        super().__init__('all_nodes', 'Fails for one node, raises for detector1')
+        self.fail = fail
+
+    def applies_to(self, node: chexus.Dataset | chexus.Group) -> bool:
+        return True
+
+    def validate(self, node: chexus.Dataset | chexus.Group) -> chexus.Violation | None:
+        if node.name == '/entry1/instrument/detector1/events':
+            raise RuntimeError(f'Cannot validate {node.name}')
+        if node.name == self.fail:
+            return chexus.Violation(node.name)
+        return None
+
+
+def _in_entry1(node: chexus.Dataset | chexus.Group) -> bool:
+    return node.name == '/entry1'
+
+
+def test_validate_with_jobs_validates_every_node_once(nexus_file: str) -> None:
+    reader = chexus.read_hdf5(nexus_file)
+    group = next(reader)
+    fail = '/entry0/instrument/detector2/events/event_id'
+    results = chexus.validate(group, [AllNodes(fail)], jobs=2, prune=_in_entry1)
+    (result,) = results.values()
+    assert result.checks == len(list(chexus.iter_tree(group, prune=_in_entry1)))
+    assert [v.name for v in result.violations] == [fail]
+
+
+def test_validate_with_jobs_raises_errors_of_workers(nexus_file: str) -> None:
+    reader = chexus.read_hdf5(nexus_file)
+    group = next(reader)
+    with pytest.raises(RuntimeError, match='detector1/events'):
+        chexus.validate(group, [AllNodes()], jobs=2)
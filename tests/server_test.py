@@ -0,0 +1,121 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2024 Scipp contributors (https://github.com/scipp)
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import h5py
+import pytest
+
+import chexus
+from chexus.server import serve, submit
+
+
+def _make_file(path: str) -> str:
+    with h5py.File(path, 'w') as f:
+        f.create_group('entry').attrs['NX_class'] = 'NXentry'
+        f.create_group('unclassified')
+    return path
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    path = str(tmp_path / 'chexus.sock')
+    stop = threading.Event()
+    thread = threading.Thread(
+        target=serve,
+        args=(path, chexus.validators.base_validators(has_scipp=False)),
+        kwargs={'jobs': 2, 'until': stop.is_set},
+    )
+    thread.start()
+    end = time.monotonic() + 10
+    while not os.path.exists(path) and time.monotonic() < end:
+        time.sleep(0.01)
+    yield path
+    stop.set()
+    thread.join()
+
+
+def test_submit_returns_results_of_daemon(tmp_path, daemon: str) -> None:
+    files = [_make_file(str(tmp_path / f'{i}.nxs')) for i in range(3)]
+    received = []
+    results = submit(daemon, [*files, str(tmp_path / 'missing.nxs')], received.append)
+    assert received == results
+    statuses = {result['path']: result['status'] for result in results}
+    assert statuses == {
+        **dict.fromkeys(files, 'failed'),
+        str(tmp_path / 'missing.nxs'): 'error',
+    }
+    for result in results:
+        if result['status'] == 'failed':
+            violations = result['validators']['NX_class_attr_missing']['violations']
+            assert violations == [{'name': '/unclassified', 'description': None}]
+    # The daemon keeps serving after a request
+    assert submit(daemon, []) == []
+    assert [r['status'] for r in submit(daemon, files[:1])] == ['failed']
+
+
+def test_daemon_rejects_invalid_request(daemon: str) -> None:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(daemon)
+        sock.sendall(b'{"paths": "not a list"}\n')
+        with sock.makefile('rb') as stream:
+            assert json.loads(stream.readline()) == {
+                'error': 'Invalid request',
+                'done': True,
+            }
+
+
+def test_cli_submits_to_daemon(tmp_path, daemon: str) -> None:
+    path = _make_file(str(tmp_path / 'run.nxs'))
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, '-m', 'chexus', '--server', daemon, '--exit-on-fail', path],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    assert result.returncode == 1
+    assert f'{path}: failed' in result.stdout
+    assert '  NX_class_attr_missing @ /unclassified' in result.stdout
+    assert '0 passed, 1 failed, 0 error, 0 timeout (1 files)' in result.stdout
+
+
+def test_client_that_does_not_read_does_not_stall_others(tmp_path, daemon: str) -> None:
+    path = str(tmp_path / 'many.nxs')
+    with h5py.File(path, 'w') as f:
+        for i in range(5000):
+            f.create_group(f'unclassified{i}')
+    small = _make_file(str(tmp_path / 'small.nxs'))
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as slow:
+        slow.connect(daemon)
+        # Results larger than the socket buffers, which are never read
+        request = json.dumps({'paths': [path] * 4})
+        slow.sendall(request.encode() + b'\n')
+        time.sleep(0.5)
+        results = []
+        thread = threading.Thread(
+            target=lambda: results.extend(submit(daemon, [small])), daemon=True
+        )
+        thread.start()
+        thread.join(timeout=30)
+        assert not thread.is_alive()
+    assert [r['status'] for r in results] == ['failed']
+
+
+def test_daemon_disconnects_client_with_too_long_request(
+    daemon: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(chexus.server, 'MAX_REQUEST_BYTES', 1000)
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(daemon)
+        sock.sendall(b'x' * 1001)
+        with sock.makefile('rb') as stream:
+            assert json.loads(stream.readline()) == {
+                'error': 'Request too long',
+                'done': True,
+            }
+            assert stream.readline() == b''
@@ -0,0 +1,130 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2024 Scipp contributors (https://github.com/scipp)
+import os
+
+import h5py
+import numpy as np
+import pytest
+
+import chexus
+
+
+@pytest.fixture
+def nexus_file(tmp_path) -> str:
+    path = str(tmp_path / 'test.nxs')
+    with h5py.File(path, 'w') as f:
+        entry = f.create_group('entry')
+        entry.attrs['NX_class'] = 'NXentry'
+        detector = entry.create_group('detector')
+        detector.attrs['NX_class'] = 'NXdetector'
+        detector_number = detector.create_dataset(
+            'detector_number', data=np.arange(6).reshape(2, 3)
+        )
+        detector_number.attrs['units'] = ''
+        detector.create_dataset('name', data='bank0')
+        entry['detector_number'] = detector_number
+    return path
+
+
+def _read(path: str, cache: chexus.SnapshotCache, **kwargs) -> dict:
+    reader = chexus.read_hdf5(path, cache=cache, **kwargs)
+    group = next(reader)
+    tree = chexus.unroll_tree(group)
+    result = {
+        name: (
+            type(node).__name__,
+            node.parent.name,
+            getattr(node, 'shape', None),
+            getattr(node, 'dtype', None),
+            dict(node.attrs),
+        )
+        for name, node in tree.items()
+    }
+    values = {name: node.value for name, node in tree.items() if hasattr(node, 'value')}
+    return group, result, values
+
+
+def test_read_hdf5_restores_tree_from_snapshot(
+    nexus_file: str, tmp_path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    cache = chexus.SnapshotCache(str(tmp_path / 'cache'))
+    _, expected, expected_values = _read(nexus_file, cache)
+    assert len(os.listdir(tmp_path / 'cache')) == 1
+
+    def fail(*args, **kwargs):
+        raise AssertionError('metadata should not be read')
+
+    monkeypatch.setattr(chexus.hdf5, '_read_subtree', fail)
+    group, result, values = _read(nexus_file, cache)
+    assert result == expected
+    assert values.keys() == expected_values.keys()
+    for name, value in values.items():
+        np.testing.assert_array_equal(value, expected_values[name])
+    tree = chexus.unroll_tree(group)
+    first = tree['/entry/detector/detector_number']
+    assert tree['/entry/detector_number'].dataset is first.dataset
+    assert tree['/entry/detector_number'].attrs is first.attrs
+
+
+def test_read_hdf5_from_snapshot_with_root_path(nexus_file: str, tmp_path) -> None:
+    cache = chexus.SnapshotCache(str(tmp_path / 'cache'))
+    for _ in range(2):
+        group, result, _ = _read(nexus_file, cache, root_path='/entry/detector')
+        assert group.name == '/entry/detector'
+        assert group.parent.name == '/entry'
+        assert list(result) == [
+            '/entry/detector/detector_number',
+            '/entry/detector/name',
+        ]
+    # Only the subtree was read and stored
+    snapshot = cache.load(nexus_file, root_path='/entry/detector')
+    assert [record[1] for record in snapshot] == [
+        '/entry/detector',
+        '/entry/detector/detector_number',
+        '/entry/detector/name',
+    ]
+    assert cache.load(nexus_file) is None
+    # Ancestors are read from the file
+    reader = chexus.read_hdf5(nexus_file, cache=cache, root_path='/entry/detector')
+    group = next(reader)
+    assert group.parent.children['detector'] is group
+    assert group.parent.attrs['NX_class'] == 'NXentry'
+    assert 'detector_number' in group.parent.children
+
+
+def test_snapshot_is_not_used_if_file_changed(nexus_file: str, tmp_path) -> None:
+    cache = chexus.SnapshotCache(str(tmp_path / 'cache'))
+    _read(nexus_file, cache)
+    with h5py.File(nexus_file, 'a') as f:
+        f['entry'].create_group('sample')
+    _, result, _ = _read(nexus_file, cache)
+    assert '/entry/sample' in result
+    assert len(os.listdir(tmp_path / 'cache')) == 2
+
+
+def test_snapshot_cache_evicts_least_recently_used(tmp_path) -> None:
+    paths = []
+    for i in range(3):
+        path = str(tmp_path / f'{i}.nxs')
+        with h5py.File(path, 'w') as f:
+            f.create_group('entry').attrs['NX_class'] = 'NXentry'
+        paths.append(path)
+    cache = chexus.SnapshotCache(str(tmp_path / 'cache'))
+    _read(paths[0], cache)
+    _read(paths[1], cache)
+    size = sum(entry.stat().st_size for entry in os.scandir(tmp_path / 'cache'))
+    cache.max_bytes = size
+    # Make sure the second one is the least recently used, independent of the
+    # resolution of file timestamps.
+    os.utime(cache._snapshot_file(paths[1]), ns=(1, 1))
+    assert cache.load(paths[0]) is not None
+    _read(paths[2], cache)
+    assert cache.load(paths[0]) is not None
+    assert cache.load(paths[1]) is None
+    assert cache.load(paths[2]) is not None
+
+
+def test_read_hdf5_with_cache_does_not_support_lazy(nexus_file: str, tmp_path) -> None:
+    cache = chexus.SnapshotCache(str(tmp_path / 'cache'))
+    with pytest.raises(ValueError, match='lazy'):
+        next(chexus.read_hdf5(nexus_file, cache=cache, lazy=True))
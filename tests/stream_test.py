@@ -0,0 +1,105 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2024 Scipp contributors (https://github.com/scipp)
+import json
+
+import h5py
+import numpy as np
+import pytest
+
+import chexus
+from chexus.stream import _iter_and_unload
+
+
+@pytest.fixture
+def nexus_file(tmp_path) -> str:
+    path = str(tmp_path / 'test.nxs')
+    with h5py.File(path, 'w') as f:
+        entry = f.create_group('entry')
+        entry.attrs['NX_class'] = 'NXentry'
+        instrument = entry.create_group('instrument')
+        instrument.attrs['NX_class'] = 'NXinstrument'
+        for i in range(3):
+            detector = instrument.create_group(f'detector{i}')
+            detector.attrs['NX_class'] = 'NXdetector'
+            detector_number = detector.create_dataset(
+                'detector_number', data=np.arange(4) + 4 * (i % 2)
+            )
+            detector_number.attrs['units'] = ''
+            detector.create_dataset('depends_on', data=b'/entry/transform')
+            detector.create_dataset('x_pixel_offset', data=np.zeros(4))
+            events = detector.create_group('events')
+            events.attrs['NX_class'] = 'NXevent_data'
+            events.create_dataset('event_id', data=np.arange(10) % 6)
+        transform = entry.create_dataset('transform', data=1.5)
+        transform.attrs['transformation_type'] = 'translation'
+        transform.attrs['vector'] = [0.0, 0.0, 1.0]
+        transform.attrs['units'] = 'm'
+        transform.attrs['depends_on'] = '.'
+        entry.create_group('unclassified')
+    return path
+
+
+def _assert_same_results(results, expected) -> None:
+    assert results.keys() == expected.keys()
+    for key, result in results.items():
+        assert result.checks == expected[key].checks
+        assert result.violations == expected[key].violations
+
+
+@pytest.mark.parametrize('root_path', [None, '/entry/instrument'])
+def test_validate_stream_gives_same_results_as_validate(
+    nexus_file: str, root_path: str | None
+) -> None:
+    validators = chexus.validators.base_validators(has_scipp=False)
+    reader = chexus.read_hdf5(nexus_file, root_path=root_path)
+    group = next(reader)
+    expected = chexus.validate(
+        group, validators=validators, include_root=group.parent is not None
+    )
+    results = chexus.validate_stream(nexus_file, validators, root_path=root_path)
+    _assert_same_results(results, expected)
+    assert chexus.has_violations(results)
+
+
+def test_validate_stream_reads_json(tmp_path) -> None:
+    path = str(tmp_path / 'structure.json')
+    structure = {
+        "children": [
+            {
+                "name": "entry",
+                "type": "group",
+                "children": [
+                    {
+                        "module": "dataset",
+                        "config": {"name": "distance", "values": 1.0},
+                    }
+                ],
+            }
+        ]
+    }
+    with open(path, 'w') as f:
+        json.dump(structure, f)
+    validators = chexus.validators.base_validators(has_scipp=False)
+    expected = chexus.validate(chexus.read_json(path), validators=validators)
+    results = chexus.validate_stream(path, validators)
+    _assert_same_results(results, expected)
+
+
+def test_iter_and_unload_keeps_only_ancestors_and_their_children_loaded(
+    nexus_file: str,
+) -> None:
+    reader = chexus.read_hdf5(nexus_file, lazy=True)
+    root = next(reader)
+    loaded_groups = []
+    for node in _iter_and_unload(root, prune=None):
+        if isinstance(node, chexus.Group):
+            loaded_groups.append(node)
+        # Only groups that are ancestors of the current node remain loaded.
+        ancestors = set()
+        parent = node.parent
+        while parent is not None:
+            ancestors.add(id(parent))
+            parent = parent.parent
+        for group in loaded_groups:
+            if group is not node and id(group) not in ancestors:
+                assert not group.children.loaded
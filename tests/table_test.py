@@ -0,0 +1,131 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2024 Scipp contributors (https://github.com/scipp)
+import numpy as np
+import pytest
+
+import chexus
+from chexus.table import DATASET, GROUP, TreeTable
+
+
+def _add_group(parent: chexus.Group, name: str, **attrs) -> chexus.Group:
+    group = chexus.Group(name=f'{parent.name.rstrip("/")}/{name}', attrs=attrs)
+    group.parent = parent
+    parent.children[name] = group
+    return group
+
+
+def _add_dataset(parent: chexus.Group, name: str, dtype, **attrs) -> chexus.Dataset:
+    dataset = chexus.Dataset(
+        name=f'{parent.name.rstrip("/")}/{name}',
+        shape=(),
+        dtype=dtype,
+        attrs=attrs,
+        parent=parent,
+        value=0,
+    )
+    parent.children[name] = dataset
+    return dataset
+
+
+@pytest.fixture
+def tree() -> chexus.Group:
+    root = chexus.Group(name='/')
+    entry = _add_group(root, 'entry', NX_class='NXentry')
+    instrument = _add_group(entry, 'instrument', NX_class='NXinstrument', units='m')
+    legacy = _add_group(instrument, 'shape', NX_class='NXshape')
+    _add_group(legacy, 'untyped')
+    detector = _add_group(instrument, 'detector', NX_class='NXdetector')
+    _add_dataset(detector, 'detector_number', np.dtype('int32'), units='')
+    _add_dataset(detector, 'event_id', 'int64')
+    _add_dataset(detector, 'x_pixel_offset', np.float64)
+    _add_dataset(detector, 'y_pixel_offset', np.dtype('float32'), units='m')
+    _add_dataset(detector, 'z_pixel_offset', 'float32')
+    _add_dataset(detector, 'distance', np.dtype('>f8'))
+    _add_dataset(detector, 'name', str, units='m')
+    _add_dataset(detector, 'flag', bool)
+    _add_dataset(
+        detector,
+        'transform',
+        np.float64,
+        transformation_type='translation',
+        vector=[0, 0, 1],
+        offset=[0, 0, 0],
+        units='m',
+    )
+    _add_dataset(
+        detector,
+        'rotation',
+        np.float64,
+        transformation_type='rotation',
+        vector=[0, 0, 1],
+        offset=[0, 0, 0],
+        offset_units='m',
+        depends_on='transform',
+        units='deg',
+    )
+    return root
+
+
+def test_tree_table_columns(tree: chexus.Group) -> None:
+    nodes = list(chexus.unroll_tree(tree).values())
+    table = TreeTable(nodes)
+    assert len(table) == len(nodes)
+    for row, node in enumerate(nodes):
+        assert table.kind[row] == (GROUP if isinstance(node, chexus.Group) else DATASET)
+        assert table.basenames[table.basename[row]] == node.basename
+        if (nx_class := node.attrs.get('NX_class')) is None:
+            assert table.nx_class[row] == -1
+        else:
+            assert table.nx_classes[table.nx_class[row]] == nx_class
+        if node.parent in nodes:
+            assert nodes[table.parent[row]] is node.parent
+        else:
+            assert table.parent[row] == -1
+    names = [node.name for node in nodes]
+    detector = names.index('/entry/instrument/detector')
+    name = names.index('/entry/instrument/detector/name')
+    assert table.dtype[detector] == -1
+    assert table.dtype_kind[detector] == ''
+    assert table.dtype_kind[name] == 'U'
+    np.testing.assert_array_equal(
+        table.has_attr('units'), ['units' in node.attrs for node in nodes]
+    )
+
+
+def test_tree_table_has_attr_raises_if_attribute_not_recorded(
+    tree: chexus.Group,
+) -> None:
+    table = TreeTable(list(chexus.unroll_tree(tree).values()), attrs=['units'])
+    with pytest.raises(KeyError):
+        table.has_attr('NX_class')
+
+
+def test_validate_columnar_gives_same_results(tree: chexus.Group) -> None:
+    validators = chexus.validators.base_validators(has_scipp=False)
+    expected = chexus.validate(tree, validators=validators, include_root=True)
+    results = chexus.validate(
+        tree, validators=validators, include_root=True, columnar=True
+    )
+    assert results.keys() == expected.keys()
+    for key, result in results.items():
+        assert result.checks == expected[key].checks
+        assert result.fails == expected[key].fails
+        assert result.violations == expected[key].violations
+    assert chexus.report(results) == chexus.report(expected)
+
+
+def test_validate_columnar_uses_masks(tree: chexus.Group) -> None:
+    class counting_NX_class_attr_missing(chexus.validators.NX_class_attr_missing):
+        calls = 0
+
+        def applies_to(self, node) -> bool:
+            self.calls += 1
+            return super().applies_to(node)
+
+    validator = counting_NX_class_attr_missing()
+    results = chexus.validate(tree, validators=[validator], columnar=True)
+    assert validator.calls == 0
+    assert results[type(validator)].checks == 5
+    assert [v.name for v in results[type(validator)].violations] == [
+        '/entry/instrument/shape/untyped'
+    ]
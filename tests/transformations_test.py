@@ -0,0 +1,135 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2024 Scipp contributors (https://github.com/scipp)
+import pytest
+
+import chexus
+
+
+def _add_transformation(parent: chexus.Group, name: str, depends_on: str) -> None:
+    parent.children[name] = chexus.Dataset(
+        name=f'{parent.name}/{name}',
+        shape=(),
+        dtype='float64',
+        attrs={
+            'transformation_type': 'translation',
+            'vector': [0, 0, 1],
+            'depends_on': depends_on,
+        },
+        parent=parent,
+        value=1.0,
+    )
+
+
+@pytest.fixture
+def tree() -> chexus.Group:
+    root = chexus.Group(name='/')
+    entry = chexus.Group(name='/entry', attrs={'NX_class': 'NXentry'}, parent=root)
+    root.children['entry'] = entry
+    transformations = chexus.Group(
+        name='/entry/transformations',
+        attrs={'NX_class': 'NXtransformations'},
+        parent=entry,
+    )
+    entry.children['transformations'] = transformations
+    _add_transformation(transformations, 'base', '.')
+    _add_transformation(transformations, 'arm', 'base')
+    _add_transformation(transformations, 'cycle1', 'cycle2')
+    _add_transformation(transformations, 'cycle2', '/entry/transformations/cycle1')
+    for name, target in (
+        ('detector1', '/entry/transformations/arm'),
+        ('detector2', '/entry/transformations/arm'),
+        ('detector3', '/entry/transformations/missing'),
+        ('detector4', '/entry/transformations/cycle2'),
+    ):
+        detector = chexus.Group(
+            name=f'/entry/{name}', attrs={'NX_class': 'NXdetector'}, parent=entry
+        )
+        entry.children[name] = detector
+        detector.children['depends_on'] = chexus.Dataset(
+            name=f'/entry/{name}/depends_on',
+            shape=(),
+            dtype=str,
+            parent=detector,
+            value=target,
+        )
+    return root
+
+
+def _nodes(tree: chexus.Group, *paths: str) -> tuple:
+    index = chexus.TreeIndex(tree)
+    return tuple(index[path] for path in paths)
+
+
+def test_chain_follows_links_to_end(tree: chexus.Group) -> None:
+    graph = chexus.TreeIndex(tree).transformations
+    entry = tree.children['entry']
+    arm, base = _nodes(
+        tree, '/entry/transformations/arm', '/entry/transformations/base'
+    )
+    assert graph.chain(entry.children['detector1']) == (arm, base)
+    # Detectors share the memoised chain
+    depends_on = entry.children['detector2'].children['depends_on']
+    assert graph.chain(depends_on) == (arm, base)
+    assert graph.depends_on(depends_on).target is arm
+    # Relative to the parent group of the transformation
+    assert graph.chain(arm) == (base,)
+    assert graph.chain(base) == ()
+    assert graph.chain(entry.children['detector3']) == ()
+
+
+def test_graph_without_index_walks_tree(tree: chexus.Group) -> None:
+    graph = chexus.TransformationGraph()
+    detector = tree.children['entry'].children['detector1']
+    assert [node.name for node in graph.chain(detector)] == [
+        '/entry/transformations/arm',
+        '/entry/transformations/base',
+    ]
+    assert list(graph.links()) == []
+
+
+def test_graph_finds_dangling_links_and_cycles(tree: chexus.Group) -> None:
+    graph = chexus.TreeIndex(tree).transformations
+    assert [link.node.name for link in graph.links()] == [
+        '/entry/transformations/base',
+        '/entry/transformations/arm',
+        '/entry/transformations/cycle1',
+        '/entry/transformations/cycle2',
+        '/entry/detector1/depends_on',
+        '/entry/detector2/depends_on',
+        '/entry/detector3/depends_on',
+        '/entry/detector4/depends_on',
+    ]
+    (dangling,) = graph.dangling()
+    assert dangling.node.name == '/entry/detector3/depends_on'
+    assert dangling.path == '/entry/transformations/missing'
+    cycle1, cycle2 = _nodes(
+        tree, '/entry/transformations/cycle1', '/entry/transformations/cycle2'
+    )
+    assert [set(cycle) for cycle in graph.cycles()] == [{cycle1, cycle2}]
+    assert graph.is_cyclic(cycle1)
+    assert not graph.is_cyclic(tree.children['entry'].children['detector4'])
+    assert graph.chain(cycle1) == (cycle2, cycle1)
+    assert graph.chain(tree.children['entry'].children['detector4']) == (
+        cycle2,
+        cycle1,
+        cycle2,
+    )
+
+
+def test_depends_on_validators_use_graph(tree: chexus.Group) -> None:
+    validators = [
+        chexus.validators.depends_on_target_missing(),
+        chexus.validators.depends_on_cycle(),
+    ]
+    results = chexus.validate(tree, validators=validators)
+    missing = results[chexus.validators.depends_on_target_missing]
+    assert missing.checks == 8
+    assert [v.name for v in missing.violations] == ['/entry/detector3/depends_on']
+    cycles = results[chexus.validators.depends_on_cycle]
+    assert cycles.checks == 4
+    assert [v.description for v in cycles.violations] == [
+        'depends_on cycle /entry/transformations/cycle1 -> '
+        '/entry/transformations/cycle2 -> /entry/transformations/cycle1',
+        'depends_on cycle /entry/transformations/cycle2 -> '
+        '/entry/transformations/cycle1 -> /entry/transformations/cycle2',
+    ]
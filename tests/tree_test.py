@@ -0,0 +1,66 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2024 Scipp contributors (https://github.com/scipp)
+import sys
+
+import chexus
+from chexus.tree import LazyDict
+
+
+def _make_tree() -> chexus.Group:
+    root = chexus.Group(name='/')
+    for i in range(2):
+        group = chexus.Group(name=f'/group{i}', parent=root)
+        root.children[group.basename] = group
+        for j in range(2):
+            child = chexus.Group(name=f'{group.name}/child{j}', parent=group)
+            group.children[child.basename] = child
+            child.children['data'] = chexus.Dataset(
+                name=f'{child.name}/data', shape=(), dtype='int64', parent=child
+            )
+    return root
+
+
+def test_iter_tree_yields_parents_before_children_in_order() -> None:
+    names = [node.name for node in chexus.iter_tree(_make_tree())]
+    assert names == [
+        '/group0',
+        '/group0/child0',
+        '/group0/child0/data',
+        '/group0/child1',
+        '/group0/child1/data',
+        '/group1',
+        '/group1/child0',
+        '/group1/child0/data',
+        '/group1/child1',
+        '/group1/child1/data',
+    ]
+    assert list(chexus.unroll_tree(_make_tree())) == names
+
+
+def test_iter_tree_supports_trees_deeper_than_recursion_limit() -> None:
+    root = chexus.Group(name='/')
+    group = root
+    depth = sys.getrecursionlimit() + 100
+    for _ in range(depth):
+        child = chexus.Group(name=f"{group.name.rstrip('/')}/g", parent=group)
+        group.children['g'] = child
+        group = child
+    assert sum(1 for _ in chexus.iter_tree(root)) == depth
+
+
+def test_iter_tree_prune_skips_subtree_without_loading_it() -> None:
+    root = _make_tree()
+    pruned = root.children['group1']
+    pruned.children = LazyDict(lambda: {})
+    names = [
+        node.name
+        for node in chexus.iter_tree(root, prune=lambda node: node.name == '/group1')
+    ]
+    assert names == [
+        '/group0',
+        '/group0/child0',
+        '/group0/child0/data',
+        '/group0/child1',
+        '/group0/child1/data',
+    ]
+    assert not pruned.children.loaded
@@ -0,0 +1,128 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2024 Scipp contributors (https://github.com/scipp)
+import math
+
+import pytest
+
+from chexus import units
+
+# Unit strings found in NeXus files, which the built-in parser supports
+CORPUS = [
+    *('', ' ', '1', 'dimensionless', '%', 'percent', 'counts', 'count'),
+    *('m', ' m', 'm ', 'metre', 'meters', 'millimetre', 'nanometers', 'µm', 'μm'),
+    *('um', 'micron', 'microns', 'Å', 'angstrom', 'Angstroms', 'in', 'inch', 'ft'),
+    *('rad', 'mrad', 'urad', 'deg', 'degree', 'degrees', '°', 'arcmin', 'arcsec'),
+    *('radians', 'rev', 'revolution', 'turn', 'sr', 'rpm'),
+    *('s', 'ms', 'us', 'µs', 'ns', 'ps', 'sec', 'second', 'seconds', 'microseconds'),
+    *('min', 'minute', 'minutes', 'h', 'hr', 'hour', 'hours', 'day', 'days'),
+    *('Hz', 'kHz', 'MHz', 'hertz', 'megahertz', '1/s', 's^-1', 's**-1', 's-1'),
+    *('1/min', '1/us', '1 / s', '1/(s)', 'Hz/ms'),
+    *('K', 'mK', 'kelvin', 'mol', 'mmol', 'cd', 'kg', 'g', 'mg', 'gram'),
+    *('eV', 'meV', 'keV', 'MeV', 'electronvolt', 'J', 'kJ', 'W', 'mW', 'V', 'kV'),
+    *('A', 'mA', 'uA', 'C', 'T', 'mT', 'G', 'gauss', 'ohm', 'Ω', 'kohm', 'S', 'F'),
+    *('Wb', 'H', 'N', 'Pa', 'kPa', 'hPa', 'bar', 'mbar', 'torr', 'Torr', 'atm'),
+    *('L', 'mL', 'uL', 'barn'),
+    *('m/s', 'm.s-1', 'm*s', 'm·s', 'm^2', 'm**2', 'm2', 'm3', 'mm^2', 'm^ 2'),
+    *('m ^2', 'm^+2', 'm^-1', '1/m', 'cm^-1', '1/angstrom', 'Å^-1', 'm/s^2'),
+    *('m/s/s', 'm/s2', 'kg.m/s', 'kg*m/s^2', 'J/K/mol', 'J/(K*mol)', '1/(m*s)'),
+    *('(m)', 'deg/s', 'rad/s', 'counts/s', 'counts/us', 'kg/m^3', 'g/cm^3'),
+    *('mm/rad', 'm/m', 'Hz*s', 'm/s*kg', '1/m*s', 'uA*h', 'm^-1/2', 'm^7'),
+    *('10*m', '0.001*m', '1e-3*m', '1e-3'),
+    *('m s-1', 'm s^-1', 'kg m-2', '1/(m s)', 'kg m^2 s^-2', 'J/(K mol)', 'W/(m K)'),
+    *('10 m', '1/(kg m)', 'm (s)', 'm / s'),
+]
+
+# Products with spaces that scipp parses differently or rejects, and their
+# reading as in UDUNITS
+WHITESPACE_PRODUCTS = {
+    'kg m2 s-2': 'kg*m^2*s^-2',
+    'm s kg': 'm*s*kg',
+    'mol m2': 'mol*m^2',
+    'm  s': 'm*s',
+    '(m s)': 'm*s',
+}
+
+# Unit strings that neither the built-in parser nor scipp supports
+INVALID = [
+    *('test', 'seco', 'hz', 'NX_LENGTH', 'pixel', 'foo', 'AA', 'ang', 'm_'),
+    *('(m', 'm)', 'm//s', 'm2s', 'm^(1/2)', 'm*(s'),
+]
+
+
+def _scipp_unit(text: str) -> tuple[float, tuple[int, ...]]:
+    sc = pytest.importorskip('scipp')
+    unit = sc.Unit(text).to_dict()
+    powers = unit.get('powers', {})
+    return unit['multiplier'], tuple(powers.get(base, 0) for base in units.BASE_UNITS)
+
+
+def _prefixed() -> list[str]:
+    return [
+        *(p + s for p in units._PREFIXES for s in units._PREFIXABLE),
+        *(p + n for p in units._PREFIX_NAMES for n in units._NAMES),
+        *(p + n + 's' for p in units._PREFIX_NAMES for n in units._NAMES),
+    ]
+
+
+@pytest.mark.parametrize('text', CORPUS)
+def test_parse_unit_agrees_with_scipp(text: str) -> None:
+    unit = units.parse_unit(text)
+    scale, powers = _scipp_unit(text)
+    assert unit.powers == powers
+    assert math.isclose(unit.scale, scale, rel_tol=1e-12)
+
+
+def test_parse_unit_agrees_with_scipp_for_prefixed_units() -> None:
+    for text in _prefixed():
+        try:
+            unit = units.parse_unit(text)
+        except units.UnitError:
+            continue
+        scale, powers = _scipp_unit(text)
+        assert unit.powers == powers, text
+        assert math.isclose(unit.scale, scale, rel_tol=1e-12), text
+
+
+@pytest.mark.parametrize('text', CORPUS)
+@pytest.mark.parametrize('target', ['m', 'rad', 'Hz'])
+def test_is_convertible_agrees_with_scipp(text: str, target: str) -> None:
+    sc = pytest.importorskip('scipp')
+    try:
+        sc.scalar(1.0, unit=text).to(unit=target)
+        expected = True
+    except sc.UnitError:
+        expected = False
+    assert units.is_convertible(text, target) == expected
+
+
+@pytest.mark.parametrize('text', INVALID)
+def test_invalid_units_are_rejected(text: str) -> None:
+    sc = pytest.importorskip('scipp')
+    assert not units.is_parsable(text)
+    with pytest.raises(sc.UnitError):
+        sc.Unit(text)
+
+
+@pytest.mark.parametrize(('text', 'expected'), WHITESPACE_PRODUCTS.items())
+def test_space_between_factors_multiplies(text: str, expected: str) -> None:
+    assert units.parse_unit(text) == units.parse_unit(expected)
+
+
+def test_unsupported_units_raise_UnitError() -> None:
+    # Units that scipp parses, but that are outside of the supported subset
+    for text in ('degC', 'HZ', 'per second', 'm^8', '2m', 'm 2', 'm 1e-3'):
+        with pytest.raises(units.UnitError):
+            units.parse_unit(text)
+    with pytest.raises(units.UnitError):
+        units.parse_unit(None)
+
+
+def test_is_convertible_checks_dimension() -> None:
+    assert units.is_convertible('mm', 'm')
+    assert units.is_convertible('Angstrom', 'm')
+    assert not units.is_convertible('mm', 'rad')
+    assert units.is_convertible('deg', 'rad')
+    assert units.is_convertible('1/ms', 'Hz')
+    assert not units.is_convertible('rpm', 'Hz')
+    assert not units.is_convertible('', 'm')
+    assert not units.is_convertible('test', 'm')
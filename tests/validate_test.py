@@ -56,3 +56,94 @@ def test_validate_detects_some_nested_problems(tree_with_detector: chexus.Group)
     assert results[chexus.validators.depends_on_target_missing].fails == 1
     assert results[chexus.validators.index_has_units].fails == 1
     assert results[chexus.validators.float_dataset_units_missing].fails == 0
+
+
+def test_validate_routes_nodes_by_selectors(tree_with_detector: chexus.Group):
+    class counting_NXlog_has_value(chexus.validators.NXlog_has_value):
+        def __init__(self) -> None:
+            super().__init__()
+            self.nodes = []
+
+        def applies_to(self, node) -> bool:
+            self.nodes.append(node.name)
+            return super().applies_to(node)
+
+    validator = counting_NXlog_has_value()
+    root = tree_with_detector
+    detector1 = root.children['entry'].children['instrument'].children['detector1']
+    detector1.children['temperature'] = chexus.Group(
+        name='/entry/instrument/detector1/temperature',
+        attrs={'NX_class': 'NXlog'},
+        parent=detector1,
+    )
+    results = chexus.validate(root, validators=[validator])
+    assert validator.nodes == ['/entry/instrument/detector1/temperature']
+    assert results[type(validator)].checks == 1
+    assert results[type(validator)].fails == 1
+
+
+def test_validate_applies_validators_without_selectors_to_all_nodes(
+    tree_with_detector: chexus.Group,
+):
+    class all_nodes(chexus.Validator):
+        def __init__(self) -> None:
+            super().__init__('all_nodes', 'Applies to every node')
+
+        def applies_to(self, node) -> bool:
+            return True
+
+        def validate(self, node) -> chexus.Violation | None:
+            return None
+
+    results = chexus.validate(tree_with_detector, validators=[all_nodes()])
+    assert results[all_nodes].checks == 4
+
+
+@pytest.mark.parametrize(
+    'validator', chexus.validators.base_validators(), ids=lambda v: type(v).__name__
+)
+def test_selectors_select_all_nodes_validator_applies_to(
+    tree_with_detector: chexus.Group, validator: chexus.Validator
+):
+    root = tree_with_detector
+    detector1 = root.children['entry'].children['instrument'].children['detector1']
+    for name, attrs, dtype in [
+        ('depends_on', {}, str),
+        ('detector_number', {'units': ''}, 'int32'),
+        ('x_pixel_offset', {'units': 'm'}, 'float64'),
+        (
+            'transform',
+            {
+                'transformation_type': 'translation',
+                'vector': [0, 0, 1],
+                'offset': [0, 0, 0],
+                'offset_units': 'm',
+                'depends_on': '.',
+                'units': 'm',
+            },
+            'float64',
+        ),
+    ]:
+        detector1.children[name] = chexus.Dataset(
+            name=f'{detector1.name}/{name}',
+            shape=(1,),
+            dtype=dtype,
+            attrs=attrs,
+            parent=detector1,
+            value=0,
+        )
+    for node in chexus.unroll_tree(root).values():
+        if validator.applies_to(node):
+            assert not validator.selectors or any(
+                selector.matches(node) for selector in validator.selectors
+            )
+
+
+def test_validate_prune_skips_subtree(tree_with_detector: chexus.Group):
+    validators = [chexus.validators.NX_class_attr_missing()]
+    results = chexus.validate(
+        tree_with_detector,
+        validators=validators,
+        prune=lambda node: node.name == '/entry/instrument',
+    )
+    assert results[chexus.validators.NX_class_attr_missing].checks == 1
@@ -1,5 +1,7 @@
 # SPDX-License-Identifier: BSD-3-Clause
 # Copyright (c) 2023 Scipp contributors (https://github.com/scipp)
+import json
+
 import numpy as np
 import pytest
 
@@ -57,6 +59,43 @@ def test_depends_on_target_missing():
     assert result.name == "x/transform"
 
 
+def test_depends_on_target_missing_in_json_tree(tmp_path):
+    # Values of datasets are not read from JSON, so depends_on has no value.
+    path = tmp_path / "structure.json"
+    structure = {
+        "children": [
+            {
+                "name": "detector",
+                "type": "group",
+                "attributes": [
+                    {"name": "NX_class", "dtype": "string", "values": "NXdetector"}
+                ],
+                "children": [
+                    {
+                        "module": "dataset",
+                        "config": {"name": "depends_on", "values": "."},
+                    }
+                ],
+            }
+        ]
+    }
+    path.write_text(json.dumps(structure))
+    group = chexus.read_json(str(path))
+    validators = [
+        chexus.validators.depends_on_target_missing(),
+        chexus.validators.depends_on_cycle(),
+    ]
+    results = chexus.validate(group, validators)
+    result = results[chexus.validators.depends_on_target_missing]
+    assert result.checks == 1
+    assert result.violations == [
+        chexus.Violation(
+            "/detector/depends_on", "depends_on target None is not a string"
+        )
+    ]
+    assert results[chexus.validators.depends_on_cycle].checks == 0
+
+
 def test_float_dataset_units_missing():
     good = chexus.Dataset(
         name="x",
@@ -416,6 +455,57 @@ def test_dataset_units_check_not_valid(units: str):
     assert result.name == "x"
 
 
+def make_unit_dataset(units: str) -> chexus.Dataset:
+    """Rotation with ``units`` as units of the value and of the offset"""
+    return chexus.Dataset(
+        name="x",
+        value=1.0,
+        shape=None,
+        dtype=np.float64,
+        parent=None,
+        attrs={
+            "units": units,
+            "transformation_type": "rotation",
+            "vector": [1.0, 0.0, 0.0],
+            "offset_units": units,
+        },
+    )
+
+
+@pytest.mark.parametrize("use_scipp", [True, False])
+def test_unit_validators_without_scipp(use_scipp: bool):
+    check = chexus.validators.dataset_units_check(use_scipp=use_scipp)
+    offset = chexus.validators.transformation_offset_units_invalid(use_scipp=use_scipp)
+    transformation = chexus.validators.transformation_units_invalid(use_scipp=use_scipp)
+    assert check.validate(make_unit_dataset("mm")) is None
+    assert check.validate(make_unit_dataset("test")) is not None
+    assert offset.validate(make_unit_dataset("mm")) is None
+    assert offset.validate(make_unit_dataset("deg")) is not None
+    assert transformation.validate(make_unit_dataset("deg")) is None
+    assert transformation.validate(make_unit_dataset("mm")) is not None
+    assert check.validate(make_unit_dataset("m s^-1")) is None
+    # Parsed by scipp, but not supported by the built-in parser
+    result = check.validate(make_unit_dataset("degC"))
+    assert (result is None) == use_scipp
+    # Parsed by the built-in parser, but rejected by scipp, which decides if used
+    for units in ("kg m2 s-2", "counts s-1"):
+        assert (check.validate(make_unit_dataset(units)) is None) != use_scipp
+
+
+def test_unit_checks_are_cached_by_unit_and_target():
+    check = chexus.validators.dataset_units_check()
+    offset = chexus.validators.transformation_offset_units_invalid()
+    before = chexus.validators.unit_cache_info()
+    for _ in range(3):
+        assert check.validate(make_unit_dataset("uniquely-invalid-unit")) is not None
+        assert check.validate(make_unit_dataset("mm")) is None
+        assert offset.validate(make_unit_dataset("mm")) is None
+    info = chexus.validators.unit_cache_info()
+    # "mm" is cached separately for parsing and for conversion to length
+    assert info.misses - before.misses <= 3
+    assert info.hits - before.hits >= 6
+
+
 @pytest.mark.parametrize(
     ("units", "good"),
     [
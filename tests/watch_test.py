@@ -0,0 +1,182 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2024 Scipp contributors (https://github.com/scipp)
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import h5py
+import pytest
+
+import chexus
+from chexus.watch import DirectoryWatcher, open_sink, watch
+
+
+def _make_file(path: str) -> str:
+    with h5py.File(path, 'w') as f:
+        f.create_group('entry').attrs['NX_class'] = 'NXentry'
+        f.create_group('unclassified')
+    return path
+
+
+@pytest.mark.skipif(sys.platform != 'linux', reason='inotify is Linux only')
+def test_watcher_returns_files_once_closed(tmp_path) -> None:
+    watcher = DirectoryWatcher(str(tmp_path))
+    assert watcher.uses_inotify
+    try:
+        f = h5py.File(tmp_path / 'open.nxs', 'w')
+        f.create_group('entry')
+        f.flush()
+        assert watcher.poll(timeout=0.2) == []
+        f.close()
+        assert watcher.poll(timeout=5) == [str(tmp_path / 'open.nxs')]
+        os.makedirs(tmp_path / 'sub')
+        path = _make_file(str(tmp_path / 'sub' / 'new.h5'))
+        (tmp_path / 'sub' / 'notes.txt').write_text('')
+        found = []
+        end = time.monotonic() + 5
+        while not found and time.monotonic() < end:
+            found += watcher.poll(timeout=0.1)
+        assert found == [path]
+    finally:
+        watcher.close()
+
+
+def test_watcher_polling_ignores_existing_files(tmp_path) -> None:
+    _make_file(str(tmp_path / 'old.nxs'))
+    watcher = DirectoryWatcher(
+        str(tmp_path), use_inotify=False, interval=0.05, settle=0.1
+    )
+    assert not watcher.uses_inotify
+    path = _make_file(str(tmp_path / 'new.nxs'))
+    assert watcher.poll(timeout=5) == [path]
+    assert watcher.poll(timeout=0.2) == []
+
+
+def test_watcher_polling_returns_files_written_again(tmp_path) -> None:
+    watcher = DirectoryWatcher(
+        str(tmp_path), use_inotify=False, interval=0.05, settle=0.1
+    )
+    path = _make_file(str(tmp_path / 'run.nxs'))
+    assert watcher.poll(timeout=5) == [path]
+    with h5py.File(path, 'a') as f:
+        f.create_group('sample')
+    assert watcher.poll(timeout=5) == [path]
+    os.remove(path)
+    assert watcher.poll(timeout=0.2) == []
+    _make_file(path)
+    assert watcher.poll(timeout=5) == [path]
+
+
+# Writes a file, closes it, and opens it again until told to close it.
+REOPENING_WRITER = """
+import sys
+import h5py
+
+with h5py.File(sys.argv[1], 'w') as f:
+    f.create_group('entry').attrs['NX_class'] = 'NXentry'
+with h5py.File(sys.argv[1], 'a') as f:
+    print('reopened', flush=True)
+    sys.stdin.readline()
+"""
+
+
+@pytest.mark.skipif(sys.platform != 'linux', reason='inotify is Linux only')
+def test_watcher_waits_for_files_reopened_by_writer(tmp_path) -> None:
+    watcher = DirectoryWatcher(str(tmp_path), interval=0.05, settle=0.1)
+    assert watcher.uses_inotify
+    path = str(tmp_path / 'run.nxs')
+    try:
+        with subprocess.Popen(  # noqa: S603
+            [sys.executable, '-c', REOPENING_WRITER, path],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+        ) as writer:
+            assert writer.stdout.readline() == 'reopened\n'
+            assert watcher.poll(timeout=0.5) == []
+            writer.communicate('\n', timeout=10)
+        assert writer.returncode == 0
+        assert watcher.poll(timeout=5) == [path]
+        assert watcher.poll(timeout=0.3) == []
+    finally:
+        watcher.close()
+
+
+class _LimitedWatches:
+    """Stands in for libc, with a limit of inotify watches"""
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self.libc = chexus.watch._libc
+        self.inotify_init1 = self.libc.inotify_init1
+
+    def inotify_add_watch(self, fd: int, path: bytes, mask: int) -> int:
+        if self.limit == 0:
+            return -1
+        self.limit -= 1
+        return self.libc.inotify_add_watch(fd, path, mask)
+
+
+@pytest.mark.skipif(sys.platform != 'linux', reason='inotify is Linux only')
+def test_watcher_polls_if_directory_cannot_be_watched(
+    tmp_path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(chexus.watch, '_libc', _LimitedWatches(0))
+    watcher = DirectoryWatcher(str(tmp_path), interval=0.05, settle=0.1)
+    assert not watcher.uses_inotify
+    path = _make_file(str(tmp_path / 'new.nxs'))
+    assert watcher.poll(timeout=5) == [path]
+
+
+@pytest.mark.skipif(sys.platform != 'linux', reason='inotify is Linux only')
+def test_watcher_switches_to_polling_when_out_of_watches(
+    tmp_path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    _make_file(str(tmp_path / 'old.nxs'))
+    monkeypatch.setattr(chexus.watch, '_libc', _LimitedWatches(1))
+    watcher = DirectoryWatcher(str(tmp_path), interval=0.05, settle=0.1)
+    assert watcher.uses_inotify
+    os.makedirs(tmp_path / 'sub')
+    path = _make_file(str(tmp_path / 'sub' / 'new.nxs'))
+    found = []
+    end = time.monotonic() + 5
+    while not found and time.monotonic() < end:
+        found += watcher.poll(timeout=0.1)
+    assert not watcher.uses_inotify
+    assert found == [path]
+    assert watcher.poll(timeout=0.3) == []
+
+
+@pytest.mark.parametrize('use_inotify', [True, False])
+def test_watch_validates_new_files(tmp_path, use_inotify: bool) -> None:
+    directory = tmp_path / 'data'
+    os.makedirs(directory)
+    received = []
+    timer = threading.Timer(0.5, _make_file, args=(str(directory / 'run.nxs'),))
+    timer.start()
+    end = time.monotonic() + 60
+    watch(
+        str(directory),
+        chexus.validators.base_validators(has_scipp=False),
+        received.append,
+        use_inotify=use_inotify,
+        interval=0.05,
+        settle=0.1,
+        until=lambda: bool(received) or time.monotonic() > end,
+    )
+    timer.join()
+    (result,) = received
+    assert result.path == str(directory / 'run.nxs')
+    assert result.status == 'failed'
+    sink = open_sink(str(tmp_path / 'results.jsonl'))
+    sink.write(json.dumps(result.to_dict()) + '\n')
+    sink.close()
+    with open(tmp_path / 'results.jsonl') as f:
+        line = json.loads(f.read())
+    assert line['status'] == 'failed'
+    assert line['validators']['NX_class_attr_missing']['violations'] == [
+        {'name': '/unclassified', 'description': None}
+    ]